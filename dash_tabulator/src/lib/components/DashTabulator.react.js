@@ -27,7 +27,7 @@ export default class DashTabulator extends React.Component {
     componentDidMount() {
         // Instantiate Tabulator when element is mounted
 
-        const { id, datasetName, data, columns, groupBy, cellEdited } = this.props;
+        const { id, datasetName, data, columns, groupBy, cellEdited, remote, ajaxURL, eventsURL } = this.props;
 
         // Interpret column formatters as function handles.
         for (let i = 0; i < columns.length; i++) {
@@ -48,21 +48,37 @@ export default class DashTabulator extends React.Component {
             }
         }
 
-        this.tabulator = new Tabulator(this.el, {
-            "data": data,
+        let options = {
             "datasetName": datasetName,
-            "reactiveData": true,
             "columns": columns,
             "groupBy": groupBy,
             "selectable": 1,
             "layout": "fitDataTable",
-            "pagination": "local",
             "paginationSize": 20,
             "paginationSizeSelector": [10, 20, 50, 100],
             "movableColumns": true,
             "persistence": true,
             "footerElement": "<button class='tabulator-page' onclick='localStorage.clear(); window.location.reload();'>Reset View</button>"
-        });
+        };
+        if (remote) {
+            // Pages are requested from the backend, which applies header filters and sorters to the data
+            Object.assign(options, {
+                "ajaxURL": ajaxURL,
+                "ajaxConfig": "POST",
+                "ajaxContentType": "json",
+                "pagination": true,
+                "paginationMode": "remote",
+                "filterMode": "remote",
+                "sortMode": "remote"
+            });
+        } else {
+            Object.assign(options, {
+                "data": data,
+                "reactiveData": true,
+                "pagination": "local"
+            });
+        }
+        this.tabulator = new Tabulator(this.el, options);
 
         this.tabulator.on("cellEdited", (cell) => {
             var edited = new Object()
@@ -84,6 +100,16 @@ export default class DashTabulator extends React.Component {
         })
 
         window.addEventListener('message', this.handleFilterEvent);
+
+        if (eventsURL) {
+            // Edits made by other users and changes of the dataset are pushed by the backend, instead of reloading the page
+            this.eventSource = new EventSource(eventsURL);
+            this.eventSource.addEventListener("edits", (event) => this.applyRowPatches(JSON.parse(event.data)));
+            this.eventSource.addEventListener("dataset-changed", (event) => {
+                this.props.setProps({ datasetBuildDate: JSON.parse(event.data).build_date });
+            });
+            this.eventSource.addEventListener("reset", this.reloadData);
+        }
     }
 
     constructor(props) {
@@ -93,6 +119,44 @@ export default class DashTabulator extends React.Component {
 
     componentWillUnmount() {
         window.removeEventListener('message', this.handleFilterEvent);
+        if (this.eventSource) {
+            this.eventSource.close();
+        }
+    }
+
+    applyRowPatches = (patches) => {
+        // Each patch identifies a row by the values of its primary keys
+        for (const patch of patches) {
+            const keyFilters = Object.keys(patch.keys).map(field => ({
+                field: field,
+                type: "=",
+                value: patch.keys[field]
+            }));
+            const rows = this.tabulator.searchRows(keyFilters);
+            if (patch.action === "delete") {
+                rows.forEach(row => row.delete());
+            } else if (rows.length > 0) {
+                rows.forEach(row => row.update(patch.values));
+            } else if (patch.action === "create" && !this.props.remote) {
+                this.tabulator.addRow(Object.assign({}, patch.keys, patch.values));
+            }
+        }
+    }
+
+    reloadData = () => {
+        // Some events were missed: get all the data again
+        if (this.props.remote) {
+            this.tabulator.replaceData();
+            return;
+        }
+        fetch(this.props.ajaxURL, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ page: 1, size: Number.MAX_SAFE_INTEGER })
+        })
+            .then(response => response.json())
+            .then(json => this.tabulator.replaceData(json.data))
+            .catch(e => console.error("Failed to reload data", e));
     }
 
     handleFilterEvent = (event) => {
@@ -170,7 +234,10 @@ DashTabulator.defaultProps = {
     data: [],
     datasetName: "",
     columns: [],
-    groupBy: []
+    groupBy: [],
+    remote: false,
+    ajaxURL: "rows",
+    eventsURL: ""
 };
 
 DashTabulator.propTypes = {
@@ -209,4 +276,24 @@ DashTabulator.propTypes = {
      * cellEdited captures the cell that was clicked on
      */
     cellEdited: PropTypes.object,
+
+    /**
+     * If true, data isn't passed to the component: pages are requested from `ajaxURL`, and header filters and sorters are applied server-side.
+     */
+    remote: PropTypes.bool,
+
+    /**
+     * URL of the endpoint that serves pages of data, when `remote` is true. It receives a JSON body with `page`, `size`, `sort` and `filter`, and returns `{"last_page": ..., "data": [...]}`.
+     */
+    ajaxURL: PropTypes.string,
+
+    /**
+     * URL of a server-sent events stream. When set, the table applies the row patches sent in `edits` events, reloads its data on `reset` events, and sets `datasetBuildDate` on `dataset-changed` events.
+     */
+    eventsURL: PropTypes.string,
+
+    /**
+     * Last build date of the dataset, as sent by the `eventsURL` stream when the dataset changes.
+     */
+    datasetBuildDate: PropTypes.oneOfType([PropTypes.number, PropTypes.string]),
 };
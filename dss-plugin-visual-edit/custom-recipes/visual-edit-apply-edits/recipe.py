@@ -1,15 +1,25 @@
 # %% Imports
 ###
 
+import logging
 import dataiku
-from dataiku.customrecipe import get_input_names_for_role, get_output_names_for_role
+from dataiku.customrecipe import get_input_names_for_role, get_output_names_for_role, get_recipe_config
 from pandas import DataFrame
 
 # when using interactive execution:
 # import sys
 # sys.path.append('../../python-lib')
 
-from commons import apply_edits_from_df, get_dataframe
+from commons import (
+    apply_edits_from_df,
+    apply_edits_pushdown,
+    get_dataframe,
+    get_incremental_keys,
+    get_last_build_date,
+    get_watermark,
+    upsert_edited_rows,
+)
+from dataiku_utils import is_sql_dataset
 
 
 # %% Get recipe parameters
@@ -29,29 +39,81 @@ edited_names = get_output_names_for_role("edited")
 edited_datasets = [dataiku.Dataset(name) for name in edited_names]
 edited_ds = edited_datasets[0]
 
-
-# %% Read input data
-###
-
-edits_df = get_dataframe(
-    edits_ds
-)  # this dataframe was written by the replay-edits recipe which inferred the schema upon writing: let's use this schema when reading this dataset
+incremental = get_recipe_config().get("incremental", False)
+# custom field of the edited dataset where the incremental mode saves the edits it processed
+WATERMARK_FIELD = "apply_edits_watermark"
 
 
-# %% Compute output data
+# %% Incremental mode: only recompute the rows whose keys were edited since the last run, when possible
 ###
 
-edited_df = apply_edits_from_df(original_ds, edits_df)
-
-
-# %% Write output data
+keys_df = None
+if incremental:
+    primary_keys = original_ds.get_config()["customFields"]["primary_keys"]
+    project = dataiku.api_client().get_default_project()
+    edited_ds_settings = project.get_dataset(edited_ds.short_name).get_settings()
+    watermark = edited_ds_settings.custom_fields.get(WATERMARK_FIELD)
+    try:
+        original_build_date = get_last_build_date(original_ds.short_name, project)
+    except Exception:
+        logging.warning("Failed to get the last build date of the original dataset.", exc_info=True)
+        original_build_date = None
+    edits_df = get_dataframe(edits_ds)
+    if not is_sql_dataset(edited_ds):
+        logging.info("The edited dataset isn't a SQL dataset: recomputing all rows.")
+    elif not watermark or original_build_date is None or watermark.get("original_build_date") != original_build_date:
+        logging.info("No previous run found, or the original dataset has changed since: recomputing all rows.")
+    elif sorted(watermark.get("columns", [])) != sorted(original_schema_df.index):
+        logging.info("The schema has changed since the previous run: recomputing all rows.")
+    else:
+        keys_df = get_incremental_keys(edits_df, primary_keys, watermark)
+        if keys_df is None:
+            logging.info("The keys edited before the previous run weren't saved: recomputing all rows.")
+
+if keys_df is not None:
+    if keys_df.empty:
+        logging.info("No edits since the previous run.")
+    else:
+        logging.info(f"Recomputing {len(keys_df)} rows edited since the previous run.")
+        upsert_edited_rows(original_ds, edits_df, edited_ds, keys_df)
+
+else:
+    # %% Compute output data inside the database, when the original and edits datasets are on the same SQL connection
+    ###
+
+    try:
+        edited_df = apply_edits_pushdown(original_ds, edits_ds)
+    except Exception:
+        logging.exception("Failed to apply edits inside the database, applying them in pandas instead.")
+        edited_df = None
+
+    # %% Otherwise, read input data and compute output data in pandas
+    ###
+
+    if edited_df is None:
+        edits_df = get_dataframe(
+            edits_ds
+        )  # this dataframe was written by the replay-edits recipe which inferred the schema upon writing: let's use this schema when reading this dataset
+        edited_df = apply_edits_from_df(original_ds, edits_df)
+
+    # %% Write output data
+    ###
+
+    edited_ds.write_with_schema(
+        edited_df, drop_and_create=True
+    )  # the dataframe's types were set explicitly, so let's use them to write this dataset's schema
+    edited_schema = edited_ds.read_schema()
+    # for each item of edited_schema, make sure its type is the same as the one given by original_schema
+    for item in edited_schema:
+        item["type"] = original_schema_df.loc[item["name"]]["type"]
+    edited_ds.write_schema(edited_schema)
+
+
+# %% Save the watermark for the next run in incremental mode
 ###
 
-edited_ds.write_with_schema(
-    edited_df, drop_and_create=True
-)  # the dataframe's types were set explicitly, so let's use them to write this dataset's schema
-edited_schema = edited_ds.read_schema()
-# for each item of edited_schema, make sure its type is the same as the one given by original_schema
-for item in edited_schema:
-    item["type"] = original_schema_df.loc[item["name"]]["type"]
-edited_ds.write_schema(edited_schema)
+if incremental:
+    edited_ds_settings.custom_fields[WATERMARK_FIELD] = get_watermark(
+        edits_df, primary_keys, original_build_date, [col["name"] for col in edited_ds.read_schema()]
+    )
+    edited_ds_settings.save()
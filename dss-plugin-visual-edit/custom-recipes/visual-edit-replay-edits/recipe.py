@@ -1,6 +1,7 @@
 # %% Imports
 ###
 
+import logging
 import dataiku
 from dataiku.customrecipe import get_input_names_for_role, get_output_names_for_role
 
@@ -8,7 +9,7 @@ from dataiku.customrecipe import get_input_names_for_role, get_output_names_for_
 # import sys
 # sys.path.append('../../python-lib')
 
-from commons import replay_edits
+from commons import replay_edits, replay_edits_pushdown
 
 
 # %% Get recipe parameters
@@ -24,17 +25,23 @@ edits_datasets = [dataiku.Dataset(name) for name in edits_names]
 edits_ds = edits_datasets[0]
 
 
-# %% Compute output data
+# %% Compute and write output data inside the database, when the editlog is on a SQL connection
 ###
 
 primary_keys = editlog_ds.get_config()["customFields"]["primary_keys"]
 editable_column_names = editlog_ds.get_config()["customFields"]["editable_column_names"]
-edits_df = replay_edits(editlog_ds, primary_keys, editable_column_names)
+try:
+    replayed = replay_edits_pushdown(editlog_ds, edits_ds, primary_keys, editable_column_names)
+except Exception:
+    logging.exception("Failed to replay edits inside the database, replaying them in pandas instead.")
+    replayed = False
 
 
-# %% Write output data
+# %% Otherwise, compute output data in pandas and write it
 ###
 
-edits_ds.write_dataframe(
-    edits_df, infer_schema=True, dropAndCreate=True
-)  # the schema is inferred upon writing and might be different from that of the original dataset: this will be reconciled by the apply-edits recipe/method
+if not replayed:
+    edits_df = replay_edits(editlog_ds, primary_keys, editable_column_names)
+    edits_ds.write_dataframe(
+        edits_df, infer_schema=True, dropAndCreate=True
+    )  # the schema is inferred upon writing and might be different from that of the original dataset: this will be reconciled by the apply-edits recipe/method
@@ -4,30 +4,54 @@ from dataiku import Dataset, api_client
 from dataikuapi.dss.dataset import DSSManagedDatasetCreationHelper
 from dataikuapi.dss.recipe import DSSRecipeCreator
 from dataiku_utils import is_sql_dataset, recipe_already_exists
-from pandas import DataFrame
+from numpy import nan
+from pandas import DataFrame, Series, isna
 from commons import (
     try_get_user_identifier,
     get_original_df,
     get_dataframe,
+    iter_dataframe,
     write_empty_editlog,
     get_display_column_names,
     apply_edits_from_df,
-    replay_edits,
+    apply_edits_pushdown,
+    apply_edits_to_df,
     get_key_values_from_dict,
+    get_last_build_date,
+    INTEGER_TYPES,
 )
 from webapp.db.editlogs import EditLog, EditLogAppenderFactory
-from webapp_utils import find_webapp_id, get_webapp_json
+from webapp.db.editstate import EditState
+from webapp.db.editlog_writer import GroupCommitEditLogWriter
+from webapp.db.label_cache import DEFAULT_TTL, LinkedLabelCache
+from webapp.db.linked_index import LinkedRecordIndex
+from webapp.db.linked_store import LinkedRecordStore
+from webapp.logging.timing import PhaseTimer
+from webapp_utils import find_webapp, get_webapp_json
 from editschema_utils import get_primary_keys, get_editable_column_names
 from DatasetSQL import DatasetSQL
 from os import getenv
+from os.path import join
+from tempfile import gettempdir
 from json import loads
 from datetime import datetime
+from functools import partial
 from pytz import timezone
 from re import sub
-from typing import List
+from typing import Callable, List
+from threading import Lock
+from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor
 from webapp.config.models import LinkedRecord, EditSchema
 
 
+# Maximum number of threads used to set up a DataEditor
+STARTUP_MAX_WORKERS = 8
+
+# Directory where linked datasets which are too large to be loaded in memory are stored
+LINKED_RECORDS_DIR = join(gettempdir(), "visual-edit", "linked-records")
+
+
 class EditSuccess:
     pass
 
@@ -62,10 +86,11 @@ class DataEditor:
 
     def __init_webapp_url__(self):
         try:
-            webapp_id = find_webapp_id(self.original_ds_name)
-            webapp_name = sub(
-                r"[\W_]+", "-", get_webapp_json(webapp_id).get("name").lower()
-            )
+            webapp = find_webapp(self.original_ds_name)
+            webapp_id = webapp["id"]
+            # the name is given in the list of webapps
+            name = webapp.get("name") or get_webapp_json(webapp_id).get("name")
+            webapp_name = sub(r"[\W_]+", "-", name.lower())
             self.webapp_url = (
                 f"/projects/{self.project_key}/webapps/{webapp_id}_{webapp_name}/edit"
             )
@@ -76,6 +101,7 @@ class DataEditor:
             self.webapp_url_public = "/"
 
     def __setup_editlog__(self):
+        self.edit_state = EditState(self.primary_keys, self.editable_column_names)
         editlog_ds_creator = DSSManagedDatasetCreationHelper(
             self.project, self.editlog_ds_name
         )
@@ -87,6 +113,9 @@ class DataEditor:
                 # Make sure that the dataset's configuration is valid by writing an empty dataframe.
                 # (The editlog dataset might already exist and have a schema, but its configuration might be invalid, for instance when the project was exported to a bundle and deployed to automation, and when using a SQL connection: the dataset exists but no table was created.)
                 write_empty_editlog(self.editlog_ds)
+            else:
+                # This is the only time the editlog is read: the edit state is then kept up-to-date by __log_edit__
+                self.edit_state.load(editlog_df)
         else:
             logging.debug("No editlog found, creating it...")
             editlog_ds_creator.with_store_into(connection=self.__connection_name__)
@@ -169,6 +198,77 @@ class DataEditor:
             apply_settings.save()
             logging.debug("Done.")
 
+    def __setup_linked_record__(self, linked_record: LinkedRecord, linked_labels_cache_ttl: float):
+        """
+        Loads a linked dataset in memory, stores it on disk, or prepares to query it via SQL, depending on its connection and its number of records.
+        """
+        linked_ds_name = linked_record.ds_name
+        linked_ds_key = linked_record.ds_key
+        linked_ds = Dataset(linked_ds_name, self.project_key)
+        # Get the number of records in the linked dataset
+        count_records = None
+        try:
+            metrics = self.project.get_dataset(linked_ds_name).compute_metrics(
+                metric_ids=["records:COUNT_RECORDS"]
+            )["result"]["computed"]
+            for m in metrics:
+                if m["metric"]["metricType"] == "COUNT_RECORDS":
+                    count_records = int(m["value"])
+        except Exception:
+            pass
+
+        MIN_SQL_ROWS = 1000
+        MAX_IN_MEMORY_ROWS = 10000
+        if is_sql_dataset(linked_ds):
+            if count_records is not None and count_records <= MIN_SQL_ROWS:
+                logging.debug(
+                    f"""Loading linked dataset "{linked_ds_name}" in memory since it has less than {MIN_SQL_ROWS} records"""
+                )
+                linked_record.df = (
+                    get_dataframe(linked_ds, limit=MAX_IN_MEMORY_ROWS)
+                    .set_index(linked_ds_key)
+                )
+            else:
+                logging.debug(
+                    f"""Loading linked dataset "{linked_ds_name}" as a DatasetSQL object since it has more than {MIN_SQL_ROWS} records or an unknown number of records"""
+                )
+                linked_record.ds = DatasetSQL(linked_ds_name, self.project_key)
+                linked_record.label_cache = LinkedLabelCache(
+                    get_build_date=partial(get_last_build_date, linked_ds_name, self.project),
+                    ttl=linked_labels_cache_ttl,
+                )
+        elif count_records is None or count_records > MAX_IN_MEMORY_ROWS:
+            logging.debug(
+                f"""Storing linked dataset "{linked_ds_name}" on disk since it isn't on an SQL connection and it has more than {MAX_IN_MEMORY_ROWS} records or an unknown number of records"""
+            )
+            try:
+                linked_record.store = self.__build_linked_record_store__(linked_record, linked_ds)
+                linked_record.index = linked_record.store
+            except Exception:
+                logging.exception(
+                    f"Failed to store linked dataset {linked_ds_name} on disk — capping at {MAX_IN_MEMORY_ROWS} rows in memory instead"
+                )
+                linked_record.df = (
+                    get_dataframe(linked_ds, limit=MAX_IN_MEMORY_ROWS)
+                    .set_index(linked_ds_key)
+                )
+        else:
+            logging.debug(
+                f"""Loading linked dataset "{linked_ds_name}" in memory since it isn't on an SQL connection"""
+            )
+            linked_record.df = (
+                get_dataframe(linked_ds, limit=MAX_IN_MEMORY_ROWS)
+                .set_index(linked_ds_key)
+            )
+        if linked_record.df is not None:
+            # Index labels once, rather than filtering and sorting the linked dataframe on each lookup
+            linked_record.index = LinkedRecordIndex(
+                linked_record.df,
+                linked_ds_key,
+                linked_record.ds_label,
+                linked_record.ds_lookup_columns,
+            )
+
     def __init__(
         self,
         original_ds_name: str,
@@ -180,6 +280,7 @@ class DataEditor:
         editschema=None,
         authorized_users: List[str] | None = None,
         freeze_edits: bool = False,
+        linked_labels_cache_ttl: float = DEFAULT_TTL,
     ):
         """
         Initializes Datasets (original and editlog) and properties used for data editing.
@@ -192,126 +293,127 @@ class DataEditor:
             authorized_users (list): A list of user identifiers who are authorized to make edits. If None, all users are authorized.
             freeze_edits (bool): If True, it won't be possible to make any edits.
             linked_records (list): (Optional) A list of LinkedRecord objects that represent linked datasets or dataframes.
+            linked_labels_cache_ttl (float): (Optional) Time in seconds during which labels read from linked datasets accessed via SQL are cached.
             editschema_manual (list): (Optional) A list of EditSchema objects that define the primary keys and editable columns.
             editschema (list): (Optional) A list of EditSchema objects that define the primary keys and editable columns.
 
         Notes:
             - If they don't already exist, the editlog, edits and edited Datasets are created on the same Dataiku Connection as the original Dataset. The Recipes in between (replay and apply edits) are also created.
             - Edits made via CRUD methods will instantly add rows to the editlog, but the edits and the edited Datasets won't be kept in "sync": they are only updated when the Recipes are run.
+            - The editlog is read once, upon initialization, to build an in-memory state of the edits; this state is then updated by CRUD methods. Edits appended to the editlog by other means (e.g. by another DataEditor instance) are only taken into account after calling `reload_edits`.
         """
+        timer = PhaseTimer("DataEditor startup")
         self.original_ds_name = original_ds_name
         if project_key is None:
             self.project_key = getenv("DKU_CURRENT_PROJECT_KEY")
         else:
             self.project_key = project_key
-        self.__init_webapp_url__()
-        client = api_client()
-        self.project = client.get_project(self.project_key)
-        self.original_ds = Dataset(self.original_ds_name, self.project_key)
-        self.schema_columns = self.original_ds.get_config().get("schema").get("columns")
-        self.schema_columns_df = DataFrame(data=self.schema_columns).set_index("name")
-
-        self.editlog_ds_name = self.original_ds_name + "_editlog"
-        self.edits_ds_name = self.original_ds_name + "_edits"
-        self.edited_ds_name = self.original_ds_name + "_edited"
-
-        self.__connection_name__ = (
-            self.original_ds.get_config().get("params").get("connection")
-        )
-        if self.__connection_name__ is None:
-            self.__connection_name__ = "filesystem_managed"
-
-        self.primary_keys = primary_keys
-        if editable_column_names:
-            self.editable_column_names = editable_column_names
-
-        # For each linked record, add linked dataset/dataframe as attribute
-        self.linked_records = linked_records if linked_records is not None else []
-        if self.linked_records:
-            self.linked_records_df = DataFrame(
-                data=[lr.info.__dict__ for lr in self.linked_records]
-            ).set_index("name")
-            for linked_record in self.linked_records:
-                linked_ds_name = linked_record.ds_name
-                linked_ds_key = linked_record.ds_key
-                linked_ds = Dataset(linked_ds_name, self.project_key)
-                # Get the number of records in the linked dataset
-                count_records = None
-                try:
-                    metrics = self.project.get_dataset(linked_ds_name).compute_metrics(
-                        metric_ids=["records:COUNT_RECORDS"]
-                    )["result"]["computed"]
-                    for m in metrics:
-                        if m["metric"]["metricType"] == "COUNT_RECORDS":
-                            count_records = int(m["value"])
-                except Exception:
-                    pass
-
-                MIN_SQL_ROWS = 1000
-                MAX_IN_MEMORY_ROWS = 10000
-                if is_sql_dataset(linked_ds):
-                    if count_records is not None and count_records <= MIN_SQL_ROWS:
-                        logging.debug(
-                            f"""Loading linked dataset "{linked_ds_name}" in memory since it has less than {MIN_SQL_ROWS} records"""
-                        )
-                        linked_record.df = (
-                            get_dataframe(linked_ds)
-                            .set_index(linked_ds_key)
-                            .head(MAX_IN_MEMORY_ROWS)
-                        )
-                    else:
-                        logging.debug(
-                            f"""Loading linked dataset "{linked_ds_name}" as a DatasetSQL object since it has more than {MIN_SQL_ROWS} records or an unknown number of records"""
-                        )
-                        linked_record.ds = DatasetSQL(linked_ds_name, self.project_key)
-                else:
-                    logging.debug(
-                        f"""Loading linked dataset "{linked_ds_name}" in memory since it isn't on an SQL connection"""
-                    )
-                    if count_records is None:
-                        logging.warning(
-                            f"Unknown number of records for linked dataset {linked_ds_name}"
-                        )
-                    elif count_records > MAX_IN_MEMORY_ROWS:
-                        logging.warning(
-                            f"Linked dataset {linked_ds_name} has {count_records} records — capping at {MAX_IN_MEMORY_ROWS} rows to avoid memory issues"
+
+        # Phases which don't depend on each other run concurrently: they mostly wait for responses of the DSS API
+        with ThreadPoolExecutor(max_workers=STARTUP_MAX_WORKERS, thread_name_prefix="data-editor-startup") as executor:
+            webapp_url_future = executor.submit(timer.timed("find webapp URL", self.__init_webapp_url__))
+            client = api_client()
+            self.project = client.get_project(self.project_key)
+            with timer.phase("read original dataset settings"):
+                self.original_ds = Dataset(self.original_ds_name, self.project_key)
+                original_config = self.original_ds.get_config()
+            self.schema_columns = original_config.get("schema").get("columns")
+            self.schema_columns_df = DataFrame(data=self.schema_columns).set_index("name")
+            self.__boolean_column_names__ = {
+                col["name"] for col in self.schema_columns if col.get("type") == "boolean"
+            }
+            self.__integer_column_names__ = {
+                col["name"] for col in self.schema_columns if col.get("type") in INTEGER_TYPES
+            }
+
+            self.editlog_ds_name = self.original_ds_name + "_editlog"
+            self.edits_ds_name = self.original_ds_name + "_edits"
+            self.edited_ds_name = self.original_ds_name + "_edited"
+
+            self.__connection_name__ = original_config.get("params").get("connection")
+            if self.__connection_name__ is None:
+                self.__connection_name__ = "filesystem_managed"
+
+            self.primary_keys = primary_keys
+            if editable_column_names:
+                self.editable_column_names = editable_column_names
+
+            # For each linked record, add linked dataset/dataframe as attribute
+            self.linked_records = linked_records if linked_records is not None else []
+            linked_record_futures = []
+            if self.linked_records:
+                self.linked_records_df = DataFrame(
+                    data=[lr.info.__dict__ for lr in self.linked_records]
+                ).set_index("name")
+                for linked_record in self.linked_records:
+                    linked_record_futures.append(
+                        executor.submit(
+                            timer.timed(
+                                f'set up linked dataset "{linked_record.ds_name}"',
+                                self.__setup_linked_record__,
+                            ),
+                            linked_record,
+                            linked_labels_cache_ttl,
                         )
-                    linked_record.df = (
-                        get_dataframe(linked_ds)
-                        .set_index(linked_ds_key)
-                        .head(MAX_IN_MEMORY_ROWS)
                     )
 
-        self.editschema_manual = editschema_manual
+            self.editschema_manual = editschema_manual
 
-        if editschema:
-            self.primary_keys = get_primary_keys(editschema)
-            self.editable_column_names = get_editable_column_names(editschema)
-            self.editschema_manual = editschema
-        if self.editschema_manual:
-            self.editschema_manual_df = DataFrame(
-                data=[s.__dict__ for s in self.editschema_manual]
-            ).set_index("name")
-        else:
-            self.editschema_manual_df = DataFrame(
-                data={}
-            )  # this will be an empty dataframe
+            if editschema:
+                self.primary_keys = get_primary_keys(editschema)
+                self.editable_column_names = get_editable_column_names(editschema)
+                self.editschema_manual = editschema
+            if self.editschema_manual:
+                self.editschema_manual_df = DataFrame(
+                    data=[s.__dict__ for s in self.editschema_manual]
+                ).set_index("name")
+            else:
+                self.editschema_manual_df = DataFrame(
+                    data={}
+                )  # this will be an empty dataframe
 
-        self.authorized_users = authorized_users
+            self.authorized_users = authorized_users
 
-        self.freeze_edits = freeze_edits
+            self.freeze_edits = freeze_edits
 
-        self.display_column_names = get_display_column_names(
-            self.schema_columns, self.primary_keys, self.editable_column_names
-        )
+            self.display_column_names = get_display_column_names(
+                self.schema_columns, self.primary_keys, self.editable_column_names
+            )
 
-        # make sure that original dataset and editlog have up-to-date custom fields
-        self.__save_custom_fields__(self.original_ds_name)
-        self.__setup_editlog__()
-        self.__save_custom_fields__(self.editlog_ds_name)
-        self.__setup_editlog_downstream__()
+            editlog_future = executor.submit(timer.timed("set up editlog", self.__setup_editlog__))
+
+            # make sure that original dataset and editlog have up-to-date custom fields (which include the webapp URL)
+            webapp_url_future.result()
+            setup_futures = [
+                executor.submit(
+                    timer.timed("save custom fields of original dataset", self.__save_custom_fields__),
+                    self.original_ds_name,
+                )
+            ]
+            editlog_future.result()
+            setup_futures += [
+                executor.submit(
+                    timer.timed("save custom fields of editlog", self.__save_custom_fields__),
+                    self.editlog_ds_name,
+                ),
+                executor.submit(timer.timed("set up edits and edited datasets", self.__setup_editlog_downstream__)),
+            ]
+            for future in setup_futures + linked_record_futures:
+                future.result()
 
         self.editlog_appender = EditLogAppenderFactory().create(self.editlog_ds)
+        # (build date, original dataframe and column names as returned by get_original_df) and (version, edited dataframe)
+        self.__original_df_cache__: tuple | None = None
+        self.__edited_df_cache__: tuple | None = None
+        self.__edited_df_lock__ = Lock()
+        # distinguishes versions of the edits of this object from those of previous instances, e.g. before the webapp restarted
+        self.__instance_id__ = uuid4().hex
+        self.__editlog_listeners__: List[Callable[[List[EditLog]], None]] = []
+        # Edits made by concurrent requests are grouped into a single write; the edit state is updated in the order of writes
+        self.editlog_writer = GroupCommitEditLogWriter(
+            self.editlog_appender, on_append=self.__on_editlogs_appended__
+        )
+        timer.log_report()
 
     def get_original_df(self):
         """
@@ -331,12 +433,80 @@ class DataEditor:
         """
         return get_dataframe(self.editlog_ds)
 
+    def __build_linked_record_store__(self, linked_record: LinkedRecord, linked_ds: Dataset) -> LinkedRecordStore:
+        """
+        Writes the key, label and lookup columns of a linked dataset to local files, unless they were written for the same build date of this dataset, and returns the store reading them.
+        """
+        try:
+            build_date = get_last_build_date(linked_record.ds_name, self.project)
+        except Exception:
+            logging.warning(
+                f"Failed to get last build date of {linked_record.ds_name}: it will be stored again.",
+                exc_info=True,
+            )
+            build_date = None
+        return LinkedRecordStore.build(
+            iter_dataframe(linked_ds),
+            path=join(LINKED_RECORDS_DIR, self.project_key, linked_record.ds_name),
+            key_col=linked_record.ds_key,
+            label_col=linked_record.ds_label,
+            lookup_cols=linked_record.ds_lookup_columns,
+            build_date=build_date,
+        )
+
+    def __on_editlogs_appended__(self, logs: List[EditLog]) -> None:
+        self.edit_state.append_many(logs)
+        for listener in self.__editlog_listeners__:
+            try:
+                listener(logs)
+            except Exception:
+                logging.exception("Failed to notify listener of appended edit logs.")
+
+    def add_editlog_listener(self, listener: Callable[[List[EditLog]], None]) -> None:
+        """
+        Registers a function to be called with the list of edit logs after each write to the editlog, once the edits are taken into account by this object's read methods.
+
+        Listeners are called by the thread that writes to the editlog, in the order of writes: they should return quickly.
+        """
+        self.__editlog_listeners__.append(listener)
+
+    def get_editlog_writer_stats(self) -> dict:
+        """
+        Returns statistics on the writes made to the editlog: number of writes, of requests and of edit logs, batch sizes and write latencies.
+        """
+        return self.editlog_writer.get_stats()
+
+    def close(self):
+        """
+        Writes the edits submitted so far to the editlog, and stops the thread writing them. Edits can't be made afterwards.
+        """
+        self.editlog_writer.close()
+
+    def get_label_cache_stats(self) -> dict:
+        """
+        Returns statistics on the caches of labels of linked records, by linked dataset name: number of hits and misses, hit rate, number of evictions, expirations and invalidations, and number of cached labels.
+        """
+        return {
+            linked_record.ds_name: linked_record.label_cache.get_stats()
+            for linked_record in self.linked_records
+            if linked_record.label_cache is not None
+        }
+
     def empty_editlog(self):
         """
         Writes an empty dataframe to the editlog dataset.
         """
         self.editlog_ds.spec_item["appendMode"] = False
         write_empty_editlog(self.editlog_ds)
+        self.edit_state.clear()
+
+    def reload_edits(self):
+        """
+        Rebuilds the in-memory state of the edits from the contents of the editlog.
+
+        This is only needed when the editlog was modified by other means than this object's CRUD methods.
+        """
+        self.edit_state.load(get_dataframe(self.editlog_ds))
 
     def get_edited_df_indexed(self) -> DataFrame:
         """
@@ -353,8 +523,60 @@ class DataEditor:
 
         Returns:
             pandas.DataFrame: A DataFrame with all rows and columns from the original data, and edits applied.
+
+        Notes:
+            When the original dataset and the editlog are on the same SQL connection, edits are applied by a query run inside the database (see `sql_utils.py`). Otherwise, or if this fails, they are applied in pandas.
         """
-        return apply_edits_from_df(self.original_ds, self.get_edited_cells_df())
+        try:
+            edited_df = apply_edits_pushdown(self.original_ds, self.editlog_ds, from_editlog=True)
+        except Exception:
+            logging.exception("Failed to apply edits inside the database, applying them in pandas instead.")
+            edited_df = None
+        if edited_df is None:
+            edited_df = apply_edits_from_df(self.original_ds, self.get_edited_cells_df())
+        return edited_df
+
+    def get_version(self) -> str:
+        """
+        Returns an identifier of the current state of the edits, which changes whenever an edit is logged or the edits are reloaded.
+
+        Versions are never reused across instances of DataEditor, so that they can be used as (part of) ETags.
+        """
+        return f"{self.__instance_id__}.{self.edit_state.version}"
+
+    def get_edited_df_cached(self, build_date=None) -> DataFrame:
+        """
+        Returns the edited dataframe, reusing the last one computed by this method as long as no edit was made since.
+
+        The original dataframe is cached separately, for a given build date of the original dataset: when edits are made, they are applied to it again without reading the original dataset. Changes to the original dataset are taken into account when `build_date` changes, or after calling `clear_edited_df_cache`.
+
+        Args:
+            build_date: (Optional) Last build date of the original dataset, as returned by `get_last_build_date`.
+
+        Returns:
+            pandas.DataFrame: A DataFrame with all rows and columns from the original data, and edits applied. It must not be modified.
+        """
+        with self.__edited_df_lock__:
+            if self.__original_df_cache__ is None or self.__original_df_cache__[0] != build_date:
+                self.__original_df_cache__ = (build_date, *get_original_df(self.original_ds))
+                self.__edited_df_cache__ = None
+            version = self.edit_state.version
+            if self.__edited_df_cache__ is None or self.__edited_df_cache__[0] != version:
+                original_df, primary_keys, display_columns, editable_columns = self.__original_df_cache__[1:]
+                # apply_edits_to_df sets the index of the original dataframe in place
+                edited_df = apply_edits_to_df(
+                    original_df.copy(), primary_keys, display_columns, editable_columns, self.get_edited_cells_df()
+                )
+                self.__edited_df_cache__ = (version, edited_df)
+            return self.__edited_df_cache__[1]
+
+    def clear_edited_df_cache(self):
+        """
+        Clears the original and edited dataframes cached by `get_edited_df_cached`, e.g. when the original dataset has changed.
+        """
+        with self.__edited_df_lock__:
+            self.__original_df_cache__ = None
+            self.__edited_df_cache__ = None
 
     def get_edited_cells_df_indexed(self) -> DataFrame:
         """
@@ -374,9 +596,7 @@ class DataEditor:
             pandas.DataFrame:
                 A DataFrame containing only the edited rows and editable columns.
         """
-        return replay_edits(
-            self.editlog_ds, self.primary_keys, self.editable_column_names
-        )
+        return self.edit_state.get_edited_cells_df()
 
     def get_row(self, primary_keys):
         """
@@ -390,80 +610,111 @@ class DataEditor:
                 }
 
         Returns:
-            pandas.DataFrame:
-                A single-row dataframe containing the values of editable columns, indexed by the primary keys. Example:
+            pandas.Series:
+                The values of editable columns in the row, named after the primary key values (like a row of `get_edited_cells_df_indexed`). Example:
                 ```
-                key1        key2        editable_column1    editable_column2
-                "cat"       2022-12-21  "hello"             42
+                editable_column1    "hello"
+                editable_column2    42
+                last_edit_date      "2022-12-21T10:00:00"
+                last_action         "update"
+                first_action        "update"
+                Name: (cat, 2022-12-21)
                 ```
 
+        Raises:
+            KeyError: If the row wasn't edited.
+
         Notes:
-            - The current implementation loads all edited rows in memory, then filters the rows that match the provided primary key values.
+            - The row is looked up by key in the in-memory state of the edits, which takes the same time whatever the size of the editlog.
             - This method does not read rows that were not edited, and it does not read columns which are not editable.
                 - If some rows of the dataset were created, then by definition all columns are editable (including primary keys).
                 - If no row was created, editable columns are those defined in the initial Visual Edit setup.
         """
         key = get_key_values_from_dict(primary_keys, self.primary_keys)
-        return self.get_edited_cells_df_indexed().loc[key]
-
-    def __log_edit__(
-        self, key, column, value, action="update"
-    ) -> EditSuccess | EditFailure | EditUnauthorized | EditFreezed:
-        if self.freeze_edits:
-            return EditFreezed()
+        # keys are stored in the editlog (and in the state) as strings
+        row = self.edit_state.get_row(str(key))
+        if row is None:
+            raise KeyError(key)
+        return Series(row, name=key)
 
+    def __get_value_string__(self, column, value) -> str | None:
         # if the type of column_name is a boolean, make sure we read it correctly
-        for col in self.schema_columns:
-            if col["name"] == column:
-                if isinstance(value, str) and col.get("type") == "boolean":
-                    if value == "":
-                        value = None
-                    else:
-                        value = str(loads(value.lower()))
-                break
+        if isinstance(value, str) and column in self.__boolean_column_names__:
+            if value == "":
+                value = None
+            else:
+                value = str(loads(value.lower()))
 
         # store value as a string, unless it's None
         if value is not None:
-            value_string = str(value)
+            return str(value)
         else:
-            value_string = value
+            return value
+
+    def __log_edit__(
+        self, key, column, value, action="update"
+    ) -> EditSuccess | EditFailure | EditUnauthorized | EditFreezed:
+        return self.__log_edits__([(key, column, value, action)])[0]
+
+    def __log_edits__(
+        self, edits: List[tuple]
+    ) -> List[EditSuccess | EditFailure | EditUnauthorized | EditFreezed]:
+        """
+        Logs edits given as (key, column, value, action) tuples. Valid edits are appended to the editlog in a single write: either all of them are added, or none of them. This write may also include edits logged concurrently by other requests (see `GroupCommitEditLogWriter`).
+
+        Returns a list with the result of each edit, in the same order as the edits.
+        """
+        if self.freeze_edits:
+            return [EditFreezed() for _ in edits]
 
         user_identifier = try_get_user_identifier()
         if self.authorized_users and (
             user_identifier is None or user_identifier not in self.authorized_users
         ):
-            logging.debug(
-                f"""Logging {action} action unauthorized ('{user_identifier}'): column {column} set to value {value} where {self.primary_keys} is {key}."""
-            )
-            return EditUnauthorized()
-        else:
+            for key, column, value, action in edits:
+                logging.debug(
+                    f"""Logging {action} action unauthorized ('{user_identifier}'): column {column} set to value {value} where {self.primary_keys} is {key}."""
+                )
+            return [EditUnauthorized() for _ in edits]
+
+        results: List[EditSuccess | EditFailure | EditUnauthorized | EditFreezed] = []
+        logs = []
+        for key, column, value, action in edits:
             if column in self.editable_column_names or action == "delete":
-                # add to the editlog
-                try:
-                    self.editlog_appender.append(
-                        EditLog(
-                            str(key),
-                            column,
-                            value_string,
-                            datetime.now(timezone("UTC")).isoformat(),
-                            "unknown" if user_identifier is None else user_identifier,
-                            action,
-                        )
-                    )
-                    logging.debug(
-                        f"""Logging {action} action success: column {column} set to value {value} where {self.primary_keys} is {key}."""
-                    )
-                    return EditSuccess()
-                except Exception:
-                    logging.exception("Failed to append edit log.")
-                    return EditFailure(
-                        "Internal server error, failed to append edit log."
+                logs.append(
+                    EditLog(
+                        str(key),
+                        column,
+                        self.__get_value_string__(column, value),
+                        datetime.now(timezone("UTC")).isoformat(),
+                        "unknown" if user_identifier is None else user_identifier,
+                        action,
                     )
+                )
+                results.append(EditSuccess())
             else:
                 logging.info(
                     f"""Logging {action} action failed: column {column} set to value {value} where {self.primary_keys} is {key}."""
                 )
-                return EditFailure(f"""{column} isn't an editable column.""")
+                results.append(EditFailure(f"""{column} isn't an editable column."""))
+
+        if logs:
+            # add to the editlog
+            try:
+                self.editlog_writer.write(logs)
+            except Exception:
+                logging.exception("Failed to append edit log.")
+                return [
+                    EditFailure("Internal server error, failed to append edit log.")
+                    if isinstance(r, EditSuccess)
+                    else r
+                    for r in results
+                ]
+            for log in logs:
+                logging.debug(
+                    f"""Logging {log.action} action success: column {log.column_name} set to value {log.value} where {self.primary_keys} is {log.key}."""
+                )
+        return results
 
     def create_row(self, primary_keys: dict, column_values: dict) -> str:
         """
@@ -486,10 +737,9 @@ class DataEditor:
             return "Edits are disabled."
 
         key = get_key_values_from_dict(primary_keys, self.primary_keys)
-        for col in column_values.keys():
-            self.__log_edit__(
-                key=key, column=col, value=column_values.get(col), action="create"
-            )
+        self.__log_edits__(
+            [(key, col, column_values.get(col), "create") for col in column_values.keys()]
+        )
         return "Row successfully created"
 
     def update_row(
@@ -522,15 +772,15 @@ class DataEditor:
 
         # When updating the validation column, we first create a log entry for each editable column, to enforce values even after a change in the original.
         # We then log the new value of the validation column.
-        # To improve this, the best would be to do all the inserts in the same transaction.
+        # All these entries are appended to the editlog in the same write.
         if is_validation_column(column):
-            results = []
+            edits = []
             for col in self.editable_column_names:
                 if not is_comments_column(col) and not is_validation_column(col):
                     # contains values for primary keys — and other columns too, but they'll be discarded
-                    results.append(self.__log_edit__(key, col, primary_keys[col]))
-            results.append(self.__log_edit__(key, column, primary_keys[column]))
-            return results
+                    edits.append((key, col, primary_keys[col], "update"))
+            edits.append((key, column, primary_keys[column], "update"))
+            return self.__log_edits__(edits)
         else:
             return [self.__log_edit__(key, column, value, action="update")]
 
@@ -551,3 +801,112 @@ class DataEditor:
         """
         key = get_key_values_from_dict(primary_keys, self.primary_keys)
         return self.__log_edit__(key, None, None, action="delete")
+
+    def __get_bulk_value__(self, column, value):
+        # None for missing values; integers in columns which pandas turned into floats because of missing values
+        if isna(value):
+            return None
+        if isinstance(value, float) and value.is_integer() and column in self.__integer_column_names__:
+            return int(value)
+        return value
+
+    def __get_bulk_keys__(self, rows: DataFrame) -> list:
+        # same values as get_key_values_from_dict, for each row
+        missing_keys = [key for key in self.primary_keys if key not in rows.columns]
+        if missing_keys:
+            raise ValueError(f"Missing primary key column(s): {', '.join(missing_keys)}")
+        keys_df = rows[self.primary_keys].astype(object)
+        if len(self.primary_keys) == 1:
+            return [self.__get_bulk_value__(self.primary_keys[0], key) for key in keys_df[self.primary_keys[0]]]
+        return [
+            tuple(
+                nan if value is None else value
+                for value in map(self.__get_bulk_value__, self.primary_keys, key)
+            )
+            for key in keys_df.itertuples(index=False, name=None)
+        ]
+
+    def __get_bulk_values__(self, rows: DataFrame) -> List[tuple]:
+        # (column, value) pairs of each row, for columns other than primary keys, with None for missing values
+        columns = [col for col in rows.columns if col not in self.primary_keys]
+        return [
+            [(col, self.__get_bulk_value__(col, value)) for col, value in zip(columns, values)]
+            for values in rows[columns].astype(object).itertuples(index=False, name=None)
+        ]
+
+    def create_rows(self, rows: DataFrame) -> List[EditSuccess | EditFailure | EditUnauthorized | EditFreezed]:
+        """
+        Creates new rows, in a single write to the editlog.
+
+        Args:
+            rows (pandas.DataFrame): A dataframe with a column for each primary key, and columns for the values of the new rows. Example:
+                ```
+                id      col1    col2
+                "a"     "hey"   42
+                "b"     "ho"    None
+                ```
+
+        Returns:
+            list: The result of logging each cell, row by row and column by column (see `update_row`).
+
+        Raises:
+            ValueError: If a primary key column is missing.
+
+        Notes:
+            - Like `create_row`, this method does not check that the values are allowed for the specified columns, nor that rows don't already exist.
+            - Missing values are logged too, so that rows are created even if they only have values for primary keys.
+        """
+        return self.__log_edits__(
+            [
+                (key, col, value, "create")
+                for key, values in zip(self.__get_bulk_keys__(rows), self.__get_bulk_values__(rows))
+                for col, value in values
+            ]
+        )
+
+    def update_rows(self, rows: DataFrame) -> List[EditSuccess | EditFailure | EditUnauthorized | EditFreezed]:
+        """
+        Updates cells of many rows, in a single write to the editlog.
+
+        Args:
+            rows (pandas.DataFrame): A dataframe with a column for each primary key, and columns for the new values of the cells to update. Example:
+                ```
+                id      col1    col2
+                "a"     "hey"   42
+                "b"     None    43
+                ```
+
+        Returns:
+            list: The result of logging each updated cell, row by row and column by column (see `update_row`).
+
+        Raises:
+            ValueError: If a primary key column is missing.
+
+        Notes:
+            - Missing values (None or NaN) are not logged: in the example above, the value of `col1` for row "b" is left unchanged. This allows updating different columns in different rows. To empty a cell, use `update_row`.
+            - Unlike `update_row`, updating a validation column doesn't log the values of other editable columns, unless they are part of `rows`.
+            - If some edits are invalid (e.g. a column isn't editable), the others are still logged; either all valid edits are written, or none of them.
+        """
+        return self.__log_edits__(
+            [
+                (key, col, value, "update")
+                for key, values in zip(self.__get_bulk_keys__(rows), self.__get_bulk_values__(rows))
+                for col, value in values
+                if value is not None
+            ]
+        )
+
+    def delete_rows(self, rows: DataFrame) -> List[EditSuccess | EditFailure | EditUnauthorized | EditFreezed]:
+        """
+        Deletes rows identified by their primary key(s), in a single write to the editlog.
+
+        Args:
+            rows (pandas.DataFrame): A dataframe with a column for each primary key; other columns are ignored.
+
+        Returns:
+            list: The result of logging the deletion of each row.
+
+        Raises:
+            ValueError: If a primary key column is missing.
+        """
+        return self.__log_edits__([(key, None, None, "delete") for key in self.__get_bulk_keys__(rows)])
@@ -1,9 +1,14 @@
 import logging
 from dataiku import Dataset, SQLExecutor2, api_client, get_custom_variables
-from dataiku.sql import SelectQuery, Column, toSQL
+from dataiku.sql import SelectQuery, Column, Constant, InlineSQL, List, toSQL
 
 client = api_client()
 
+# Maximum number of key values in a single query, to stay below the limits of SQL dialects on the size of IN lists (e.g. 1000 for Oracle)
+MAX_KEYS_PER_QUERY = 1000
+
+INTEGER_TYPES = ["tinyint", "smallint", "int", "bigint"]
+
 
 class DatasetSQL:
     def __init__(self, name, project_key):
@@ -24,6 +29,7 @@ class DatasetSQL:
         node = get_custom_variables(project_key).get("NODE")
         if node:
             self.table_name = self.table_name.replace("${NODE}", node)
+        self.schema_types = {col.get("name"): col.get("type") for col in self.dataset.read_schema()}
 
     def __get_safe_query__(self, key_column_name, key_value, column_name):
         select_query = SelectQuery()
@@ -38,6 +44,99 @@ class DatasetSQL:
             logging.exception("Error when generating query.")
             raise
 
+    def __cast_key_value__(self, key_column_name, key_value):
+        """Cast a key value, which may have been received as a string, to the type of the key column"""
+        key_type = self.schema_types.get(key_column_name)
+        if key_type in INTEGER_TYPES:
+            try:
+                return int(key_value)
+            except ValueError:
+                # strings such as "3.0"; integers above 2^53 lose precision as floats, so this isn't done first
+                return int(float(key_value))
+        if key_type in ["float", "double"]:
+            return float(key_value)
+        return key_value
+
+    def __get_safe_bulk_query__(self, key_column_name, key_values, column_name):
+        select_query = SelectQuery()
+        select_query.select_from(self.dataset)
+        select_query.select([Column(key_column_name), Column(column_name)])
+        select_query.where(Column(key_column_name).in_(List(*[Constant(key_value) for key_value in key_values])))
+
+        try:
+            return toSQL(select_query, self.dataset)
+        except Exception:
+            logging.exception("Error when generating query.")
+            raise
+
+    def get_cell_values(self, key_column_name, key_values, column_name):
+        """
+        Get the values of cells identified by many key values and a column name, using one query for every MAX_KEYS_PER_QUERY key values
+
+        Params:
+        - key_column_name: name of the column containing the key
+        - key_values: values of the key (empty values are ignored)
+        - column_name: name of the column containing the values to return
+
+        Returns: dict mapping each key value found in the dataset to the corresponding cell value, with key values cast to the type of the key column
+        """
+        cast_key_values = []
+        for key_value in key_values:
+            if key_value is None or key_value == "" or key_value == "null":
+                continue
+            try:
+                cast_key_values.append(self.__cast_key_value__(key_column_name, key_value))
+            except ValueError:
+                logging.warning(f"Invalid value for key column {key_column_name}: {key_value}")
+        key_values = list(dict.fromkeys(cast_key_values))
+        cell_values = {}
+        for start in range(0, len(key_values), MAX_KEYS_PER_QUERY):
+            streamed_query = client.sql_query(
+                query=self.__get_safe_bulk_query__(
+                    key_column_name, key_values[start : start + MAX_KEYS_PER_QUERY], column_name
+                ),
+                connection=self.connection_name,
+                project_key=self.project_key,
+            )
+            for row in streamed_query.iter_rows():
+                # like in get_cell_value_sql_query, the first row found for a key gives its value
+                cell_values.setdefault(self.__cast_key_value__(key_column_name, row[0]), row[1])
+        return cell_values
+
+    def get_rows_by_prefix(self, column_names, filter_column_name, prefix, n_results):
+        """
+        Get the first rows of the dataset whose value in a column starts with a prefix (regardless of case), using a SQL query which only selects the given columns
+
+        Params:
+        - column_names: names of the columns to return
+        - filter_column_name: name of the column to filter on, which must be a string column unless the prefix is empty
+        - prefix: lower-cased prefix, without LIKE wildcards (`%` and `_`); all rows match an empty prefix
+        - n_results: maximum number of rows to return
+
+        Returns: DataFrame with default index
+        """
+        if "%" in prefix or "_" in prefix:
+            raise ValueError("The prefix can't contain LIKE wildcards.")
+        if prefix != "" and self.schema_types.get(filter_column_name) != "string":
+            # LOWER isn't defined on other types by all SQL dialects (e.g. integers in PostgreSQL)
+            raise ValueError(f"Column {filter_column_name} isn't a string column.")
+        select_query = SelectQuery()
+        select_query.select_from(self.dataset)
+        select_query.select([Column(column_name) for column_name in dict.fromkeys(column_names)])
+        if prefix != "":
+            filter_column = toSQL(Column(filter_column_name), dataset=self.dataset)
+            pattern = toSQL(Constant(prefix + "%"), dataset=self.dataset)
+            # a prefix pattern can use an index on the lower-cased column, unlike the formula filters of the DSS data API
+            select_query.where(InlineSQL(f"LOWER({filter_column}) LIKE {pattern}"))
+        select_query.limit(n_results)
+
+        try:
+            query = toSQL(select_query, self.dataset)
+        except Exception:
+            logging.exception("Error when generating query.")
+            raise
+        return self.executor.query_to_df(query)
+
     def get_cell_value_executor(self, key_column_name, key_value, column_name):
         """
         Get the value of a cell identified by a key value and a column name, using a SQLExecutor2 object
@@ -1,13 +1,39 @@
 from __future__ import annotations
 
 import logging
+from ast import literal_eval
 from typing import Union
 
 import dataiku
 from flask import request
-from pandas import DataFrame, Int64Dtype, concat, options, pivot_table
+from dataiku.sql import Column, Constant, toSQL
+from numpy import generic, nan
+from pandas import (
+    DataFrame,
+    Int64Dtype,
+    MultiIndex,
+    Series,
+    array as pd_array,
+    concat,
+    factorize,
+    isnull,
+    options,
+    to_datetime,
+    to_numeric,
+)
 from pandas.api.types import is_float_dtype, is_integer_dtype
 
+from sql_utils import (
+    PUSHDOWN_DATABASE_TYPES,
+    can_push_down,
+    can_push_down_replay,
+    get_apply_edits_query,
+    get_edited_query,
+    get_replay_edits_query,
+)
+from dataiku_utils import is_sql_dataset
+from webapp.db.querybuilder import get_table_name_from_dataset
+
 # Editlog utils - used by Empty Editlog step and by DataEditor for initialization of editlog
 
 
@@ -22,33 +48,44 @@ def write_empty_editlog(editlog_ds):
 # Utils for DataEditor and plugin components (recipes and scenario steps)
 
 
+# Used by __unpack_keys__ below
+def __parse_key__(key):
+    """
+    Parse a key value found in the editlog into a tuple of key values
+
+    Keys of datasets with multiple primary keys are stored as the string representation of a tuple, e.g. `"('cat', 2022)"`. These strings are parsed as Python literals: unlike `eval`, this can't execute code found in the editlog.
+    """
+    try:
+        values = literal_eval(key)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        logging.warning(f"Failed to parse key {key!r} found in the editlog.")
+        return ()
+    return values if isinstance(values, tuple) else (values,)
+
+
 # Used by replay_edits method below
 def __unpack_keys__(df, new_key_names, old_key_name="key"):
     if len(new_key_names) == 1:
         df.rename(columns={old_key_name: new_key_names[0]}, inplace=True)
     else:
-        # 1. Convert key values from strings to tuples
-        keys_series = df.apply(lambda row: eval(row[old_key_name]), axis=1)
-
-        # 2. Expand tuples found in keys_series into a dataframe with new_key_names as columns
-        #    If no key value was found in the tuple, the dataframe will have a missing value
-        #    (Previously we were using result_type="expand", but this fails when
-        #     the results of the unpack function are arrays of different lengths)
-        keys_df = DataFrame(columns=new_key_names)
-        i1 = 0
-        for t in keys_series:
-            # create a dict `d` that holds, for each of the new keys, the value found in tuple `t` (and nothing if no value is found)
-            d = {}
-            i2 = 0
-            for k in new_key_names:
-                if i2 < len(t):
-                    # this assumes that keys are in the same order in the tuples coming from the editlog and in new_key_names
-                    d[k] = t[i2]
-                i2 += 1
-            keys_df = concat([keys_df, DataFrame(data=d, index=[i1])])
-            i1 += 1
+        # 1. Parse each distinct key value only once, from string to tuple (missing keys are given the code -1)
+        codes, unique_keys = factorize(df[old_key_name])
+
+        # 2. Expand tuples into rows with one value per key listed in new_key_names, in a single pass
+        #    If no key value was found in the tuple, the row will have a missing value
+        #    (this assumes that keys are in the same order in the tuples coming from the editlog and in new_key_names)
+        n_keys = len(new_key_names)
+        unique_rows = []
+        for key in unique_keys:
+            values = __parse_key__(key)[:n_keys]
+            unique_rows.append(values + (None,) * (n_keys - len(values)))
+        # last row is used for missing keys
+        unique_rows.append((None,) * n_keys)
+        codes[codes == -1] = len(unique_keys)
+        keys_df = DataFrame.from_records(unique_rows, columns=new_key_names).take(codes)
 
         # 3. Add a column to edits for each key listed in primary_keys
+        keys_df.index = df.index
         df[new_key_names] = keys_df
 
         # 4. Remove the old key column
@@ -57,9 +94,19 @@ def __unpack_keys__(df, new_key_names, old_key_name="key"):
     return df
 
 
-def get_dataframe(mydataset):
-    # Get the dataframe from the dataset, using data types as given by its schema, Int64 for integer columns, and str for boolean columns
-    #
+# Number of rows read at once from a dataset
+DEFAULT_CHUNKSIZE = 10000
+
+# Dataiku schema types read as Int64
+INTEGER_TYPES = ["tinyint", "smallint", "int", "bigint"]
+
+
+def iter_dataframe(mydataset, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Iterate over the rows of a dataset, as dataframes of at most `chunksize` rows, using data types as given by its schema, Int64 for integer columns, and str for boolean columns
+
+    This allows processing a dataset without loading it entirely in memory.
+    """
     # Note: an alternative would be to use mydataset.get_dataframe(infer_with_pandas=False, bool_as_str=True), but this fails when there are missing values in integer columns.
 
     # Get the right column types: this would be given by the dataset's schema, except when dealing with integers where we want to enforce the use of Pandas' Int64 type (see https://pandas.pydata.org/pandas-docs/stable/user_guide/integer_na.html).
@@ -68,64 +115,88 @@ def get_dataframe(mydataset):
     for col in myschema:
         n = col["name"]
         t = col["type"]
-        if t in ["tinyint", "smallint", "int", "bigint"]:
+        if t in INTEGER_TYPES:
             dtypes[n] = "Int64"
 
-    # Get the dataframe, using iter_dataframes_forced_types to which we can pass our column types. This code was inspired from the example at https://developer.dataiku.com/latest/api-reference/python/datasets.html#dataiku.Dataset.iter_dataframes_forced_types
-    mydataset_df = DataFrame({})
-    chunksize = 1000
-    for df in mydataset.iter_dataframes_forced_types(names, dtypes, parse_date_columns, chunksize=chunksize):
-        mydataset_df = concat([mydataset_df, df])
-    return mydataset_df
+    # Get the dataframes, using iter_dataframes_forced_types to which we can pass our column types. This code was inspired from the example at https://developer.dataiku.com/latest/api-reference/python/datasets.html#dataiku.Dataset.iter_dataframes_forced_types
+    yield from mydataset.iter_dataframes_forced_types(names, dtypes, parse_date_columns, chunksize=chunksize)
+
+
+def get_dataframe(mydataset, chunksize=DEFAULT_CHUNKSIZE, limit=None):
+    """
+    Get the dataframe from the dataset, using data types as given by its schema (see `iter_dataframe`)
+
+    Chunks are collected and concatenated once at the end, to avoid copying the data read so far each time a chunk is read. When `limit` is provided, reading stops as soon as this number of rows is reached.
+    """
+    chunks = []
+    n_rows = 0
+    for df in iter_dataframe(mydataset, chunksize=chunksize):
+        if limit is not None and n_rows + len(df) >= limit:
+            chunks.append(df.head(limit - n_rows))
+            break
+        chunks.append(df)
+        n_rows += len(df)
+    if not chunks:
+        return DataFrame({})
+    if len(chunks) == 1:
+        return chunks[0]
+    return concat(chunks)
 
 
 # Used by Replay recipe and by DataEditor for getting edited cells
 
 
 def replay_edits(editlog_ds, primary_keys, editable_column_names):
+    return replay_edits_from_df(get_dataframe(editlog_ds), primary_keys, editable_column_names)
+
+
+def replay_edits_from_df(editlog_df, primary_keys, editable_column_names):
     # Create empty dataframe with the proper edits dataset schema: all primary keys, all editable columns, and "date" column
     # This helps ensure that the dataframe we return always has the right schema
     # (even if some columns of the input dataset were never edited)
     cols = primary_keys + editable_column_names + ["last_edit_date", "last_action", "first_action"]
     all_columns_df = DataFrame(columns=cols)
 
-    editlog_df = get_dataframe(editlog_ds)
     if not editlog_df.size:  # i.e. if empty editlog
-        edits_df = all_columns_df
-    else:
-        editlog_df.rename(columns={"date": "edit_date"}, inplace=True)
-        editlog_df = __unpack_keys__(editlog_df, primary_keys).sort_values("edit_date")
-
-        # if "action" is not in the editlog's columns, we add it and set all values to "update"
-        if "action" not in editlog_df.columns:
-            editlog_df["action"] = "update"
+        return all_columns_df
+
+    editlog_df = editlog_df.rename(columns={"date": "edit_date"})
+    # a stable sort keeps edits made at the same date in the order in which they were logged
+    editlog_df = __unpack_keys__(editlog_df, primary_keys).sort_values("edit_date", kind="stable")
+    # rows with missing key values can't be attributed to a row of the original dataset
+    editlog_df = editlog_df.dropna(subset=primary_keys)
+
+    # if "action" is not in the editlog's columns, we add it and set all values to "update"
+    if "action" not in editlog_df.columns:
+        editlog_df["action"] = "update"
+
+    # for each key, compute last edit date, last action and first action
+    editlog_grouped = editlog_df[primary_keys + ["edit_date", "action"]].groupby(primary_keys)
+    editlog_grouped_df = (
+        editlog_grouped.last()
+        .add_prefix("last_")
+        .join(editlog_grouped[["action"]].first().add_prefix("first_"))
+    )
 
-        # for each key, compute last edit date, last action and first action
-        editlog_grouped_last = (
-            editlog_df[primary_keys + ["edit_date", "action"]].groupby(primary_keys).last().add_prefix("last_")
-        )
-        editlog_grouped_first = editlog_df[primary_keys + ["action"]].groupby(primary_keys).first().add_prefix("first_")
-        editlog_grouped_df = editlog_grouped_last.join(editlog_grouped_first, on=primary_keys)
-
-        edits_df = pivot_table(
-            editlog_df,
-            index=primary_keys,
-            columns="column_name",
-            values="value",
-            # for each named column, we only keep the last value
-            aggfunc=lambda values: values.iloc[-1] if not values.empty else None,
-        ).join(editlog_grouped_df, on=primary_keys)
-
-        # Drop any columns from the pivot that may not be one of the editable_column_names
-        for col in edits_df.columns:
-            if col not in cols:
-                edits_df.drop(columns=[col], inplace=True)
+    # for each key and named column, only keep the last value, then turn column names into columns
+    # (rows without a column name, e.g. for delete actions, are only used for the actions computed above)
+    last_values_df = editlog_df[editlog_df["column_name"].notnull()].drop_duplicates(
+        subset=primary_keys + ["column_name"], keep="last"
+    )
+    if last_values_df.empty:
+        return all_columns_df
+    last_values = last_values_df.set_index(primary_keys + ["column_name"])["value"]
+    # missing values may be None or NaN; like the pivot we used to do, represent them all as NaN
+    edits_df = last_values.where(last_values.notnull()).unstack("column_name")
+    # keys whose last values are all missing are discarded
+    edits_df = edits_df.dropna(how="all").join(editlog_grouped_df)
 
-        edits_df.reset_index(inplace=True)
-        # this makes sure that all (editable) columns are here and in the right order
-        edits_df = concat([all_columns_df, edits_df])
+    # Drop any columns from the pivot that may not be one of the editable_column_names
+    edits_df = edits_df[[col for col in edits_df.columns if col in cols]]
 
-    return edits_df
+    edits_df.reset_index(inplace=True)
+    # this makes sure that all (editable) columns are here and in the right order
+    return concat([all_columns_df, edits_df])
 
 
 # Used by get_original_df below and by DataEditor for init
@@ -157,6 +228,11 @@ def get_original_df(original_ds):
 # Used by Apply recipe and by DataEditor for getting edited data
 def apply_edits_from_df(original_ds, edits_df):
     original_df, primary_keys, display_columns, editable_columns = get_original_df(original_ds)
+    return apply_edits_to_df(original_df, primary_keys, display_columns, editable_columns, edits_df)
+
+
+# Used by apply_edits_from_df above and by Apply recipe in incremental mode, on a subset of the original rows
+def apply_edits_to_df(original_df, primary_keys, display_columns, editable_columns, edits_df):
     # this will contain the list of new columns coming from edits dataset but not found in the original dataset's schema
     editable_columns_new = []
 
@@ -231,6 +307,265 @@ def apply_edits_from_df(original_ds, edits_df):
     return edited_df
 
 
+def __get_original_settings__(original_ds):
+    """Returns the schema columns, primary keys, display columns and editable columns of the original dataset (see `get_original_df`)"""
+    original_ds_config = original_ds.get_config()
+    schema = original_ds_config.get("schema").get("columns")
+    schema_column_names = [col.get("name") for col in schema]
+    primary_keys = original_ds_config["customFields"]["primary_keys"]
+    editable_column_names = [
+        col for col in original_ds_config["customFields"]["editable_column_names"] if col in schema_column_names
+    ]
+    display_column_names = get_display_column_names(schema, primary_keys, editable_column_names)
+    return schema, primary_keys, display_column_names, editable_column_names
+
+
+def __to_int64__(values: Series) -> Series:
+    """Convert values to the Int64 type without going through floats, which can't represent integers above 2^53 exactly"""
+    if is_integer_dtype(values.dtype) or is_float_dtype(values.dtype):
+        return values.astype(Int64Dtype())
+    return Series(
+        pd_array([None if isnull(value) else __parse_int__(value) for value in values], dtype=Int64Dtype()),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def __parse_int__(value) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        # strings such as "3.0"
+        return int(float(value))
+
+
+def __force_integer_types__(df, schema):
+    """Use the Int64 type for integer columns, like get_dataframe, in a dataframe read with SQLExecutor2"""
+    for col in schema:
+        if col.get("type") in INTEGER_TYPES and col.get("name") in df.columns:
+            df[col.get("name")] = __to_int64__(df[col.get("name")])
+    return df
+
+
+def __get_pushdown_connection__(dataset):
+    """Returns the name of the dataset's SQL connection if the dataset is a table on a database supporting pushdown, None otherwise"""
+    location_info = dataset.get_location_info()
+    if location_info.get("locationInfoType") != "SQL":
+        return None
+    if location_info.get("info", {}).get("databaseType") not in PUSHDOWN_DATABASE_TYPES:
+        return None
+    return dataset.get_config()["params"]["connection"]
+
+
+# Used by Replay recipe
+def replay_edits_pushdown(editlog_ds, edits_ds, primary_keys, editable_column_names):
+    """
+    Replay edits with a single query run inside the database, whose results are written to the edits dataset without going through pandas (see `sql_utils.py`).
+
+    Returns: True if edits were replayed, False if the editlog doesn't allow pushdown (not on a supported SQL connection, or settings not supported by `sql_utils.can_push_down_replay`), in which case `replay_edits` should be used.
+    """
+    if __get_pushdown_connection__(editlog_ds) is None:
+        return False
+    if not can_push_down_replay(primary_keys, editable_column_names):
+        return False
+    if "action" not in [col.get("name") for col in editlog_ds.read_schema()]:
+        return False
+    query = get_replay_edits_query(get_table_name_from_dataset(editlog_ds), primary_keys[0], editable_column_names)
+    dataiku.SQLExecutor2.exec_recipe_fragment(edits_ds, query, overwrite_output_schema=True)
+    return True
+
+
+# Used by Apply recipe and by DataEditor for getting edited data
+def apply_edits_pushdown(original_ds, edits_ds, from_editlog=False):
+    """
+    Compute the edited data with a single query run inside the database, instead of loading the original and edits datasets in pandas (see `sql_utils.py`).
+
+    Params:
+    - original_ds: original dataset
+    - edits_ds: editlog dataset if `from_editlog` is True, edits dataset written by the Replay recipe otherwise
+    - from_editlog: whether edits should be replayed from an editlog
+
+    Returns: the edited dataframe, with the same columns as `apply_edits_from_df`, or None if the datasets don't allow pushdown (not on the same SQL connection, or settings not supported by `sql_utils.can_push_down`).
+    """
+    connection = __get_pushdown_connection__(original_ds)
+    if connection is None or __get_pushdown_connection__(edits_ds) != connection:
+        return None
+
+    schema, primary_keys, display_column_names, editable_column_names = __get_original_settings__(original_ds)
+    if not can_push_down(primary_keys, schema, editable_column_names):
+        return None
+
+    edits_column_names = [col.get("name") for col in edits_ds.read_schema()]
+    original_table = get_table_name_from_dataset(original_ds)
+    edits_table = get_table_name_from_dataset(edits_ds)
+    if from_editlog:
+        if "action" not in edits_column_names:
+            return None
+        query = get_edited_query(
+            original_table, edits_table, primary_keys[0], schema, display_column_names, editable_column_names
+        )
+    else:
+        edited_column_names = [
+            col for col in edits_column_names if col not in primary_keys + ["last_edit_date", "last_action", "first_action"]
+        ]
+        if not set(edited_column_names).issubset(editable_column_names) or primary_keys[0] not in edits_column_names:
+            # edits of columns which aren't in the original dataset are only supported by apply_edits_from_df
+            return None
+        query = get_apply_edits_query(
+            original_table,
+            f"SELECT * FROM {edits_table}",
+            primary_keys[0],
+            schema,
+            display_column_names,
+            editable_column_names,
+            edited_column_names,
+        )
+
+    edited_df = dataiku.SQLExecutor2(dataset=original_ds).query_to_df(query, infer_from_schema=True)
+    return __force_integer_types__(edited_df, schema)[primary_keys + display_column_names + editable_column_names]
+
+
+# Incremental mode of the Apply recipe
+
+# Maximum number of keys in the WHERE clause of a single query
+MAX_KEYS_PER_QUERY = 1000
+# Maximum number of edited keys saved in the watermark; above this, the next run recomputes all rows
+MAX_WATERMARK_KEYS = 10000
+
+
+def get_watermark(edits_df, primary_keys, original_build_date, columns):
+    """
+    Get the watermark saved by the Apply recipe in incremental mode, describing the edits it processed
+
+    Params:
+    - edits_df: edits written by the Replay recipe
+    - primary_keys: primary key column names
+    - original_build_date: last build date of the original dataset
+    - columns: names of the columns of the edited dataset
+
+    The edited keys are saved so that the next run can find the keys which aren't in the edits anymore; the watermark is a custom field of the edited dataset, so they are only saved when there are at most MAX_WATERMARK_KEYS of them.
+    """
+    edit_dates = to_datetime(edits_df["last_edit_date"], utc=True, errors="coerce").dropna()
+    return {
+        "last_edit_date": edit_dates.max().isoformat() if len(edit_dates) else None,
+        "edited_keys": (
+            edits_df[primary_keys].astype(str).values.tolist() if len(edits_df) <= MAX_WATERMARK_KEYS else None
+        ),
+        "original_build_date": original_build_date,
+        "columns": columns,
+    }
+
+
+def get_incremental_keys(edits_df, primary_keys, watermark):
+    """
+    Get the keys of the rows to recompute, based on the watermark saved by the last run of the Apply recipe in incremental mode
+
+    These are the keys edited after the watermark, and the keys which were edited before the watermark but aren't in the edits anymore (because all their edited values were emptied since): their rows must go back to their original values.
+
+    Params:
+    - edits_df: edits written by the Replay recipe
+    - primary_keys: primary key column names
+    - watermark: watermark returned by `get_watermark` after the last run
+
+    Returns: a dataframe with the primary key values of the rows to recompute, as strings, or None if the watermark doesn't have the keys edited before it: all rows must be recomputed
+    """
+    if watermark.get("edited_keys") is None:
+        return None
+    keys_df = edits_df[primary_keys].astype(str)
+    edit_dates = to_datetime(edits_df["last_edit_date"], utc=True, errors="coerce")
+    if watermark.get("last_edit_date") is None:
+        changed = Series(True, index=edit_dates.index)
+    else:
+        changed = edit_dates.isnull() | (edit_dates > to_datetime(watermark["last_edit_date"], utc=True))
+    previous_keys_df = DataFrame(watermark["edited_keys"], columns=primary_keys, dtype=str)
+    emptied = ~MultiIndex.from_frame(previous_keys_df).isin(MultiIndex.from_frame(keys_df))
+    return concat([keys_df[changed.values], previous_keys_df[emptied]]).drop_duplicates().reset_index(drop=True)
+
+
+def __cast_keys__(keys_df, schema):
+    """Cast key values, which may have been written as strings in the edits, to the types of the original dataset"""
+    schema_types = {col.get("name"): col.get("type") for col in schema}
+    keys_df = keys_df.copy()
+    for col in keys_df.columns:
+        if schema_types.get(col) in INTEGER_TYPES:
+            keys_df[col] = __to_int64__(keys_df[col])
+        elif schema_types.get(col) in ["float", "double"]:
+            keys_df[col] = keys_df[col].astype(float)
+        else:
+            keys_df[col] = keys_df[col].astype(str)
+    return keys_df
+
+
+def __to_python_scalar__(value):
+    """Convert numpy scalars, such as the values of an Int64 column, to Python values, which Constant can write as SQL"""
+    return value.item() if isinstance(value, generic) else value
+
+
+def __get_keys_conditions__(dataset, keys_df):
+    """Get SQL conditions matching the rows of a dataset whose keys are in keys_df, with at most MAX_KEYS_PER_QUERY keys per condition"""
+    conditions = []
+    for start in range(0, len(keys_df), MAX_KEYS_PER_QUERY):
+        key_conditions = []
+        for key in keys_df.iloc[start : start + MAX_KEYS_PER_QUERY].itertuples(index=False):
+            column_conditions = [
+                Column(col).is_null() if isnull(value) else Column(col).eq(Constant(__to_python_scalar__(value)))
+                for col, value in zip(keys_df.columns, key)
+            ]
+            key_conditions.append(column_conditions[0].and_(*column_conditions[1:]))
+        conditions.append(toSQL(key_conditions[0].or_(*key_conditions[1:]), dataset=dataset))
+    return conditions
+
+
+def __get_original_rows__(original_ds, schema, keys_df):
+    """Get the rows of the original dataset whose keys are in keys_df: with a query on SQL datasets, by filtering all rows otherwise"""
+    if is_sql_dataset(original_ds):
+        executor = dataiku.SQLExecutor2(dataset=original_ds)
+        table_name = get_table_name_from_dataset(original_ds)
+        chunks = [
+            executor.query_to_df(f"SELECT * FROM {table_name} WHERE {condition}", infer_from_schema=True)
+            for condition in __get_keys_conditions__(original_ds, keys_df)
+        ]
+        return __force_integer_types__(concat(chunks), schema)
+    keys_index = MultiIndex.from_frame(keys_df)
+    chunks = [
+        chunk[MultiIndex.from_frame(chunk[keys_df.columns]).isin(keys_index)] for chunk in iter_dataframe(original_ds)
+    ]
+    return concat(chunks) if chunks else DataFrame(columns=[col.get("name") for col in schema])
+
+
+def upsert_edited_rows(original_ds, edits_df, edited_ds, keys_df):
+    """
+    Recompute the rows of the edited dataset whose keys are given, and replace them in the edited dataset
+
+    The edited dataset must be a SQL dataset with the same schema as the dataframes returned by `apply_edits_from_df`. Rows are deleted before being appended: if appending fails, running this again with the same keys gives the expected result.
+
+    Params:
+    - original_ds: original dataset
+    - edits_df: edits written by the Replay recipe
+    - edited_ds: edited dataset
+    - keys_df: primary key values of the rows to recompute, as returned by `get_incremental_keys`
+    """
+    schema, primary_keys, display_column_names, editable_column_names = __get_original_settings__(original_ds)
+    keys_df = __cast_keys__(keys_df[primary_keys], schema)
+    original_df = __get_original_rows__(original_ds, schema, keys_df)[
+        primary_keys + display_column_names + editable_column_names
+    ]
+    edits_keys = MultiIndex.from_frame(__cast_keys__(edits_df[primary_keys], schema))
+    edits_df = edits_df[edits_keys.isin(MultiIndex.from_frame(keys_df))]
+    edited_df = apply_edits_to_df(original_df, primary_keys, display_column_names, editable_column_names, edits_df)
+
+    # Delete the rows of the edited dataset whose keys were edited, including rows which were created and then deleted
+    executor = dataiku.SQLExecutor2(dataset=edited_ds)
+    table_name = get_table_name_from_dataset(edited_ds)
+    queries = [f"DELETE FROM {table_name} WHERE {condition}" for condition in __get_keys_conditions__(edited_ds, keys_df)]
+    executor.query_to_df(queries[-1], pre_queries=queries[:-1], post_queries=["COMMIT"])
+
+    if edited_df.size:
+        edited_ds.spec_item["appendMode"] = True
+        edited_ds.write_dataframe(edited_df, infer_schema=False)
+    return len(edited_df)
+
+
 # Utils for webapp backend
 
 
@@ -263,6 +598,50 @@ def try_get_user_identifier() -> str | None:
     return user
 
 
+# Used by backend for exporting edits
+
+
+def iter_csv(df, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Iterate over the CSV representation of a dataframe (including its index), in strings of at most `chunksize` rows, the first one starting with the header
+
+    This allows sending a large dataframe as CSV without rendering it entirely in memory first.
+    """
+    yield df.iloc[:chunksize].to_csv()
+    for start in range(chunksize, len(df), chunksize):
+        yield df.iloc[start : start + chunksize].to_csv(header=False)
+
+
+def cast_to_schema_types(df, schema):
+    """
+    Cast the columns of a dataframe whose values were read as strings from the editlog (e.g. edited cells) to the types of the corresponding columns in the schema of the original dataset
+
+    Integer columns use the Int64 type, like get_dataframe, and boolean columns the nullable boolean type. Values that can't be cast are replaced by missing values. Columns which are not in the schema are left unchanged.
+    """
+    df = df.copy()
+    for col in schema:
+        name = col.get("name")
+        if name not in df.columns:
+            continue
+        schema_type = col.get("type")
+        if schema_type in INTEGER_TYPES:
+            numbers = to_numeric(df[name], errors="coerce")
+            try:
+                df[name] = numbers.astype(Int64Dtype())
+            except TypeError:
+                # non-integer values
+                df[name] = numbers
+        elif schema_type in ["float", "double"]:
+            df[name] = to_numeric(df[name], errors="coerce")
+        elif schema_type == "boolean":
+            df[name] = df[name].map(lambda value: value if isnull(value) else str(value).lower() == "true").astype(
+                "boolean"
+            )
+        elif schema_type == "date":
+            df[name] = to_datetime(df[name], errors="coerce", utc=True)
+    return df
+
+
 # Used by backend's for CRUD methods
 
 
@@ -279,9 +658,12 @@ def get_key_values_from_dict(row, primary_keys):
     }
     ```
     - primary_keys: `["key1", "key2"]`
+
+    Returns the value of the primary key, or a tuple of values if there are several primary keys (like the index of a dataframe indexed by the primary keys, where missing values are NaN).
     """
-    # we create a dataframe containing this single row, set the columns to use as index (i.e. primary key(s)), then get the value of the index for the first (and only) row
-    return DataFrame(data=row, index=[0]).set_index(primary_keys).index[0]
+    if len(primary_keys) == 1:
+        return row[primary_keys[0]]
+    return tuple(nan if row[key] is None else row[key] for key in primary_keys)
 
 
 # Used by backend to figure out if data is up-to-date
@@ -27,6 +27,11 @@ Keyword arguments:
 - id (string; optional):
     ID used to identify this component in Dash callbacks.
 
+- ajaxURL (string; default "rows"):
+    URL of the endpoint that serves pages of data, when `remote` is
+    True. It receives a JSON body with `page`, `size`, `sort` and
+    `filter`, and returns `{\"last_page\": ..., \"data\": [...]}`.
+
 - cellEdited (dict; optional):
     cellEdited captures the cell that was clicked on.
 
@@ -36,11 +41,26 @@ Keyword arguments:
 - data (list; optional):
     Data to display in the table.
 
+- datasetBuildDate (number | string; optional):
+    Last build date of the dataset, as sent by the `eventsURL` stream
+    when the dataset changes.
+
 - datasetName (string; default ""):
     Name of the corresponding Dataiku dataset.
 
+- eventsURL (string; default ""):
+    URL of a server-sent events stream. When set, the table applies
+    the row patches sent in `edits` events, reloads its data on
+    `reset` events, and sets `datasetBuildDate` on `dataset-changed`
+    events.
+
 - groupBy (list; optional):
-    Columns to group by."""
+    Columns to group by.
+
+- remote (boolean; default False):
+    If True, data isn't passed to the component: pages are requested
+    from `ajaxURL`, and header filters and sorters are applied
+    server-side."""
     _children_props = []
     _base_nodes = ['children']
     _namespace = 'dash_tabulator'
@@ -55,11 +75,15 @@ Keyword arguments:
         datasetName: typing.Optional[str] = None,
         groupBy: typing.Optional[typing.Sequence] = None,
         cellEdited: typing.Optional[dict] = None,
+        remote: typing.Optional[bool] = None,
+        ajaxURL: typing.Optional[str] = None,
+        eventsURL: typing.Optional[str] = None,
+        datasetBuildDate: typing.Optional[typing.Union[NumberType, str]] = None,
         **kwargs
     ):
-        self._prop_names = ['id', 'cellEdited', 'columns', 'data', 'datasetName', 'groupBy']
+        self._prop_names = ['id', 'ajaxURL', 'cellEdited', 'columns', 'data', 'datasetBuildDate', 'datasetName', 'eventsURL', 'groupBy', 'remote']
         self._valid_wildcard_attributes =            []
-        self.available_properties = ['id', 'cellEdited', 'columns', 'data', 'datasetName', 'groupBy']
+        self.available_properties = ['id', 'ajaxURL', 'cellEdited', 'columns', 'data', 'datasetBuildDate', 'datasetName', 'eventsURL', 'groupBy', 'remote']
         self.available_wildcard_properties =            []
         _explicit_args = kwargs.pop('_explicit_args')
         _locals = locals()
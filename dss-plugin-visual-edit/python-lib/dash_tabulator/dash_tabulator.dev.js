@@ -52514,12 +52514,25 @@ function _defineProperty(obj, key, value) { if (key in obj) { Object.definePrope
 
 var crypto = __webpack_require__(/*! crypto */ "./node_modules/crypto-browserify/index.js");
 
-var plugin_version = "1.8.11";
+var plugin_version = "2.0.8";
 
 function md5(string) {
   return crypto.createHash('md5').update(string).digest('hex');
 }
 
+var extractFilterValues = function extractFilterValues(filter) {
+  var includedValues = filter.selectedValues ? Object.keys(filter.selectedValues).filter(function (key) {
+    return filter.selectedValues[key];
+  }) : [];
+  var excludedValues = filter.excludedValues ? Object.keys(filter.excludedValues).filter(function (key) {
+    return filter.excludedValues[key];
+  }) : [];
+  return {
+    includedValues: includedValues,
+    excludedValues: excludedValues
+  };
+};
+
 var DashTabulator = /*#__PURE__*/function (_React$Component) {
   _inherits(DashTabulator, _React$Component);
 
@@ -52536,6 +52549,119 @@ var DashTabulator = /*#__PURE__*/function (_React$Component) {
 
     _defineProperty(_assertThisInitialized(_this), "tabulator", null);
 
+    _defineProperty(_assertThisInitialized(_this), "handleFilterEvent", function (event) {
+      var data = event.data;
+      if (!data || data.type !== 'filters') return;
+      var filters = data.filters;
+
+      if (filters.length === 0) {
+        _this.tabulator.clearFilter();
+
+        return;
+      }
+
+      var filter = filters[0];
+
+      if (!filter.active || filter.filterType !== 'ALPHANUM_FACET') {
+        _this.tabulator.clearFilter();
+
+        return;
+      }
+
+      var columnFields = _this.props.columns.map(function (col) {
+        return col.field;
+      });
+
+      if (!columnFields.includes(filter.column)) {
+        return;
+      }
+
+      var _extractFilterValues = extractFilterValues(filter),
+          includedValues = _extractFilterValues.includedValues,
+          excludedValues = _extractFilterValues.excludedValues;
+
+      _this.applyTableFilter(filter, includedValues, excludedValues);
+    });
+
+    _defineProperty(_assertThisInitialized(_this), "applyTableFilter", function (filter, includedValues, excludedValues) {
+      if (includedValues.length > 0) {
+        var includeFilters = includedValues.map(function (value) {
+          return {
+            field: filter.column,
+            type: "=",
+            value: value
+          };
+        });
+
+        _this.tabulator.setFilter(includeFilters, "OR");
+      } else if (excludedValues.length > 0) {
+        var excludeFilters = excludedValues.map(function (value) {
+          return {
+            field: filter.column,
+            type: "!=",
+            value: value
+          };
+        });
+
+        _this.tabulator.setFilter(excludeFilters);
+      } else {
+        _this.tabulator.clearFilter();
+      }
+    });
+
+    _defineProperty(_assertThisInitialized(_this), "applyRowPatches", function (patches) {
+      // Each patch identifies a row by the values of its primary keys
+      patches.forEach(function (patch) {
+        var keyFilters = Object.keys(patch.keys).map(function (field) {
+          return {
+            field: field,
+            type: "=",
+            value: patch.keys[field]
+          };
+        });
+
+        var rows = _this.tabulator.searchRows(keyFilters);
+
+        if (patch.action === "delete") {
+          rows.forEach(function (row) {
+            return row["delete"]();
+          });
+        } else if (rows.length > 0) {
+          rows.forEach(function (row) {
+            return row.update(patch.values);
+          });
+        } else if (patch.action === "create" && !_this.props.remote) {
+          _this.tabulator.addRow(Object.assign({}, patch.keys, patch.values));
+        }
+      });
+    });
+
+    _defineProperty(_assertThisInitialized(_this), "reloadData", function () {
+      // Some events were missed: get all the data again
+      if (_this.props.remote) {
+        _this.tabulator.replaceData();
+
+        return;
+      }
+
+      fetch(_this.props.ajaxURL, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json"
+        },
+        body: JSON.stringify({
+          page: 1,
+          size: Number.MAX_SAFE_INTEGER
+        })
+      }).then(function (response) {
+        return response.json();
+      }).then(function (json) {
+        return _this.tabulator.replaceData(json.data);
+      })["catch"](function (e) {
+        return console.error("Failed to reload data", e);
+      });
+    });
+
     _this.ref = null;
     return _this;
   }
@@ -52553,15 +52679,16 @@ var DashTabulator = /*#__PURE__*/function (_React$Component) {
           data = _this$props.data,
           columns = _this$props.columns,
           groupBy = _this$props.groupBy,
-          cellEdited = _this$props.cellEdited; // Interpret column formatters as function handles.
+          cellEdited = _this$props.cellEdited,
+          remote = _this$props.remote,
+          ajaxURL = _this$props.ajaxURL,
+          eventsURL = _this$props.eventsURL; // Interpret column formatters as function handles.
 
       for (var i = 0; i < columns.length; i++) {
         var header = columns[i];
 
         for (var key in header) {
           var o = header[key];
-          console.log(key);
-          console.log(o);
 
           if (o instanceof Object) {
             header[key] = Object(dash_extensions__WEBPACK_IMPORTED_MODULE_2__["resolveProp"])(o, this);
@@ -52569,8 +52696,6 @@ var DashTabulator = /*#__PURE__*/function (_React$Component) {
             if (!o.variable && !o.arrow) {
               for (var key2 in o) {
                 var o2 = o[key2];
-                console.log(key2);
-                console.log(o2);
 
                 if (o2 instanceof Object) {
                   o[key2] = Object(dash_extensions__WEBPACK_IMPORTED_MODULE_2__["resolveProp"])(o2, this);
@@ -52581,24 +52706,40 @@ var DashTabulator = /*#__PURE__*/function (_React$Component) {
         }
       }
 
-      this.tabulator = new tabulator_tables__WEBPACK_IMPORTED_MODULE_3__["TabulatorFull"](this.el, {
-        "data": data,
+      var options = {
         "datasetName": datasetName,
-        "reactiveData": true,
         "columns": columns,
         "groupBy": groupBy,
         "selectable": 1,
         "layout": "fitDataTable",
-        "pagination": "local",
         "paginationSize": 20,
         "paginationSizeSelector": [10, 20, 50, 100],
         "movableColumns": true,
         "persistence": true,
         "footerElement": "<button class='tabulator-page' onclick='localStorage.clear(); window.location.reload();'>Reset View</button>"
-      });
+      };
+
+      if (remote) {
+        // Pages are requested from the backend, which applies header filters and sorters to the data
+        Object.assign(options, {
+          "ajaxURL": ajaxURL,
+          "ajaxConfig": "POST",
+          "ajaxContentType": "json",
+          "pagination": true,
+          "paginationMode": "remote",
+          "filterMode": "remote",
+          "sortMode": "remote"
+        });
+      } else {
+        Object.assign(options, {
+          "data": data,
+          "reactiveData": true,
+          "pagination": "local"
+        });
+      }
+
+      this.tabulator = new tabulator_tables__WEBPACK_IMPORTED_MODULE_3__["TabulatorFull"](this.el, options);
       this.tabulator.on("cellEdited", function (cell) {
-        console.log("Cell edited!");
-        console.log('cellEdited', cell);
         var edited = new Object();
         edited.field = cell.getField();
         edited.type = cell.getColumn().getDefinition()["editor"];
@@ -52612,7 +52753,7 @@ var DashTabulator = /*#__PURE__*/function (_React$Component) {
         });
 
         try {
-          window.parent.WT1SVC.event("lca-datatable-edited", {
+          window.parent.WT1SVC.event("visualedit-edit-cell", {
             "dataset_name_hash": md5(datasetName),
             "column_name_hash": md5(edited.field),
             "column_type": edited.type,
@@ -52620,16 +52761,38 @@ var DashTabulator = /*#__PURE__*/function (_React$Component) {
           });
         } catch (e) {}
       });
+      window.addEventListener('message', this.handleFilterEvent);
+
+      if (eventsURL) {
+        // Edits made by other users and changes of the dataset are pushed by the backend, instead of reloading the page
+        this.eventSource = new EventSource(eventsURL);
+        this.eventSource.addEventListener("edits", function (event) {
+          return _this2.applyRowPatches(JSON.parse(event.data));
+        });
+        this.eventSource.addEventListener("dataset-changed", function (event) {
+          _this2.props.setProps({
+            datasetBuildDate: JSON.parse(event.data).build_date
+          });
+        });
+        this.eventSource.addEventListener("reset", this.reloadData);
+      }
+    }
+  }, {
+    key: "componentWillUnmount",
+    value: function componentWillUnmount() {
+      window.removeEventListener('message', this.handleFilterEvent);
+
+      if (this.eventSource) {
+        this.eventSource.close();
+      }
     }
   }, {
     key: "render",
     value: function render() {
       var _this3 = this;
 
-      console.log("Rendering!");
-
       try {
-        window.parent.WT1SVC.event("lca-datatable-viewed", {
+        window.parent.WT1SVC.event("visualedit-display-table", {
           "dataset_name_hash": md5(this.props.datasetName),
           // create columns_hashed as a copy of the columns array where each item's "field" property has been hashed and other properties have been kept as they were
           "rows_count": this.props.data.length,
@@ -52661,7 +52824,10 @@ DashTabulator.defaultProps = {
   data: [],
   datasetName: "",
   columns: [],
-  groupBy: []
+  groupBy: [],
+  remote: false,
+  ajaxURL: "rows",
+  eventsURL: ""
 };
 DashTabulator.propTypes = {
   /**
@@ -52698,7 +52864,27 @@ DashTabulator.propTypes = {
   /**
    * cellEdited captures the cell that was clicked on
    */
-  cellEdited: prop_types__WEBPACK_IMPORTED_MODULE_1___default.a.object
+  cellEdited: prop_types__WEBPACK_IMPORTED_MODULE_1___default.a.object,
+
+  /**
+   * If true, data isn't passed to the component: pages are requested from `ajaxURL`, and header filters and sorters are applied server-side.
+   */
+  remote: prop_types__WEBPACK_IMPORTED_MODULE_1___default.a.bool,
+
+  /**
+   * URL of the endpoint that serves pages of data, when `remote` is true. It receives a JSON body with `page`, `size`, `sort` and `filter`, and returns `{"last_page": ..., "data": [...]}`.
+   */
+  ajaxURL: prop_types__WEBPACK_IMPORTED_MODULE_1___default.a.string,
+
+  /**
+   * URL of a server-sent events stream. When set, the table applies the row patches sent in `edits` events, reloads its data on `reset` events, and sets `datasetBuildDate` on `dataset-changed` events.
+   */
+  eventsURL: prop_types__WEBPACK_IMPORTED_MODULE_1___default.a.string,
+
+  /**
+   * Last build date of the dataset, as sent by the `eventsURL` stream when the dataset changes.
+   */
+  datasetBuildDate: prop_types__WEBPACK_IMPORTED_MODULE_1___default.a.oneOfType([prop_types__WEBPACK_IMPORTED_MODULE_1___default.a.number, prop_types__WEBPACK_IMPORTED_MODULE_1___default.a.string])
 };
 
 /***/ }),
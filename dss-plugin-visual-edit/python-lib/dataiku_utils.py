@@ -1,7 +1,9 @@
+import logging
 from json import dumps
 from dataiku import Dataset, api_client
 from dataikuapi.utils import DataikuStreamedHttpUTF8CSVReader
-from pandas import DataFrame
+from pandas import DataFrame, Series
+from tabulator_utils import get_linked_label_field
 
 client = api_client()
 
@@ -93,15 +95,31 @@ def get_linked_dataframe_filtered(linked_record, project_key, filter_term, n_res
 
     linked_ds_label = linked_record.ds_label
     if linked_record.ds:
-        # The linked dataset is SQL-based; we use the Dataiku API to filter it (but we could also use a SQL query)
-        linked_ds_name = linked_record.ds_name
-        linked_df_filtered = get_dataframe_filtered(
-            ds_name=linked_ds_name,
-            project_key=project_key,
-            filter_column=linked_ds_label,
-            filter_term=filter_term,
-            n_results=n_results,
-        )
+        linked_df_filtered = None
+        if "%" not in filter_term and "_" not in filter_term:
+            # The linked dataset is SQL-based; we query the key, label and lookup columns only, with a prefix predicate
+            try:
+                linked_df_filtered = linked_record.ds.get_rows_by_prefix(
+                    column_names=[linked_record.ds_key, linked_ds_label] + list(linked_record.ds_lookup_columns),
+                    filter_column_name=linked_ds_label,
+                    prefix=filter_term,
+                    n_results=n_results,
+                )
+            except Exception:
+                logging.warning(
+                    f"Failed to filter the linked dataset {linked_record.ds_name} with a SQL query, using the Dataiku API instead.",
+                    exc_info=True,
+                )
+        if linked_df_filtered is None:
+            # LIKE wildcards in the search term would need escaping, which isn't supported by all SQL dialects, and the label column may not be a string column: we use the Dataiku API to filter the linked dataset
+            linked_ds_name = linked_record.ds_name
+            linked_df_filtered = get_dataframe_filtered(
+                ds_name=linked_ds_name,
+                project_key=project_key,
+                filter_column=linked_ds_label,
+                filter_term=filter_term,
+                n_results=n_results,
+            )
     else:
         # The linked dataframe is already available in memory (and capped to 1000 rows); it can be filtered by Pandas
         # This dataframe is indexed by the linked dataset's key column: we reset the index to stay consistent with the rest of this method
@@ -119,17 +137,17 @@ def get_linked_dataframe_filtered(linked_record, project_key, filter_term, n_res
 
 
 def get_linked_label(linked_record, key):
-    linked_ds_key = linked_record.ds_key
     linked_ds_label = linked_record.ds_label
     # Return label only if a label column is defined (and different from the key column)
-    if key != "" and linked_ds_label and linked_ds_label != linked_ds_key:
+    if key != "" and has_linked_label(linked_record):
         if linked_record.ds:
             try:
-                label = linked_record.ds.get_cell_value_sql_query(
-                    linked_ds_key, key, linked_ds_label
-                )
+                labels = get_linked_labels(linked_record, [str(key)])
+                label = next(iter(labels.values()), "" if key == "null" else "[Not found]")
             except Exception:
                 return "Something went wrong fetching label of linked value.", 500
+        elif linked_record.store is not None:
+            label = linked_record.store.get_labels([str(key)]).get(str(key), "[Not found]")
         else:
             linked_df = linked_record.df
             if linked_df is None:
@@ -143,6 +161,67 @@ def get_linked_label(linked_record, key):
     return label
 
 
+def has_linked_label(linked_record) -> bool:
+    """Determine if a label column is defined for a linked record (and different from the key column)"""
+    return bool(linked_record.ds_label) and linked_record.ds_label != linked_record.ds_key
+
+
+def get_linked_labels(linked_record, keys) -> dict:
+    """
+    Get the labels of many rows in a linked dataset at once
+
+    Params:
+    - linked_record
+    - keys: values of the primary key identifying the rows to read, as strings
+
+    Returns: dict mapping each key found in the linked dataset to its label
+    """
+    linked_ds_label = linked_record.ds_label
+    if linked_record.ds:
+
+        def fetch(keys):
+            labels = linked_record.ds.get_cell_values(linked_record.ds_key, keys, linked_ds_label)
+            return {str(key): label for key, label in labels.items()}
+
+        if linked_record.label_cache is not None:
+            return linked_record.label_cache.get_many(keys, fetch)
+        return fetch(keys)
+    if linked_record.store is not None:
+        return linked_record.store.get_labels(keys)
+    linked_df = linked_record.df
+    if linked_df is None:
+        return {}
+    # the linked dataframe is indexed by the key column: compare string representations of keys, as the key column may have a different type in the linked dataset
+    linked_labels = Series(linked_df[linked_ds_label].fillna("").values, index=linked_df.index.astype(str))
+    linked_labels = linked_labels[~linked_labels.index.duplicated()]
+    return linked_labels[linked_labels.index.isin(keys)].to_dict()
+
+
+def add_linked_labels(df: DataFrame, linked_records) -> DataFrame:
+    """
+    Add the labels of linked records to a dataframe of edited data, so that the data table doesn't need to request them for each cell
+
+    For each linked record with a label column, the labels of the values found in the linked record's column are added in a companion column (see `get_linked_label_field`). Labels of values which aren't found in the linked dataset are set to "[Not found]".
+
+    Params:
+    - df: edited data
+    - linked_records: list of LinkedRecord objects
+
+    Returns: a copy of the dataframe with a label column for each linked record
+    """
+    df = df.copy()
+    for linked_record in linked_records:
+        if not has_linked_label(linked_record) or linked_record.name not in df.columns:
+            continue
+        keys = df[linked_record.name]
+        keys_str = keys.astype(str)
+        labels = get_linked_labels(linked_record, keys_str[keys.notnull()].unique().tolist())
+        df[get_linked_label_field(linked_record.name)] = (
+            keys_str.map(labels).fillna("[Not found]").astype(object).where(keys.notnull(), None)
+        )
+    return df
+
+
 def is_sql_dataset(ds: Dataset) -> bool:
     # locationInfoType may not exist, for example for editable dataset.
     return ds.get_location_info().get("locationInfoType", "") == "SQL"
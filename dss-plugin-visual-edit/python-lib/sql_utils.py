@@ -0,0 +1,214 @@
+"""
+This file contains functions used to compute edits and edited data inside a SQL database ("pushdown"), instead of loading the original dataset and the editlog in pandas.
+
+The queries follow the same rules as `replay_edits_from_df` and `apply_edits_from_df` in `commons.py`. They only use standard SQL (common table expressions, window functions and casts) with double-quoted identifiers, and they don't depend on the `dataiku` package, so that they can be tested against SQLite.
+
+Limitations, where `apply_edits_from_df` should be used instead (see `can_push_down`):
+- a single primary key, of type string or integer;
+- editable columns of type string, integer or floating-point number.
+
+Differences with pandas: values of created rows are cast to the types of the original columns, and edits logged at the exact same date may be applied in a different order (pandas uses the order of the editlog to break ties).
+"""
+
+from typing import List, Union
+
+# Database types (as found in the location info of Dataiku datasets) whose dialect supports the queries below
+PUSHDOWN_DATABASE_TYPES = ["PostgreSQL", "Greenplum", "Redshift", "Snowflake"]
+
+# SQL types used to cast edited values, which are stored as strings in the editlog, to the type of the original columns
+__SQL_TYPES__ = {
+    "string": None,
+    "tinyint": "BIGINT",
+    "smallint": "BIGINT",
+    "int": "BIGINT",
+    "bigint": "BIGINT",
+    "float": "DOUBLE PRECISION",
+    "double": "DOUBLE PRECISION",
+}
+
+
+def quote_identifier(string: str) -> str:
+    sep = '"'
+    return sep + string.replace(sep, sep + sep) + sep
+
+
+def quote_literal(string: str) -> str:
+    return "'" + string.replace("'", "''") + "'"
+
+
+def __get_column_types__(schema_columns: List[dict]) -> dict:
+    return {col.get("name"): col.get("type") for col in schema_columns}
+
+
+def can_push_down_replay(primary_keys: List[str], editable_column_names: List[str]) -> bool:
+    """
+    Determine whether the edits of an editlog can be replayed by `get_replay_edits_query`
+
+    Params:
+    - primary_keys: primary key column names
+    - editable_column_names: editable column names
+    """
+    # keys of datasets with multiple primary keys are tuples written as strings, which can't be parsed in SQL
+    if len(primary_keys) != 1:
+        return False
+    # column names are written as string literals when pivoting the editlog: backslashes are escape characters in some dialects
+    return not any("\\" in col for col in editable_column_names)
+
+
+def can_push_down(primary_keys: List[str], schema_columns: List[dict], editable_column_names: List[str]) -> bool:
+    """
+    Determine whether the edited data of a dataset can be computed by the queries of this module
+
+    Params:
+    - primary_keys: primary key column names
+    - schema_columns: columns of the original dataset's schema, as dicts with "name" and "type" keys
+    - editable_column_names: editable column names
+    """
+    if not can_push_down_replay(primary_keys, editable_column_names):
+        return False
+    column_types = __get_column_types__(schema_columns)
+    return all(column_types.get(col) in __SQL_TYPES__ for col in primary_keys + editable_column_names)
+
+
+def __cast__(expression: str, schema_type: str) -> str:
+    sql_type = __SQL_TYPES__[schema_type]
+    if sql_type is None:
+        return expression
+    if sql_type == "BIGINT":
+        # integers may have been logged as floats, e.g. "3.0"
+        return f"CAST(CAST({expression} AS DOUBLE PRECISION) AS BIGINT)"
+    return f"CAST({expression} AS {sql_type})"
+
+
+def get_replay_edits_query(editlog_table: str, primary_key: str, editable_column_names: List[str]) -> str:
+    """
+    Get a query that replays the edits found in an editlog table, with the same output as `replay_edits`
+
+    The output has one row per edited key, with the following columns: the primary key, the last value of each editable column (as a string, or null if it wasn't edited), `last_edit_date`, `last_action` and `first_action`.
+
+    Params:
+    - editlog_table: quoted name of the editlog table
+    - primary_key: name of the primary key column in the output
+    - editable_column_names: editable column names
+    """
+    pivoted_columns = "".join(
+        f""",
+        MAX(CASE WHEN "last_values"."column_name" = {quote_literal(col)} THEN "last_values"."value" END) AS {quote_identifier(col)}"""
+        for col in editable_column_names
+    )
+    return f"""SELECT
+        "last_values"."key" AS {quote_identifier(primary_key)}{pivoted_columns},
+        "actions"."last_edit_date",
+        "actions"."last_action",
+        "actions"."first_action"
+    FROM (
+        SELECT "key", "column_name", "value",
+            ROW_NUMBER() OVER (PARTITION BY "key", "column_name" ORDER BY "date" DESC) AS "value_rank"
+        FROM {editlog_table}
+        WHERE "key" IS NOT NULL AND "column_name" IS NOT NULL
+    ) "last_values"
+    JOIN (
+        SELECT "key",
+            MAX("date") AS "last_edit_date",
+            MAX(CASE WHEN "last_action_rank" = 1 THEN "action" END) AS "last_action",
+            MAX(CASE WHEN "first_action_rank" = 1 THEN "action" END) AS "first_action"
+        FROM (
+            SELECT "key", "date", "action",
+                ROW_NUMBER() OVER (PARTITION BY "key" ORDER BY CASE WHEN "action" IS NULL THEN 1 ELSE 0 END, "date" DESC) AS "last_action_rank",
+                ROW_NUMBER() OVER (PARTITION BY "key" ORDER BY CASE WHEN "action" IS NULL THEN 1 ELSE 0 END, "date") AS "first_action_rank"
+            FROM {editlog_table}
+            WHERE "key" IS NOT NULL
+        ) "ranked_actions"
+        GROUP BY "key"
+    ) "actions" ON "actions"."key" = "last_values"."key"
+    WHERE "last_values"."value_rank" = 1 AND "last_values"."value" IS NOT NULL
+    GROUP BY "last_values"."key", "actions"."last_edit_date", "actions"."last_action", "actions"."first_action\""""
+
+
+def get_apply_edits_query(
+    original_table: str,
+    edits_query: str,
+    primary_key: str,
+    schema_columns: List[dict],
+    display_column_names: List[str],
+    editable_column_names: List[str],
+    edited_column_names: Union[List[str], None] = None,
+) -> str:
+    """
+    Get a query that applies edits to an original table, with the same output as `apply_edits_from_df` (except for the order of rows)
+
+    Params:
+    - original_table: quoted name of the original table
+    - edits_query: query giving edits as returned by `get_replay_edits_query`, or selecting them from an edits table; values may be strings or have the type of the original columns
+    - primary_key: primary key column name
+    - schema_columns: columns of the original dataset's schema, as dicts with "name" and "type" keys
+    - display_column_names: names of the columns which are neither primary keys nor editable
+    - editable_column_names: editable column names
+    - edited_column_names: editable columns found in the edits (all editable columns by default)
+    """
+    column_types = __get_column_types__(schema_columns)
+    if edited_column_names is None:
+        edited_column_names = editable_column_names
+    pk = quote_identifier(primary_key)
+    pk_type = column_types[primary_key]
+
+    def edited_value(col):
+        if col not in edited_column_names:
+            return "NULL"
+        return __cast__(f'"edits".{quote_identifier(col)}', column_types[col])
+
+    edits_key = f'CAST("edits".{pk} AS VARCHAR)'
+    created_columns = [f"{__cast__(edits_key, pk_type)} AS {pk}"]
+    created_columns += [f"NULL AS {quote_identifier(col)}" for col in display_column_names]
+    created_columns += [f"{edited_value(col)} AS {quote_identifier(col)}" for col in editable_column_names]
+
+    original_columns = [f'"original".{pk}']
+    original_columns += [f'"original".{quote_identifier(col)}' for col in display_column_names]
+    original_columns += [
+        f'COALESCE({edited_value(col)}, "original".{quote_identifier(col)}) AS {quote_identifier(col)}'
+        for col in editable_column_names
+    ]
+
+    original_key = f'"original".{pk}' if __SQL_TYPES__[pk_type] is None else f'CAST("original".{pk} AS VARCHAR)'
+    separator = """,
+        """
+    return f"""WITH "edits" AS (
+        {edits_query}
+    )
+    SELECT
+        {separator.join(created_columns)}
+    FROM "edits"
+    WHERE "edits"."first_action" = 'create'
+        AND ("edits"."last_action" IS NULL OR "edits"."last_action" <> 'delete')
+    UNION ALL
+    SELECT
+        {separator.join(original_columns)}
+    FROM {original_table} "original"
+    LEFT JOIN "edits" ON {original_key} = {edits_key}
+        AND ("edits"."first_action" IS NULL OR "edits"."first_action" <> 'create')
+        AND ("edits"."last_action" IS NULL OR "edits"."last_action" <> 'delete')"""
+
+
+def get_edited_query(
+    original_table: str,
+    editlog_table: str,
+    primary_key: str,
+    schema_columns: List[dict],
+    display_column_names: List[str],
+    editable_column_names: List[str],
+) -> str:
+    """
+    Get a query that replays the edits found in an editlog table and applies them to an original table, in a single query (see `get_replay_edits_query` and `get_apply_edits_query`)
+
+    Rows are ordered by primary key, so that the edited data is served in the same order each time it's read.
+    """
+    apply_edits_query = get_apply_edits_query(
+        original_table,
+        get_replay_edits_query(editlog_table, primary_key, editable_column_names),
+        primary_key,
+        schema_columns,
+        display_column_names,
+        editable_column_names,
+    )
+    return f"""{apply_edits_query}
+    ORDER BY {quote_identifier(primary_key)}"""
@@ -2,11 +2,13 @@
 This file contains functions used to generate the Tabulator columns configuration for a given dataset.
 """
 
+from math import ceil, isfinite
 from typing import Union
-from pandas import DataFrame
+from pandas import DataFrame, Series, isna, to_numeric
 from dash_extensions.javascript import Namespace
 import logging
 from dash_extensions.javascript import assign
+from ast import literal_eval
 
 # used to reference javascript functions in custom_tabulator.js
 __ns__ = Namespace("myNamespace", "tabulator")
@@ -122,6 +124,13 @@ def __get_column_tabulator_editor__(t_type):
 
 ### Linked records
 
+# suffix of the fields where the labels of linked records are provided to Tabulator, along with the data (see `add_linked_labels` in `dataiku_utils.py`)
+LINKED_LABEL_SUFFIX = "__label"
+
+
+def get_linked_label_field(linked_record_name: str) -> str:
+    return linked_record_name + LINKED_LABEL_SUFFIX
+
 
 def get_formatted_items_from_linked_df(
     linked_df: DataFrame,
@@ -215,8 +224,10 @@ def __get_column_tabulator_linked_record__(de, linked_record_name):
     t_col = {}
     t_col["sorter"] = "string"
 
-    # Formatter: if a label column was specified, get labels from the `label` endpoint and show them as user-friendly alternatives to the actual values (corresponding to primary keys of the linked dataset)
+    # Formatter: if a label column was specified, show labels as user-friendly alternatives to the actual values (corresponding to primary keys of the linked dataset)
+    # Labels of the values found in the data are provided in a companion field; labels of values set by editing a cell are requested from the `label` endpoint
     if linked_ds_label_column != "" and linked_ds_label_column != linked_ds_key_column:
+        linked_label_field = get_linked_label_field(linked_record_name)
         t_col["formatter"] = assign(
             f"""
             function(cell){{
@@ -228,19 +239,24 @@ def __get_column_tabulator_linked_record__(de, linked_record_name):
                     cell.setValue(oldKey);
                 }}
                 label = ""
-                // Send GET request to `url_base`, with parameter `key`
-                // Assign returned value to the `label` variable; in case connection fails, assign empty value to label
-                $.ajax({{
-                    url: url_base + "?key=" + key,
-                    async: false,
-                    success: function(result){{
-                        label = result
-                    }},
-                    error: function(result){{
-                        label = ""
-                        console.log("Could not retrieve label from server")
-                    }}
-                }});
+                companionLabel = cell.getData()["{linked_label_field}"]
+                if (key == cell.getInitialValue() && companionLabel != null) {{
+                    label = companionLabel
+                }} else {{
+                    // Send GET request to `url_base`, with parameter `key`
+                    // Assign returned value to the `label` variable; in case connection fails, assign empty value to label
+                    $.ajax({{
+                        url: url_base + "?key=" + key,
+                        async: false,
+                        success: function(result){{
+                            label = result
+                        }},
+                        error: function(result){{
+                            label = ""
+                            console.log("Could not retrieve label from server")
+                        }}
+                    }});
+                }}
                 // if label is empty, return empty string
                 if (label == "") {{
                     return label
@@ -357,3 +373,199 @@ def get_columns_tabulator(de, show_header_filter=True, freeze_editable_columns=F
         t_cols.append(t_col)
 
     return t_cols
+
+
+### Row patches sent to connected clients
+
+
+def __cast_patch_value__(value, t_type):
+    # values are stored as strings in the editlog; the data table expects the same types as in the data it was given
+    if isna(value):
+        return None
+    try:
+        if t_type == "boolean":
+            return value.lower() == "true"
+        if t_type == "number":
+            number = float(value)
+            if not isfinite(number):
+                # not valid in JSON
+                return None
+            return int(number) if number.is_integer() and "." not in value else number
+    except (AttributeError, ValueError):
+        logging.debug(f"Failed to cast value {value!r} to {t_type}.")
+    return value
+
+
+def __get_patch_key_values__(key, n_keys) -> tuple:
+    # keys of datasets with multiple primary keys are stored as the string representation of a tuple (see `__parse_key__` in commons.py, which can't be imported here)
+    if n_keys == 1:
+        return (key,)
+    try:
+        values = literal_eval(key)
+    except (ValueError, SyntaxError):
+        return ()
+    return values if isinstance(values, tuple) else (values,)
+
+
+def get_row_patches(de, logs) -> list:
+    """
+    Get the changes to make to the rows of the data table, after edit logs were appended to the editlog, in the order in which they should be applied.
+
+    There is one patch per edited row, with the values of its primary keys, the action to apply and the new values of its edited columns (typed according to the data table's columns). The patches are applied by the data table component to the rows that match the primary keys.
+
+    Example params:
+    - de: DataEditor instance
+    - logs: list of `EditLog`
+
+    Example return value:
+    ```
+    [
+        {"action": "update", "keys": {"id": 12}, "values": {"name": "cat", "reviewed": True}},
+        {"action": "delete", "keys": {"id": 13}, "values": {}}
+    ]
+    ```
+    """
+    patches = {}
+    t_types = {}
+    for log in logs:
+        if log.key not in patches:
+            key_values = __get_patch_key_values__(log.key, len(de.primary_keys))
+            keys = {}
+            for key_name, key_value in zip(de.primary_keys, key_values):
+                if key_name not in t_types:
+                    t_types[key_name] = __get_column_tabulator_type__(de, key_name)
+                keys[key_name] = __cast_patch_value__(str(key_value), t_types[key_name])
+            patches[log.key] = {"action": "update", "keys": keys, "values": {}}
+        patch = patches[log.key]
+        if log.action == "delete":
+            patch["action"] = "delete"
+            patch["values"] = {}
+            continue
+        if log.action == "create" or patch["action"] == "delete":
+            # a row can be created again after it was deleted
+            patch["action"] = "create"
+        if log.column_name is not None:
+            if log.column_name not in t_types:
+                try:
+                    t_types[log.column_name] = __get_column_tabulator_type__(de, log.column_name)
+                except KeyError:
+                    t_types[log.column_name] = "string"
+            patch["values"][log.column_name] = __cast_patch_value__(log.value, t_types[log.column_name])
+    return list(patches.values())
+
+
+### Server-side pagination
+
+
+def __get_strings__(values: Series) -> Series:
+    # lowercase string representations, with missing values as empty strings
+    return values.astype(str).str.lower().where(values.notnull(), "")
+
+
+def __get_equal_mask__(values: Series, value) -> Series:
+    # compare string representations, as values received from the browser are JSON (booleans, numbers, strings)
+    if isinstance(value, bool):
+        return values.map(lambda v: str(v).lower() == str(value).lower())
+    return values.astype(str) == str(value)
+
+
+def __get_range_mask__(values: Series, value: dict) -> Series:
+    # min/max header filter of number columns (see `minMaxFilterEditor` in custom_tabulator.js)
+    numbers = to_numeric(values, errors="coerce")
+    mask = Series(True, index=values.index)
+    if value.get("start") not in (None, ""):
+        mask &= numbers >= float(value["start"])
+    if value.get("end") not in (None, ""):
+        mask &= numbers <= float(value["end"])
+    return mask
+
+
+# Masks of the rows matching each type of Tabulator filter, given the values of the filtered column and the filter value
+__FILTER_MASKS__ = {
+    "like": lambda values, value: __get_strings__(values).str.contains(str(value).lower(), regex=False),
+    "starts": lambda values, value: __get_strings__(values).str.startswith(str(value).lower()),
+    "ends": lambda values, value: __get_strings__(values).str.endswith(str(value).lower()),
+    "in": lambda values, value: values.astype(str).isin([str(v) for v in value]),
+    "<": lambda values, value: to_numeric(values, errors="coerce").lt(float(value)),
+    "<=": lambda values, value: to_numeric(values, errors="coerce").le(float(value)),
+    ">": lambda values, value: to_numeric(values, errors="coerce").gt(float(value)),
+    ">=": lambda values, value: to_numeric(values, errors="coerce").ge(float(value)),
+    "=": __get_equal_mask__,
+    "!=": lambda values, value: ~__get_equal_mask__(values, value),
+}
+
+
+def __get_filter_mask__(df: DataFrame, tabulator_filter) -> Series:
+    """Evaluate a Tabulator filter on a dataframe, the way Tabulator would evaluate it locally. A list of filters is a group of filters combined with OR."""
+    if isinstance(tabulator_filter, list):
+        mask = Series(False, index=df.index)
+        for f in tabulator_filter:
+            mask |= __get_filter_mask__(df, f)
+        return mask
+
+    field = tabulator_filter.get("field")
+    value = tabulator_filter.get("value")
+    if field not in df.columns or value is None or value == "":
+        return Series(True, index=df.index)
+    if isinstance(value, dict):
+        return __get_range_mask__(df[field], value)
+    # other types of filters are evaluated as "="
+    return __FILTER_MASKS__.get(tabulator_filter.get("type"), __get_equal_mask__)(df[field], value)
+
+
+def __sort_df__(df: DataFrame, sorters: list) -> DataFrame:
+    # Tabulator lists sorters from lowest to highest priority
+    sorters = [s for s in reversed(sorters) if s.get("field") in df.columns]
+    if not sorters:
+        return df
+    by = [s["field"] for s in sorters]
+    ascending = [s.get("dir", "asc") != "desc" for s in sorters]
+    try:
+        return df.sort_values(by=by, ascending=ascending, kind="stable", na_position="last")
+    except TypeError:
+        # columns with mixed types can't be compared: sort on their string representation
+        return df.sort_values(
+            by=by,
+            ascending=ascending,
+            kind="stable",
+            na_position="last",
+            key=lambda column: column.astype(str).where(column.notnull()),
+        )
+
+
+def get_page_from_df(
+    df: DataFrame,
+    page: int = 1,
+    size: int = 20,
+    sorters: Union[list, None] = None,
+    filters: Union[list, None] = None,
+) -> dict:
+    """
+    Filter, sort and paginate a dataframe according to the parameters sent by Tabulator in remote mode (`paginationMode`, `sortMode` and `filterMode` set to "remote").
+
+    Example params:
+    - page: 2 (starts at 1)
+    - size: 20
+    - sorters: [{"field": "name", "dir": "asc"}]
+    - filters: [{"field": "name", "type": "like", "value": "cat"}]
+
+    Returns a dict with the number of pages, the number of rows matching the filters, and the rows of the requested page:
+    ```
+    {
+        "last_page": 5,
+        "last_row": 97,
+        "data": DataFrame
+    }
+    ```
+    """
+    for tabulator_filter in filters or []:
+        df = df[__get_filter_mask__(df, tabulator_filter)]
+    df = __sort_df__(df, sorters or [])
+    size = max(int(size), 1)
+    last_page = max(ceil(len(df) / size), 1)
+    page = min(max(int(page), 1), last_page)
+    return {
+        "last_page": last_page,
+        "last_row": len(df),
+        "data": df.iloc[(page - 1) * size : page * size],
+    }
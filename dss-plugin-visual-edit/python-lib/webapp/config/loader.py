@@ -38,10 +38,12 @@ class WebAppConfig:
         self.show_header_filter = typed_config.show_header_filter
         self.freeze_editable_columns = typed_config.freeze_editable_columns
         self.group_column_names = typed_config.group_column_names
+        self.server_side_pagination = typed_config.server_side_pagination
         self.linked_records_count = typed_config.linked_records_count
         self.linked_records = self.__get_linked_records__(
             dic_config, self.linked_records_count
         )
+        self.linked_labels_cache_ttl = typed_config.linked_labels_cache_ttl
 
         self.editschema_manual = self.__cast_editschema__(typed_config)
 
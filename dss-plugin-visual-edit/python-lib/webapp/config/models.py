@@ -3,6 +3,9 @@ from pydantic import BaseModel
 from dataclasses import dataclass
 from typing import Any, List
 from DatasetSQL import DatasetSQL
+from webapp.db.label_cache import LinkedLabelCache
+from webapp.db.linked_index import LinkedRecordIndex
+from webapp.db.linked_store import LinkedRecordStore
 from pandas import DataFrame
 
 
@@ -30,6 +33,10 @@ class LinkedRecord:
         self.ds_lookup_columns = info.ds_lookup_columns
         self.df: DataFrame | None = None
         self.ds: DatasetSQL | None = None
+        self.label_cache: LinkedLabelCache | None = None
+        self.store: LinkedRecordStore | None = None
+        # index used to search labels, either built from df or given by store
+        self.index: LinkedRecordIndex | LinkedRecordStore | None = None
 
 
 class Config(BaseModel):
@@ -39,7 +46,9 @@ class Config(BaseModel):
     show_header_filter: bool = True
     freeze_editable_columns: bool
     group_column_names: List[str]
+    server_side_pagination: bool = False
     linked_records_count: int = 0
+    linked_labels_cache_ttl: int = 600
     authorized_users: List[str] = []
     freeze_edits: bool = False
     # it can in fact be: null, "", [] -> empty or not, and "[]" json in a string.
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import logging
+from threading import Event, Lock, Thread
+from typing import Any, Callable
+
+
+# Default time (in seconds) between two reads of the build date
+DEFAULT_POLL_INTERVAL = 10.0
+
+
+class BuildDatePoller:
+    """
+    Reads the last build date of a dataset on an interval, in a background thread, and keeps the last value read.
+
+    All the threads serving webapp requests read the kept value, so that the number of calls to the DSS API doesn't depend on the number of connected clients.
+
+    Args:
+        get_build_date (callable): Returns the last build date of the dataset.
+        interval (float): Time in seconds between two reads of the build date.
+        on_change (callable): (Optional) Called with the new build date when it differs from the previous value read (but not after the first read).
+    """
+
+    def __init__(
+        self,
+        get_build_date: Callable[[], Any],
+        interval: float = DEFAULT_POLL_INTERVAL,
+        on_change: Callable[[Any], None] | None = None,
+    ) -> None:
+        self.get_build_date = get_build_date
+        self.interval = interval
+        self.on_change = on_change
+        self.__build_date__ = None
+        self.__lock__ = Lock()
+        self.__stopped__ = Event()
+        self.__thread__: Thread | None = None
+
+    def start(self) -> "BuildDatePoller":
+        """
+        Reads the build date once, then starts reading it on an interval in a background thread.
+        """
+        self.poll()
+        self.__thread__ = Thread(target=self.__run__, name="build-date-poller", daemon=True)
+        self.__thread__.start()
+        return self
+
+    def get(self) -> Any:
+        """
+        Returns the last build date read, or None if it couldn't be read yet.
+        """
+        with self.__lock__:
+            return self.__build_date__
+
+    def poll(self) -> Any:
+        """
+        Reads the build date now, and returns it (or the previous value if it couldn't be read).
+        """
+        try:
+            build_date = self.get_build_date()
+        except Exception:
+            logging.warning("Failed to get the last build date.", exc_info=True)
+            return self.get()
+        with self.__lock__:
+            previous_build_date = self.__build_date__
+            self.__build_date__ = build_date
+        if previous_build_date is not None and build_date != previous_build_date and self.on_change is not None:
+            try:
+                self.on_change(build_date)
+            except Exception:
+                logging.exception("Failed to process the new build date.")
+        return build_date
+
+    def close(self) -> None:
+        """
+        Stops the background thread.
+        """
+        self.__stopped__.set()
+        if self.__thread__ is not None:
+            self.__thread__.join()
+
+    def __run__(self) -> None:
+        while not self.__stopped__.wait(self.interval):
+            self.poll()
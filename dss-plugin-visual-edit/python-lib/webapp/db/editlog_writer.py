@@ -0,0 +1,177 @@
+from __future__ import annotations
+import logging
+from concurrent.futures import Future
+from dataclasses import dataclass
+from queue import Empty, Queue
+from threading import Lock, Thread
+from time import monotonic
+from typing import Callable, List, Tuple
+from webapp.db.editlogs import EditLog, EditLogAppender
+
+
+# Default maximum time (in seconds) during which edits from concurrent requests are collected before being flushed
+DEFAULT_FLUSH_INTERVAL = 0.05
+# Default maximum number of edit logs written in a single flush
+DEFAULT_MAX_BATCH_SIZE = 1000
+
+
+@dataclass
+class EditLogWriterStats:
+    flushes: int = 0
+    requests: int = 0
+    logs: int = 0
+    failed_flushes: int = 0
+    max_batch_size: int = 0
+    total_flush_latency: float = 0.0
+    max_flush_latency: float = 0.0
+    last_flush_latency: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.logs / self.flushes if self.flushes else 0.0
+
+    @property
+    def mean_flush_latency(self) -> float:
+        return self.total_flush_latency / self.flushes if self.flushes else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "flushes": self.flushes,
+            "requests": self.requests,
+            "logs": self.logs,
+            "failed_flushes": self.failed_flushes,
+            "max_batch_size": self.max_batch_size,
+            "mean_batch_size": self.mean_batch_size,
+            "max_flush_latency": self.max_flush_latency,
+            "mean_flush_latency": self.mean_flush_latency,
+            "last_flush_latency": self.last_flush_latency,
+        }
+
+
+class GroupCommitEditLogWriter:
+    """
+    Single writer of an editlog, shared by all the threads serving webapp requests.
+
+    Edit logs submitted by concurrent requests are appended to the editlog in a single write (i.e. one transaction for SQL editlogs), instead of one write per request: requests queued while the previous write was in progress are collected, until none is waiting or the time window has passed. Callers of `write` still block until their own edit logs are written, and get an exception if they couldn't be.
+
+    Args:
+        appender (EditLogAppender): The appender used to write to the editlog.
+        on_append (callable): (Optional) Called with the list of edit logs after each successful write, in the order in which they were written.
+        flush_interval (float): Maximum time in seconds during which edit logs are collected after the first one is taken from the queue.
+        max_batch_size (int): Maximum number of edit logs per write.
+    """
+
+    def __init__(
+        self,
+        appender: EditLogAppender,
+        on_append: Callable[[List[EditLog]], None] | None = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ) -> None:
+        self.appender = appender
+        self.on_append = on_append
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.__queue__: Queue[Tuple[List[EditLog], Future] | None] = Queue()
+        self.__stats__ = EditLogWriterStats()
+        self.__stats_lock__ = Lock()
+        self.__closed__ = False
+        self.__close_lock__ = Lock()
+        self.__thread__ = Thread(target=self.__run__, name="editlog-writer", daemon=True)
+        self.__thread__.start()
+
+    def write(self, logs: List[EditLog]) -> None:
+        """
+        Appends edit logs to the editlog, along with those submitted concurrently by other callers.
+
+        Blocks until the edit logs are written: either all of them are appended, or none of them and the exception raised by the appender is re-raised.
+
+        Raises:
+            RuntimeError: If the writer was closed.
+        """
+        if not logs:
+            return
+        future: Future = Future()
+        with self.__close_lock__:
+            if self.__closed__:
+                raise RuntimeError("The editlog writer is closed.")
+            self.__queue__.put((list(logs), future))
+        future.result()
+
+    def get_stats(self) -> dict:
+        """
+        Returns statistics on the writes made so far: number of flushes, of requests and of edit logs, batch sizes (in edit logs) and flush latencies (in seconds).
+        """
+        with self.__stats_lock__:
+            return self.__stats__.to_dict()
+
+    def close(self) -> None:
+        """
+        Flushes pending edit logs and stops the writer thread. Edit logs can't be written afterwards.
+        """
+        with self.__close_lock__:
+            if self.__closed__:
+                return
+            self.__closed__ = True
+            self.__queue__.put(None)
+        self.__thread__.join()
+
+    def __run__(self) -> None:
+        stopped = False
+        while not stopped:
+            request = self.__queue__.get()
+            if request is None:
+                break
+            batch = [request]
+            size = len(request[0])
+            deadline = monotonic() + self.flush_interval
+            while size < self.max_batch_size and monotonic() < deadline:
+                try:
+                    request = self.__queue__.get_nowait()
+                except Empty:
+                    # no other request is waiting: don't delay this one
+                    break
+                if request is None:
+                    stopped = True
+                    break
+                batch.append(request)
+                size += len(request[0])
+            self.__flush__(batch)
+
+    def __flush__(self, batch: List[Tuple[List[EditLog], Future]]) -> None:
+        logs = [log for request_logs, _ in batch for log in request_logs]
+        start = monotonic()
+        try:
+            self.appender.append_many(logs)
+        except Exception as e:
+            self.__record__(len(batch), len(logs), monotonic() - start, failed=True)
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Write each request on its own, so that one request's failure doesn't fail the others
+            logging.warning("Failed to append a batch of %d edit logs, retrying request by request.", len(logs))
+            for request in batch:
+                self.__flush__([request])
+            return
+        self.__record__(len(batch), len(logs), monotonic() - start)
+        if self.on_append is not None:
+            try:
+                self.on_append(logs)
+            except Exception:
+                logging.exception("Failed to process appended edit logs.")
+        for _, future in batch:
+            future.set_result(None)
+
+    def __record__(self, requests: int, logs: int, latency: float, failed: bool = False) -> None:
+        with self.__stats_lock__:
+            stats = self.__stats__
+            if failed:
+                stats.failed_flushes += 1
+                return
+            stats.flushes += 1
+            stats.requests += requests
+            stats.logs += logs
+            stats.max_batch_size = max(stats.max_batch_size, logs)
+            stats.total_flush_latency += latency
+            stats.max_flush_latency = max(stats.max_flush_latency, latency)
+            stats.last_flush_latency = latency
@@ -1,11 +1,11 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from dataiku import Dataset, SQLExecutor2
-from dataiku.sql import Constant, InlineSQL
 from abc import ABC, abstractmethod
+from typing import List
 from pandas import DataFrame
 from dataiku_utils import is_sql_dataset, is_bigquery_dataset
-from webapp.db.querybuilder import InsertQueryBuilder, BigQueryInsertQueryBuilder
+from webapp.db.querybuilder import InsertQueryBuilder, BigQueryInsertQueryBuilder, PreparedInsertQuery
 
 
 COLUMNS = ["key", "column_name", "value", "date", "user", "action"]
@@ -21,75 +21,97 @@ class EditLog:
     action: str
 
 
+# Maximum number of rows in a single INSERT statement (some databases, e.g. SQL Server, cap the number of rows in a VALUES clause)
+MAX_ROWS_PER_INSERT = 1000
+
+
 class EditLogAppender(ABC):
     @abstractmethod
     def append(self, log: EditLog) -> None:
         pass
 
+    @abstractmethod
+    def append_many(self, logs: List[EditLog]) -> None:
+        """
+        Append several edit logs in a single write: either all of them are appended, or none of them.
+        """
+        pass
+
 
 class GenericEditLogAppender(EditLogAppender):
     def __init__(self, dataset: Dataset) -> None:
         self.dataset = dataset
 
     def append(self, log: EditLog) -> None:
+        self.append_many([log])
+
+    def append_many(self, logs: List[EditLog]) -> None:
+        if not logs:
+            return
         self.dataset.spec_item["appendMode"] = True
         edit_data = {
-            "key": [log.key],
-            "column_name": [log.column_name],
-            "value": [log.value],
-            "date": [log.date],
-            "user": [log.user],
-            "action": [log.action],
+            "key": [log.key for log in logs],
+            "column_name": [log.column_name for log in logs],
+            "value": [log.value for log in logs],
+            "date": [log.date for log in logs],
+            "user": [log.user for log in logs],
+            "action": [log.action for log in logs],
         }
         self.dataset.write_dataframe(DataFrame(data=edit_data))
 
 
+def __get_insert_queries__(insert_query: PreparedInsertQuery, logs: List[EditLog]) -> List[str]:
+    """
+    Build the INSERT statements for a list of edit logs, with at most MAX_ROWS_PER_INSERT rows per statement.
+    """
+    return [
+        insert_query.build(
+            [
+                # for some reason, toSQL automatically casts the string into a timestamp, changing the format.
+                # Only way I found to work around this is to write the date as raw SQL. This is safe as this value is generated by us.
+                [log.key, log.column_name, log.value, f"'{log.date}'", log.user, log.action]
+                for log in logs[start : start + MAX_ROWS_PER_INSERT]
+            ]
+        )
+        for start in range(0, len(logs), MAX_ROWS_PER_INSERT)
+    ]
+
+
+def __execute_in_transaction__(executor: SQLExecutor2, queries: List[str]) -> None:
+    """
+    Execute queries in a single transaction: all queries but the last one are sent as pre-queries of the last one, followed by a COMMIT.
+    """
+    if queries:
+        executor.query_to_df(queries[-1], pre_queries=queries[:-1], post_queries=["COMMIT"])
+
+
 class SQLEditLogAppender(EditLogAppender):
     def __init__(self, dataset: Dataset) -> None:
         self.dataset = dataset
         self.executor = SQLExecutor2(dataset=self.dataset)
+        # table location and column list are resolved once, rather than for every edit
+        self.insert_query = PreparedInsertQuery(InsertQueryBuilder, self.dataset, COLUMNS, raw_columns=["date"])
 
     def append(self, log: EditLog):
-        insert_query = (
-            InsertQueryBuilder(self.dataset)
-            .add_columns(COLUMNS)
-            .add_value(
-                [
-                    Constant(log.key),
-                    Constant(log.column_name),
-                    Constant(log.value),
-                    # for some reason, toSQL automatically casts the string into a timestamp, changing the format.
-                    # Only way I found to work around this is to use InlineSql. This is safe as this value is generated by us.
-                    InlineSQL(f"'{log.date}'"),
-                    Constant(log.user),
-                    Constant(log.action),
-                ]
-            )
-            .build()
-        )
-        self.executor.query_to_df(insert_query, post_queries=["COMMIT"])
+        self.append_many([log])
+
+    def append_many(self, logs: List[EditLog]) -> None:
+        __execute_in_transaction__(self.executor, __get_insert_queries__(self.insert_query, logs))
+
 
 class BigQueryEditLogAppender(EditLogAppender):
     def __init__(self, dataset: Dataset) -> None:
         self.dataset = dataset
-        self.executor = SQLExecutor2(dataset=self.dataset)  
+        self.executor = SQLExecutor2(dataset=self.dataset)
+        self.insert_query = PreparedInsertQuery(BigQueryInsertQueryBuilder, self.dataset, COLUMNS, raw_columns=["date"])
 
     def append(self, log: EditLog):
-        insert_query = (
-            BigQueryInsertQueryBuilder(self.dataset)
-            .add_columns(COLUMNS)
-            .add_value([
-                Constant(log.key),
-                Constant(log.column_name),
-                Constant(log.value),
-                # Using InlineSQL like in SQLEditLogAppender's append() method
-                InlineSQL(f"'{log.date}'"),
-                Constant(log.user),
-                Constant(log.action),
-            ])
-            .build()
-        )
-        self.executor.query_to_df(insert_query, post_queries=["COMMIT"])
+        self.append_many([log])
+
+    def append_many(self, logs: List[EditLog]) -> None:
+        # Writing dates as raw SQL like in SQLEditLogAppender
+        __execute_in_transaction__(self.executor, __get_insert_queries__(self.insert_query, logs))
+
 
 class EditLogAppenderFactory:
     def create(self, dataset: Dataset) -> EditLogAppender:
@@ -0,0 +1,166 @@
+from __future__ import annotations
+from threading import RLock
+from typing import Dict, List
+from numpy import nan
+from pandas import DataFrame, concat, isna
+from commons import __unpack_keys__
+from webapp.db.editlogs import EditLog
+
+
+class EditState:
+    """
+    Materialized state of an editlog: for each key, the last value of each edited column, the date of the last edit, and the first and last actions.
+
+    The state is built once from the contents of the editlog, then updated in place whenever an edit is logged, so that reading edits costs time proportional to the number of edited cells rather than to the size of the editlog.
+    It follows the same rules as `replay_edits` in `commons.py`, and `get_edited_cells_df` returns a dataframe with the same layout.
+    """
+
+    def __init__(self, primary_keys: List[str], editable_column_names: List[str]) -> None:
+        self.primary_keys = primary_keys
+        self.editable_column_names = editable_column_names
+        self.__lock__ = RLock()
+        # key (as stored in the editlog) -> {"values": {column_name: value}, "last_edit_date", "last_action", "first_action"}
+        self.__rows__: Dict[str, dict] = {}
+        self.__edited_cells_df__: DataFrame | None = None
+        # incremented every time the state changes; used to invalidate cached reads
+        self.version = 0
+
+    def clear(self) -> None:
+        with self.__lock__:
+            self.__rows__ = {}
+            self.__invalidate__()
+
+    def load(self, editlog_df: DataFrame) -> None:
+        """
+        Rebuild the state from the contents of an editlog.
+
+        Args:
+            editlog_df (pandas.DataFrame): The editlog, as returned by `get_dataframe`.
+        """
+        with self.__lock__:
+            self.__rows__ = {}
+            if editlog_df.size:
+                self.__load_compacted__(editlog_df)
+            self.__invalidate__()
+
+    def __load_compacted__(self, editlog_df: DataFrame) -> None:
+        # Compact the editlog with vectorized operations, so that only one entry per key and per edited cell is processed in Python
+        editlog_df = editlog_df[editlog_df["key"].notnull()].sort_values("date", kind="stable")
+        if "action" not in editlog_df.columns:
+            editlog_df = editlog_df.assign(action="update")
+
+        grouped = editlog_df.groupby("key", sort=False)
+        last_df = grouped[["date", "action"]].last()
+        first_actions = grouped["action"].first()
+        for key, date, action, first_action in zip(
+            last_df.index, last_df["date"], last_df["action"], first_actions.reindex(last_df.index)
+        ):
+            self.__rows__[key] = {
+                "values": {},
+                "last_edit_date": None if isna(date) else date,
+                "last_action": None if isna(action) else action,
+                "first_action": None if isna(first_action) else first_action,
+            }
+
+        last_values_df = editlog_df[editlog_df["column_name"].notnull()].drop_duplicates(
+            subset=["key", "column_name"], keep="last"
+        )
+        for key, column_name, value in zip(
+            last_values_df["key"], last_values_df["column_name"], last_values_df["value"]
+        ):
+            self.__rows__[key]["values"][column_name] = nan if isna(value) else value
+
+    def append(self, log: EditLog) -> None:
+        """
+        Update the state with an edit that was just appended to the editlog.
+        """
+        self.append_many([log])
+
+    def append_many(self, logs: List[EditLog]) -> None:
+        """
+        Update the state with edits that were just appended to the editlog, in the order in which they were appended.
+        """
+        with self.__lock__:
+            for log in logs:
+                self.__apply__(log.key, log.column_name, log.value, log.date, log.action)
+            self.__invalidate__()
+
+    def __invalidate__(self) -> None:
+        self.__edited_cells_df__ = None
+        self.version += 1
+
+    def __apply__(self, key, column_name, value, date, action) -> None:
+        if isna(key):
+            return
+        row = self.__rows__.get(key)
+        if row is None:
+            row = {"values": {}, "last_edit_date": None, "last_action": None, "first_action": None}
+            self.__rows__[key] = row
+        # like groupby().last() and groupby().first(), ignore missing values when looking for last/first date and actions
+        if not isna(date):
+            row["last_edit_date"] = date
+        if not isna(action):
+            row["last_action"] = action
+            if row["first_action"] is None:
+                row["first_action"] = action
+        # like the pivot of the editlog, ignore entries that don't refer to a column (e.g. delete actions)
+        if not isna(column_name):
+            row["values"][column_name] = nan if isna(value) else value
+
+    def get_row(self, key: str) -> dict | None:
+        """
+        Returns the edited cells of a row, with the same columns as `get_edited_cells_df` (except primary keys), or None if none of its cells were edited.
+
+        This is a lookup in the state, which doesn't depend on the number of edits.
+
+        Args:
+            key (str): The key of the row, as stored in the editlog.
+        """
+        with self.__lock__:
+            row = self.__rows__.get(key)
+            if row is None or all(isna(value) for value in row["values"].values()):
+                return None
+            return {
+                **{col: row["values"].get(col, nan) for col in self.editable_column_names},
+                "last_edit_date": row["last_edit_date"],
+                "last_action": row["last_action"],
+                "first_action": row["first_action"],
+            }
+
+    def get_edited_cells_df(self) -> DataFrame:
+        """
+        Returns a pandas DataFrame with the edited cells.
+
+        Returns:
+            pandas.DataFrame: A DataFrame containing only the edited rows and editable columns.
+        """
+        with self.__lock__:
+            # the dataframe is cached until the next edit; return a copy so that callers can't alter the cache
+            if self.__edited_cells_df__ is None:
+                self.__edited_cells_df__ = self.__build_edited_cells_df__()
+            return self.__edited_cells_df__.copy()
+
+    def __build_edited_cells_df__(self) -> DataFrame:
+        cols = self.primary_keys + self.editable_column_names + ["last_edit_date", "last_action", "first_action"]
+        all_columns_df = DataFrame(columns=cols)
+
+        # The pivot used by replay_edits only keeps keys with at least one non-missing value, in any of the columns found in the editlog
+        records = [
+            {
+                "key": key,
+                **row["values"],
+                "last_edit_date": row["last_edit_date"],
+                "last_action": row["last_action"],
+                "first_action": row["first_action"],
+            }
+            for key, row in self.__rows__.items()
+            if any(not isna(value) for value in row["values"].values())
+        ]
+        if not records:
+            return all_columns_df
+
+        edits_df = DataFrame(data=records)
+        edits_df = __unpack_keys__(edits_df, self.primary_keys).sort_values(self.primary_keys, kind="stable")
+        edits_df = edits_df[[col for col in edits_df.columns if col in cols]]
+        # this makes sure that all (editable) columns are here and in the right order
+        return concat([all_columns_df, edits_df.reset_index(drop=True)])[cols]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Iterable, List
+
+
+# Default maximum number of labels kept in the cache of a linked record
+DEFAULT_MAX_SIZE = 10000
+# Default time (in seconds) during which a cached label is used before being fetched again
+DEFAULT_TTL = 600.0
+# Default time (in seconds) between two checks of the linked dataset's last build date
+DEFAULT_BUILD_DATE_CHECK_INTERVAL = 30.0
+
+# Cached for keys which aren't in the linked dataset, so that looking them up again doesn't need a query either
+__NOT_FOUND__ = object()
+
+
+@dataclass
+class LabelCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class LinkedLabelCache:
+    """
+    Bounded cache of the labels of a linked dataset, shared by all the threads serving webapp requests.
+
+    Least recently used labels are evicted when the cache is full, and labels are fetched again once their time to live has expired. The whole cache is invalidated when the linked dataset's last build date changes: it is checked at most once every `build_date_check_interval` seconds. Datasets without a build date (e.g. external tables, or tables which were never built) rely on the time to live only.
+
+    Args:
+        get_build_date (callable): (Optional) Returns the last build date of the linked dataset.
+        max_size (int): Maximum number of labels in the cache.
+        ttl (float): Time in seconds during which a cached label is used.
+        build_date_check_interval (float): Minimum time in seconds between two calls to `get_build_date`.
+        clock (callable): Returns the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        get_build_date: Callable[[], Any] | None = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: float = DEFAULT_TTL,
+        build_date_check_interval: float = DEFAULT_BUILD_DATE_CHECK_INTERVAL,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.get_build_date = get_build_date
+        self.max_size = max_size
+        self.ttl = ttl
+        self.build_date_check_interval = build_date_check_interval
+        self.clock = clock
+        # key -> (label, expiration time), from least to most recently used
+        self.__entries__: OrderedDict[str, tuple] = OrderedDict()
+        self.__stats__ = LabelCacheStats()
+        self.__lock__ = Lock()
+        self.__build_date__ = None
+        self.__next_build_date_check__ = None
+        # set once it was logged that the build date couldn't be read, until it can be read again
+        self.__build_date_missing__ = False
+
+    def get_many(self, keys: Iterable[str], fetch: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Returns the labels of the given keys, calling `fetch` once with the keys which aren't in the cache (or whose label has expired).
+
+        `fetch` must return a dict mapping each key found in the linked dataset to its label; keys which aren't found are missing from the return value too.
+        """
+        self.__check_build_date__()
+        labels = {}
+        missing_keys = []
+        with self.__lock__:
+            now = self.clock()
+            for key in dict.fromkeys(keys):
+                entry = self.__entries__.get(key)
+                if entry is not None and entry[1] <= now:
+                    del self.__entries__[key]
+                    self.__stats__.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.__stats__.misses += 1
+                    missing_keys.append(key)
+                    continue
+                self.__stats__.hits += 1
+                self.__entries__.move_to_end(key)
+                if entry[0] is not __NOT_FOUND__:
+                    labels[key] = entry[0]
+        if not missing_keys:
+            return labels
+
+        fetched_labels = fetch(missing_keys)
+        with self.__lock__:
+            expiration = self.clock() + self.ttl
+            for key in missing_keys:
+                label = fetched_labels.get(key, __NOT_FOUND__)
+                self.__entries__[key] = (label, expiration)
+                self.__entries__.move_to_end(key)
+                if label is not __NOT_FOUND__:
+                    labels[key] = label
+            while len(self.__entries__) > self.max_size:
+                self.__entries__.popitem(last=False)
+                self.__stats__.evictions += 1
+        return labels
+
+    def invalidate(self) -> None:
+        """
+        Removes all labels from the cache.
+        """
+        with self.__lock__:
+            self.__entries__.clear()
+            self.__stats__.invalidations += 1
+
+    def get_stats(self) -> dict:
+        """
+        Returns statistics on the lookups made so far: number of hits and misses, hit rate, and number of labels evicted, expired or invalidated.
+        """
+        with self.__lock__:
+            return {**self.__stats__.to_dict(), "size": len(self.__entries__)}
+
+    def __check_build_date__(self) -> None:
+        if self.get_build_date is None:
+            return
+        now = self.clock()
+        with self.__lock__:
+            if self.__next_build_date_check__ is not None and now < self.__next_build_date_check__:
+                return
+            self.__next_build_date_check__ = now + self.build_date_check_interval
+        try:
+            build_date = self.get_build_date()
+        except Exception:
+            # get_last_build_date fails for datasets which have no build date
+            build_date = None
+            logging.debug("Failed to get the last build date of a linked dataset.", exc_info=True)
+        if build_date is None:
+            if not self.__build_date_missing__:
+                logging.info("The linked dataset has no build date: its labels are cached for their time to live only.")
+                self.__build_date_missing__ = True
+            return
+        self.__build_date_missing__ = False
+        if self.__build_date__ is not None and build_date != self.__build_date__:
+            logging.info("The linked dataset has changed: invalidating the cache of its labels.")
+            self.invalidate()
+        self.__build_date__ = build_date
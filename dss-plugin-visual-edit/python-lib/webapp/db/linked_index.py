@@ -0,0 +1,77 @@
+from __future__ import annotations
+from typing import List, Union
+from numpy import argsort, searchsorted
+from pandas import DataFrame
+
+# Greatest character, appended to a search term to get the upper bound of labels starting with this term
+__MAX_CHAR__ = "\U0010ffff"
+
+
+def __to_strings__(df: DataFrame) -> DataFrame:
+    """Cast the values of a dataframe to strings, with missing values as empty strings"""
+    # fillna("") would fail on Int64 columns
+    return df.astype(object).where(df.notnull(), "").astype(str)
+
+
+class LinkedRecordIndex:
+    """
+    Lookup index of a linked dataset loaded in memory, built once to serve searches on labels.
+
+    Labels are lower-cased and sorted along with the options that the `lookup` endpoint returns for them (see `get_formatted_items_from_linked_df`), so that searching for the labels that start with a term is a binary search followed by a slice, without filtering, casting or sorting the linked dataframe.
+
+    Args:
+        linked_df (DataFrame): The dataframe of the linked dataset, indexed by its key column.
+        key_col (str): The name of the key column.
+        label_col (str): The name of the label column.
+        lookup_cols (list): (Optional) The names of additional columns to return with each option.
+    """
+
+    def __init__(
+        self,
+        linked_df: DataFrame,
+        key_col: str,
+        label_col: str,
+        lookup_cols: Union[List[str], None] = None,
+    ) -> None:
+        selected_columns = [key_col]
+        if label_col != key_col:
+            selected_columns += [label_col]
+        if lookup_cols:
+            selected_columns += [col for col in lookup_cols if col not in selected_columns]
+
+        selected_df = linked_df.reset_index()[selected_columns]
+        # the data table component does not handle NaN values; it also expects all values to be strings
+        selected_df = __to_strings__(selected_df)
+        labels = selected_df[label_col].str.lower().to_numpy(dtype=str)
+        order = argsort(labels, kind="stable")
+        self.__labels__ = labels[order]
+        selected_df = selected_df.iloc[order]
+        self.__keys__ = selected_df[key_col].to_list()
+        if len(selected_columns) == 1:
+            self.__items__ = selected_df[key_col].to_list()
+        else:
+            self.__items__ = selected_df.rename(columns={key_col: "value", label_col: "label"}).to_dict("records")
+
+    def __len__(self) -> int:
+        return len(self.__items__)
+
+    def search(self, term: str, n_results: int, exclude_key: Union[str, None] = None) -> list:
+        """
+        Returns the options whose lower-cased label starts with a term (already lower-cased), sorted by label.
+
+        Params:
+        - term: search term; all options match an empty term
+        - n_results: maximum number of options to return
+        - exclude_key: (Optional) key of an option not to return
+        """
+        start = searchsorted(self.__labels__, term, side="left")
+        end = searchsorted(self.__labels__, term + __MAX_CHAR__, side="left") if term else len(self.__labels__)
+        if exclude_key is None:
+            return self.__items__[start : min(end, start + n_results)]
+        results = []
+        for position in range(start, end):
+            if len(results) >= n_results:
+                break
+            if self.__keys__[position] != exclude_key:
+                results.append(self.__items__[position])
+        return results
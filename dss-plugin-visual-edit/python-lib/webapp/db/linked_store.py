@@ -0,0 +1,245 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import shutil
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Union
+from uuid import uuid4
+from numpy import argsort, array, cumsum, empty, int64, memmap, uint8
+from pandas import DataFrame
+from webapp.db.linked_index import __MAX_CHAR__, __to_strings__
+
+__META_FILE__ = "meta.json"
+__FORMAT_VERSION__ = 1
+
+
+def __open_array__(path: str, dtype) -> Any:
+    # numpy can't memory-map empty files
+    if os.path.getsize(path) == 0:
+        return empty(0, dtype=dtype)
+    return memmap(path, dtype=dtype, mode="r")
+
+
+def __replace_dir__(src: str, dst: str) -> None:
+    """Move a directory into place, replacing the directory found there if any, so that other processes never see a partially written directory"""
+    for _ in range(3):
+        try:
+            # atomic, but only if dst doesn't exist or is empty
+            os.replace(src, dst)
+            return
+        except OSError:
+            if not os.path.exists(dst):
+                raise
+        old = f"{dst}.{os.getpid()}.{uuid4().hex}.old"
+        try:
+            os.replace(dst, old)
+        except FileNotFoundError:
+            # another process moved it away first
+            continue
+        # files still memory-mapped by readers stay readable after they are deleted
+        shutil.rmtree(old, ignore_errors=True)
+    raise OSError(f"Failed to move {src} to {dst}, as other processes keep writing it.")
+
+
+class __StringColumn__:
+    """Column of strings stored in a file of concatenated UTF-8 values and a file of offsets, both memory-mapped"""
+
+    def __init__(self, path: str) -> None:
+        self.data = __open_array__(path + ".bytes", uint8)
+        self.offsets = __open_array__(path + ".offsets", int64)
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.data[self.offsets[i] : self.offsets[i + 1]]).decode("utf-8")
+
+
+class __SortedView__:
+    """Read-only view of a column in the order given by a permutation, to be searched with `bisect`"""
+
+    def __init__(self, column: __StringColumn__, order) -> None:
+        self.column = column
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, i: int) -> str:
+        return self.column[int(self.order[i])]
+
+
+class __StringColumnWriter__:
+    def __init__(self, path: str) -> None:
+        self.data_file = open(path + ".bytes", "wb")
+        self.offsets_file = open(path + ".offsets", "wb")
+        self.size = 0
+        array([0], dtype=int64).tofile(self.offsets_file)
+
+    def write(self, values: Iterable[str]) -> None:
+        encoded = [value.encode("utf-8") for value in values]
+        self.data_file.write(b"".join(encoded))
+        offsets = self.size + cumsum([len(value) for value in encoded], dtype=int64)
+        offsets.tofile(self.offsets_file)
+        if len(offsets):
+            self.size = int(offsets[-1])
+
+    def close(self) -> None:
+        self.data_file.close()
+        self.offsets_file.close()
+
+
+class LinkedRecordStore:
+    """
+    Disk-backed store of a linked dataset which is too large to be loaded in memory, used to get labels and search options like `LinkedRecordIndex`.
+
+    Only the key, label and lookup columns are written to local files, as strings, along with the orders of rows by key and by lower-cased label. The files are memory-mapped, so that the operating system only keeps the pages being read in memory. Searching for a key or for the labels that start with a term is a binary search on these files.
+
+    The files are written once by `build` and reused as long as the linked dataset's build date doesn't change.
+
+    Args:
+        path (str): The directory where the files were written by `build`.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(os.path.join(path, __META_FILE__), encoding="utf-8") as fp:
+            meta = json.load(fp)
+        self.path = path
+        self.key_col = meta["key_col"]
+        self.label_col = meta["label_col"]
+        self.lookup_cols = meta["lookup_cols"]
+        self.__columns__ = [__StringColumn__(os.path.join(path, f"col_{i}")) for i in range(len(meta["columns"]))]
+        self.__column_names__ = meta["columns"]
+        self.__keys__ = self.__columns__[0]
+        self.__labels__ = self.__columns__[self.__column_names__.index(self.label_col)]
+        self.__lower_labels__ = __StringColumn__(os.path.join(path, "lower_label"))
+        self.__by_key__ = __SortedView__(self.__keys__, __open_array__(os.path.join(path, "by_key.idx"), int64))
+        self.__by_label__ = __SortedView__(
+            self.__lower_labels__, __open_array__(os.path.join(path, "by_label.idx"), int64)
+        )
+
+    @staticmethod
+    def build(
+        chunks: Iterable[DataFrame],
+        path: str,
+        key_col: str,
+        label_col: str,
+        lookup_cols: Union[List[str], None] = None,
+        build_date: Any = None,
+    ) -> "LinkedRecordStore":
+        """
+        Writes the rows of a linked dataset to a directory, unless they were already written for the same build date, and returns the store reading them.
+
+        Params:
+        - chunks: dataframes of rows of the linked dataset (e.g. from `iter_dataframe`), not indexed
+        - path: directory where the files are written
+        - key_col, label_col, lookup_cols: columns of the linked dataset to store
+        - build_date: (Optional) last build date of the linked dataset; files are always rewritten when it's None
+        """
+        columns = [key_col]
+        if label_col != key_col:
+            columns += [label_col]
+        columns += [col for col in (lookup_cols or []) if col not in columns]
+        meta = {
+            "version": __FORMAT_VERSION__,
+            "build_date": build_date,
+            "key_col": key_col,
+            "label_col": label_col,
+            "lookup_cols": list(lookup_cols or []),
+            "columns": columns,
+        }
+        meta_path = os.path.join(path, __META_FILE__)
+        if build_date is not None and os.path.exists(meta_path):
+            try:
+                with open(meta_path, encoding="utf-8") as fp:
+                    if json.load(fp) == meta:
+                        logging.info(f"Reusing the linked dataset stored in {path}")
+                        return LinkedRecordStore(path)
+            except Exception:
+                logging.warning(f"Failed to read {meta_path}, writing it again.", exc_info=True)
+
+        # files are written to a directory of this process, then moved into place: backends of other webapps may build the same store concurrently
+        build_path = f"{path}.{os.getpid()}.{uuid4().hex}.tmp"
+        os.makedirs(build_path)
+        try:
+            n_rows = LinkedRecordStore.__write__(chunks, build_path, columns, key_col, label_col, meta)
+            __replace_dir__(build_path, path)
+        finally:
+            shutil.rmtree(build_path, ignore_errors=True)
+        logging.info(f"Stored {n_rows} rows of linked dataset in {path}")
+        return LinkedRecordStore(path)
+
+    @staticmethod
+    def __write__(
+        chunks: Iterable[DataFrame], path: str, columns: List[str], key_col: str, label_col: str, meta: dict
+    ) -> int:
+        writers = [__StringColumnWriter__(os.path.join(path, f"col_{i}")) for i in range(len(columns))]
+        lower_labels_writer = __StringColumnWriter__(os.path.join(path, "lower_label"))
+        # only keys and lower-cased labels are kept in memory, to be sorted
+        keys: List[str] = []
+        lower_labels: List[str] = []
+        try:
+            for chunk in chunks:
+                chunk = __to_strings__(chunk[columns])
+                for writer, col in zip(writers, columns):
+                    writer.write(chunk[col])
+                chunk_lower_labels = chunk[label_col].str.lower()
+                lower_labels_writer.write(chunk_lower_labels)
+                keys += chunk[key_col].to_list()
+                lower_labels += chunk_lower_labels.to_list()
+        finally:
+            for writer in writers + [lower_labels_writer]:
+                writer.close()
+        argsort(array(keys, dtype=object), kind="stable").astype(int64).tofile(os.path.join(path, "by_key.idx"))
+        argsort(array(lower_labels, dtype=object), kind="stable").astype(int64).tofile(
+            os.path.join(path, "by_label.idx")
+        )
+        # the meta file is written last: its presence means that the other files are complete
+        with open(os.path.join(path, __META_FILE__), "w", encoding="utf-8") as fp:
+            json.dump(meta, fp)
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self.__keys__)
+
+    def __get_option__(self, row: int) -> Union[str, Dict[str, str]]:
+        # same format as the items of `get_formatted_items_from_linked_df`
+        if len(self.__column_names__) == 1:
+            return self.__keys__[row]
+        item = {}
+        for col, column in zip(self.__column_names__, self.__columns__):
+            if col == self.key_col:
+                item["value"] = column[row]
+            elif col == self.label_col:
+                item["label"] = column[row]
+            else:
+                item[col] = column[row]
+        return item
+
+    def get_labels(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns a dict mapping each of the given keys found in the store to its label (the label of the first row with this key).
+        """
+        labels = {}
+        for key in keys:
+            position = bisect_left(self.__by_key__, key)
+            if position < len(self.__by_key__) and self.__by_key__[position] == key:
+                labels[key] = self.__labels__[int(self.__by_key__.order[position])]
+        return labels
+
+    def search(self, term: str, n_results: int, exclude_key: Union[str, None] = None) -> list:
+        """
+        Returns the options whose lower-cased label starts with a term (already lower-cased), sorted by label, in the same format as `LinkedRecordIndex.search`.
+        """
+        start = bisect_left(self.__by_label__, term) if term else 0
+        end = bisect_left(self.__by_label__, term + __MAX_CHAR__) if term else len(self.__by_label__)
+        results = []
+        for position in range(start, end):
+            if len(results) >= n_results:
+                break
+            row = int(self.__by_label__.order[position])
+            if exclude_key is not None and self.__keys__[row] == exclude_key:
+                continue
+            results.append(self.__get_option__(row))
+        return results
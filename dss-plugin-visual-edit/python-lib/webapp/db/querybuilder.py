@@ -1,11 +1,7 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 import dataiku
-from dataiku.sql import Column, toSQL, List as ListBuilder, Expression
-
-
-def quote_identifier(string: str) -> str:
-    sep = '"'
-    return sep + string.replace(sep, sep + sep) + sep
+from dataiku.sql import Column, Constant, toSQL, List as ListBuilder, Expression
+from sql_utils import quote_identifier
 
 
 def get_quoted_table_full_name(
@@ -172,4 +168,42 @@ class BigQueryInsertQueryBuilder:
             + " VALUES " + self.get_wrapped_values()  # VALUES (val1,val2,...),(val1,val2,...)
             + ";"
         )
-        return query
\ No newline at end of file
+        return query
+
+
+class PreparedInsertQuery:
+    """
+    INSERT statement prepared once for a dataset and a list of columns: the table name and the column list are resolved at construction, so that building a statement for new rows only requires writing values. Values are written as literals of the dataset's SQL dialect by `toSQL`.
+
+    Args:
+        builder_class: `InsertQueryBuilder` or `BigQueryInsertQueryBuilder`, used to resolve the table name and write the column list.
+        dataset (dataiku.Dataset): The dataset to insert rows into.
+        columns (list): The names of the columns to insert values into.
+        raw_columns (list): (Optional) Columns whose values are already written as SQL and are inserted as-is. Values must be generated by the caller, never by users.
+    """
+
+    def __init__(self, builder_class, dataset: dataiku.Dataset, columns: List[str], raw_columns: Sequence[str] = ()):
+        builder = builder_class(dataset).add_columns(columns)
+        self.columns = list(columns)
+        self.dataset = dataset
+        self.query_start = builder._query_start() + " " + builder.get_wrapped_cols() + " VALUES "
+        self.raw_column_indices = {i for i, column in enumerate(self.columns) if column in raw_columns}
+
+    def render_literal(self, value: Optional[str]) -> str:
+        return toSQL(Constant(value), dataset=self.dataset)
+
+    def get_wrapped_value(self, row: Sequence[Optional[str]]) -> str:
+        if len(row) != len(self.columns):
+            raise ValueError("Number of values does not match number of columns.")
+        return (
+            "("
+            + ", ".join(
+                value if i in self.raw_column_indices else self.render_literal(value) for i, value in enumerate(row)
+            )
+            + ")"
+        )
+
+    def build(self, rows: List[Sequence[Optional[str]]]) -> str:
+        if not rows:
+            raise ValueError("No values found for the insert query.")
+        return self.query_start + ",".join(self.get_wrapped_value(row) for row in rows) + ";"
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import json
+import logging
+from collections import deque
+from queue import Empty, Full, Queue
+from threading import Lock
+from typing import Any, Deque, Iterator, List, Tuple
+
+
+# Default number of events kept to be replayed to clients which reconnect
+DEFAULT_HISTORY_SIZE = 1000
+# Default number of events waiting to be sent to a client before it's considered too slow
+DEFAULT_QUEUE_SIZE = 1000
+# Default time (in seconds) without events after which a comment is sent, so that proxies keep the connection open and disconnected clients are detected
+DEFAULT_HEARTBEAT_INTERVAL = 15.0
+# Time (in milliseconds) after which browsers reconnect when the connection is lost
+RECONNECT_DELAY = 3000
+# Event sent to clients which may have missed events, and should reload their data
+RESET_EVENT = "reset"
+
+
+def format_event(event_id: int, event: str, data: Any) -> str:
+    """
+    Formats an event in the text/event-stream format of server-sent events.
+    """
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class __Subscription__:
+    def __init__(self, queue_size: int) -> None:
+        self.queue: Queue[str] = Queue(maxsize=queue_size)
+        # set when an event couldn't be queued because the client doesn't read them fast enough
+        self.overflowed = False
+
+
+class EventBroadcaster:
+    """
+    Sends events to all the clients connected to a server-sent events stream.
+
+    Each client gets its own queue of formatted events, read by the thread serving its stream. Publishing never blocks: when a client doesn't read events fast enough, its stream ends with a reset event. The last events are kept, so that clients which reconnect with the ID of the last event they received (as browsers do automatically) get the events they missed.
+
+    Args:
+        history_size (int): Number of events kept to be replayed.
+        queue_size (int): Maximum number of events waiting to be sent to a client.
+    """
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE, queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self.__last_event_id__ = 0
+        self.__history__: Deque[Tuple[int, str]] = deque(maxlen=history_size)
+        self.__subscriptions__: List[__Subscription__] = []
+        self.__lock__ = Lock()
+
+    def publish(self, event: str, data: Any) -> int:
+        """
+        Sends an event with JSON-serializable data to all connected clients, and returns its ID.
+        """
+        with self.__lock__:
+            self.__last_event_id__ += 1
+            message = format_event(self.__last_event_id__, event, data)
+            self.__history__.append((self.__last_event_id__, message))
+            for subscription in self.__subscriptions__:
+                try:
+                    subscription.queue.put_nowait(message)
+                except Full:
+                    subscription.overflowed = True
+            return self.__last_event_id__
+
+    def get_stats(self) -> dict:
+        """
+        Returns the number of connected clients and the ID of the last event published.
+        """
+        with self.__lock__:
+            return {"clients": len(self.__subscriptions__), "last_event_id": self.__last_event_id__}
+
+    def stream(
+        self, last_event_id: str | None = None, heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL
+    ) -> Iterator[str]:
+        """
+        Yields the events published from now on, in the text/event-stream format, until the client disconnects.
+
+        Params:
+        - last_event_id: (Optional) value of the Last-Event-ID header sent by a reconnecting client; the events published since this one are sent first, or a reset event if some of them are no longer kept
+        - heartbeat_interval: time in seconds without events after which a comment is sent
+        """
+        subscription = __Subscription__(self.queue_size)
+        with self.__lock__:
+            # events published after this point are queued, so that none are missed between the replay and the stream
+            missed = self.__get_missed_events__(last_event_id)
+            self.__subscriptions__.append(subscription)
+        try:
+            yield f"retry: {RECONNECT_DELAY}\n\n"
+            if missed is None:
+                yield format_event(self.__last_event_id__, RESET_EVENT, {})
+            else:
+                for message in missed:
+                    yield message
+            while True:
+                try:
+                    message = subscription.queue.get(timeout=heartbeat_interval)
+                except Empty:
+                    message = ": heartbeat\n\n"
+                if subscription.overflowed:
+                    logging.warning("A client didn't read events fast enough, closing its stream.")
+                    yield format_event(self.__last_event_id__, RESET_EVENT, {})
+                    return
+                yield message
+        finally:
+            with self.__lock__:
+                self.__subscriptions__.remove(subscription)
+
+    def __get_missed_events__(self, last_event_id: str | None) -> List[str] | None:
+        # returns None if some events published after last_event_id are no longer in the history
+        if not last_event_id:
+            return []
+        try:
+            last_event_id_int = int(last_event_id)
+        except ValueError:
+            return None
+        if last_event_id_int > self.__last_event_id__:
+            # the server restarted since the client connected
+            return None
+        oldest_kept_id = self.__history__[0][0] if self.__history__ else self.__last_event_id__ + 1
+        if last_event_id_int < oldest_kept_id - 1:
+            return None
+        return [message for event_id, message in self.__history__ if event_id > last_event_id_int]
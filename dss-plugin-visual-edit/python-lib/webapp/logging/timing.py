@@ -0,0 +1,67 @@
+from __future__ import annotations
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Tuple
+
+
+class PhaseTimer:
+    """
+    Measures the duration of the phases of a process, which may run concurrently in different threads, and logs them in a report.
+
+    Args:
+        name (str): The name of the process, used in the report.
+        clock (callable): Returns the current time in seconds.
+    """
+
+    def __init__(self, name: str, clock: Callable[[], float] = perf_counter) -> None:
+        self.name = name
+        self.clock = clock
+        self.start = clock()
+        # (phase name, start time, duration), in the order in which phases end
+        self.__phases__: List[Tuple[str, float, float]] = []
+        self.__lock__ = Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measures the duration of the code run in this context, even if it raises an exception.
+        """
+        start = self.clock()
+        try:
+            yield
+        finally:
+            with self.__lock__:
+                self.__phases__.append((name, start, self.clock() - start))
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """
+        Returns a function which calls `function` in a phase, e.g. to be submitted to a thread pool.
+        """
+
+        @wraps(function)
+        def timed_function(*args, **kwargs):
+            with self.phase(name):
+                return function(*args, **kwargs)
+
+        return timed_function
+
+    def get_durations(self) -> Dict[str, float]:
+        """
+        Returns the duration in seconds of each phase, by phase name, in the order in which phases started.
+        """
+        with self.__lock__:
+            return {name: duration for name, _, duration in sorted(self.__phases__, key=lambda phase: phase[1])}
+
+    def log_report(self) -> None:
+        """
+        Logs the total duration of the process since this timer was created, and the start time and duration of each phase.
+        """
+        with self.__lock__:
+            phases = sorted(self.__phases__, key=lambda phase: phase[1])
+        lines = [f"{self.name} took {self.clock() - self.start:.2f}s:"]
+        for name, start, duration in phases:
+            lines.append(f"- {name}: {duration:.2f}s (started at {start - self.start:.2f}s)")
+        logging.info("\n".join(lines))
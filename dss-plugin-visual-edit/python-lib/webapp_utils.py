@@ -1,9 +1,20 @@
-from pandas import DataFrame
-from json import loads
-from os import getenv
+import logging
+from json import dump, load, loads
+from os import getenv, getpid, makedirs, replace
+from os.path import dirname, join
+from tempfile import gettempdir
 import dataiku
 import requests
 
+VISUAL_EDIT_WEBAPP_TYPE = "webapp_visual-edit_visual-edit"
+
+# File where the IDs of the webapps found for each original dataset are saved, to be reused when the webapp's backend restarts
+WEBAPP_IDS_CACHE_PATH = join(gettempdir(), "visual-edit", "webapp-ids.json")
+
+# Session reused by all calls to the REST API, so that connections are pooled
+__session__ = requests.Session()
+__session__.verify = False
+
 
 def call_rest_api(path):
     PORT = dataiku.base.remoterun.get_env_var("DKU_BASE_PORT")
@@ -16,10 +27,9 @@ def call_rest_api(path):
         + getenv("DKU_CURRENT_PROJECT_KEY")
     )
     return loads(
-        requests.get(
+        __session__.get(
             url=BASE_API_URL + path,
             headers=dataiku.core.intercom.get_auth_headers(),
-            verify=False,
         ).text
     )
 
@@ -28,15 +38,55 @@ def get_webapp_json(webapp_ID):
     return call_rest_api("/webapps/" + webapp_ID)
 
 
+def __get_original_ds_name__(webapp_json):
+    return (webapp_json.get("config") or {}).get("original_dataset")
+
+
+def __read_webapp_ids_cache__():
+    try:
+        with open(WEBAPP_IDS_CACHE_PATH, encoding="utf-8") as fp:
+            return load(fp)
+    except Exception:
+        return {}
+
+
+def __write_webapp_ids_cache__(cache):
+    try:
+        makedirs(dirname(WEBAPP_IDS_CACHE_PATH), exist_ok=True)
+        tmp_path = WEBAPP_IDS_CACHE_PATH + f".{getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            dump(cache, fp)
+        replace(tmp_path, WEBAPP_IDS_CACHE_PATH)
+    except Exception:
+        logging.warning("Failed to save webapp IDs.", exc_info=True)
+
+
+def find_webapp(original_ds_name):
+    """
+    Find the Visual Edit webapp whose original dataset is `original_ds_name`, in the current project
+
+    Webapps are listed once. The ID of the webapp found for this dataset the last time is checked first; otherwise, the configuration of each Visual Edit webapp is read until a match is found (unless it was given in the list).
+
+    Returns: the webapp's item in the list of webapps, with its `id` and `name`
+    """
+    webapps = [w for w in call_rest_api("/webapps/") if w.get("type") == VISUAL_EDIT_WEBAPP_TYPE]
+    cache = __read_webapp_ids_cache__()
+    cache_key = f"{getenv('DKU_CURRENT_PROJECT_KEY')}.{original_ds_name}"
+    cached_id = cache.get(cache_key)
+
+    # Revalidate the cached ID: the webapp may have been deleted or its original dataset changed
+    candidates = sorted(webapps, key=lambda w: w.get("id") != cached_id)
+    for webapp in candidates:
+        config_ds_name = __get_original_ds_name__(webapp)
+        if config_ds_name is None:
+            config_ds_name = __get_original_ds_name__(get_webapp_json(webapp["id"]))
+        if config_ds_name == original_ds_name:
+            if webapp["id"] != cached_id:
+                cache[cache_key] = webapp["id"]
+                __write_webapp_ids_cache__(cache)
+            return webapp
+    raise ValueError(f"No Visual Edit webapp found for dataset {original_ds_name}")
+
+
 def find_webapp_id(original_ds_name):
-    webapps_df = DataFrame(call_rest_api("/webapps/"))
-    webapps_edit_df = webapps_df[
-        webapps_df["type"] == "webapp_visual-edit_visual-edit"
-    ]
-    webapps_edit_df["original_ds_name"] = webapps_edit_df.apply(
-        lambda row: get_webapp_json(row["id"]).get("config").get("original_dataset"),
-        axis=1,
-    )
-    return webapps_edit_df[
-        webapps_edit_df["original_ds_name"] == original_ds_name
-    ].iloc[0]["id"]
+    return find_webapp(original_ds_name)["id"]
@@ -0,0 +1,31 @@
+from time import sleep
+from unittest.mock import MagicMock
+
+from webapp.db.build_date_poller import BuildDatePoller
+
+
+def test_poll():
+    get_build_date = MagicMock(side_effect=[1000, Exception("unavailable"), 1000, 2000])
+    on_change = MagicMock()
+    poller = BuildDatePoller(get_build_date, on_change=on_change)
+    assert poller.get() is None
+    assert poller.poll() == 1000
+    # the last value read is kept when the build date can't be read
+    assert poller.poll() == 1000
+    assert poller.poll() == 1000
+    on_change.assert_not_called()
+    assert poller.poll() == 2000
+    assert poller.get() == 2000
+    on_change.assert_called_once_with(2000)
+
+
+def test_background_thread():
+    build_dates = iter(range(1000, 100000))
+    get_build_date = MagicMock(side_effect=lambda: next(build_dates))
+    poller = BuildDatePoller(get_build_date, interval=0.01).start()
+    # the build date is read once when starting
+    assert poller.get() == 1000
+    sleep(0.1)
+    poller.close()
+    assert get_build_date.call_count > 2
+    assert poller.get() == 1000 + get_build_date.call_count - 1
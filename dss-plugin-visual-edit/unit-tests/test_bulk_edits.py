@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pandas import DataFrame
+
+import DataEditor as data_editor
+from DataEditor import DataEditor, EditFailure, EditSuccess
+
+
+def get_data_editor(primary_keys):
+    # only the attributes used to log edits are set
+    de = DataEditor.__new__(DataEditor)
+    de.primary_keys = primary_keys
+    de.editable_column_names = ["col1", "valid", "count"]
+    de.__boolean_column_names__ = {"valid"}
+    de.__integer_column_names__ = {"id", "year", "count"}
+    de.freeze_edits = False
+    de.authorized_users = []
+    de.editlog_writer = MagicMock()
+    return de
+
+
+@pytest.fixture(autouse=True)
+def user():
+    with patch.object(data_editor, "try_get_user_identifier", return_value="user"):
+        yield
+
+
+def get_written_logs(de):
+    de.editlog_writer.write.assert_called_once()
+    return [(log.key, log.column_name, log.value, log.action) for log in de.editlog_writer.write.call_args[0][0]]
+
+
+def test_update_rows():
+    de = get_data_editor(["id"])
+    rows = DataFrame({"id": [1, 2], "col1": ["a", None], "valid": ["True", "false"], "col3": ["x", None]})
+    results = de.update_rows(rows)
+    # missing values are not logged
+    assert get_written_logs(de) == [
+        ("1", "col1", "a", "update"),
+        ("1", "valid", "True", "update"),
+        ("2", "valid", "False", "update"),
+    ]
+    assert [type(r) for r in results] == [EditSuccess, EditSuccess, EditFailure, EditSuccess]
+
+
+def test_create_rows_with_multiple_primary_keys():
+    de = get_data_editor(["name", "year"])
+    rows = DataFrame({"name": ["cat", "dog"], "year": [2022, 2023], "col1": ["a", None]})
+    de.create_rows(rows)
+    assert get_written_logs(de) == [
+        ("('cat', 2022)", "col1", "a", "create"),
+        ("('dog', 2023)", "col1", None, "create"),
+    ]
+
+
+def test_update_rows_with_mixed_columns():
+    de = get_data_editor(["id"])
+    # rows which don't have values for the same columns: pandas turns integer columns with missing values into floats
+    rows = [{"id": 1, "count": 42}, {"id": 2, "col1": "a"}]
+    expected_logs = [("1", "count", "42", "update"), ("2", "col1", "a", "update")]
+    de.update_rows(DataFrame(rows))
+    assert get_written_logs(de) == expected_logs
+    # as built by the backend
+    de.editlog_writer.reset_mock()
+    de.update_rows(DataFrame(rows, dtype=object))
+    assert get_written_logs(de) == expected_logs
+
+
+def test_delete_rows():
+    de = get_data_editor(["id"])
+    de.delete_rows(DataFrame({"id": ["a", "b"], "col1": ["x", "y"]}))
+    assert get_written_logs(de) == [("a", None, None, "delete"), ("b", None, None, "delete")]
+    with pytest.raises(ValueError):
+        de.delete_rows(DataFrame({"col1": ["x"]}))
@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import DatasetSQL as datasetsql
+from DatasetSQL import DatasetSQL
+
+
+@pytest.fixture
+def dataset_sql():
+    with patch.object(datasetsql, "Dataset") as mock_dataset, patch.object(datasetsql, "SQLExecutor2"):
+        mock_dataset.return_value.get_config.return_value = {"params": {"connection": "db", "table": "companies"}}
+        mock_dataset.return_value.read_schema.return_value = [
+            {"name": "id", "type": "bigint"},
+            {"name": "name", "type": "string"},
+        ]
+        yield DatasetSQL("companies", "PROJECT")
+
+
+@pytest.fixture
+def mock_client():
+    # each query returns the rows whose key is in the query's list of keys
+    def sql_query(query, connection, project_key):
+        streamed_query = MagicMock(name="MockStreamedQuery")
+        streamed_query.iter_rows.return_value = [[key, f"Company {key}"] for key in query if key != 13]
+        return streamed_query
+
+    with patch.object(datasetsql, "client") as mock_client, patch.object(
+        datasetsql, "Column"
+    ), patch.object(datasetsql, "List", side_effect=lambda *constants: [c.v for c in constants]), patch.object(
+        datasetsql, "SelectQuery"
+    ) as mock_select_query, patch.object(
+        datasetsql, "toSQL", side_effect=lambda query, dataset: mock_select_query.last_keys
+    ):
+        datasetsql.Column.return_value.in_.side_effect = lambda keys: setattr(mock_select_query, "last_keys", keys)
+        mock_client.sql_query.side_effect = sql_query
+        yield mock_client
+
+
+def test_get_cell_values(dataset_sql, mock_client):
+    values = dataset_sql.get_cell_values("id", ["12", "13", 12, "", "null", None], "name")
+    assert values == {12: "Company 12"}
+    mock_client.sql_query.assert_called_once()
+
+
+def test_get_cell_values_in_chunks(dataset_sql, mock_client):
+    with patch.object(datasetsql, "MAX_KEYS_PER_QUERY", 2):
+        values = dataset_sql.get_cell_values("id", [str(key) for key in range(5)], "name")
+    assert values == {key: f"Company {key}" for key in range(5)}
+    assert mock_client.sql_query.call_count == 3
+
+
+def test_get_cell_values_with_invalid_key(dataset_sql, mock_client):
+    assert dataset_sql.get_cell_values("id", ["abc", "1"], "name") == {1: "Company 1"}
+
+
+def test_get_cell_values_with_large_keys(dataset_sql, mock_client):
+    # above 2^53, integers can't be represented exactly as floats
+    values = dataset_sql.get_cell_values("id", ["9007199254740993", "3.0"], "name")
+    assert values == {9007199254740993: "Company 9007199254740993", 3: "Company 3"}
+
+
+def test_get_rows_by_prefix(dataset_sql):
+    with patch.object(datasetsql, "SelectQuery") as mock_select_query, patch.object(
+        datasetsql,
+        "toSQL",
+        side_effect=lambda expression, dataset: "query" if isinstance(expression, MagicMock) else expression.v,
+    ):
+        dataset_sql.get_rows_by_prefix(["id", "name", "id"], "name", "ca", 10)
+        select_query = mock_select_query.return_value
+        assert [column.v for column in select_query.select.call_args[0][0]] == ["id", "name"]
+        assert select_query.where.call_args[0][0].v == "LOWER(name) LIKE ca%"
+        select_query.limit.assert_called_once_with(10)
+        dataset_sql.executor.query_to_df.assert_called_once_with("query")
+
+        # all rows match an empty prefix
+        select_query.reset_mock()
+        dataset_sql.get_rows_by_prefix(["id", "name"], "name", "", 10)
+        select_query.where.assert_not_called()
+
+        with pytest.raises(ValueError):
+            dataset_sql.get_rows_by_prefix(["id", "name"], "name", "100%", 10)
+
+        # LOWER isn't applied to columns which aren't string columns
+        with pytest.raises(ValueError):
+            dataset_sql.get_rows_by_prefix(["id", "name"], "id", "12", 10)
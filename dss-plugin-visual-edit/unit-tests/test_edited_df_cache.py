@@ -0,0 +1,39 @@
+from threading import Lock
+from unittest.mock import MagicMock, patch
+
+from pandas import DataFrame
+
+import DataEditor as data_editor
+from DataEditor import DataEditor
+from webapp.db.editlogs import EditLog
+from webapp.db.editstate import EditState
+
+
+def get_data_editor():
+    # only the attributes used to cache the edited dataframe are set
+    de = DataEditor.__new__(DataEditor)
+    de.original_ds = MagicMock()
+    de.edit_state = EditState(["id"], ["comment"])
+    de.__original_df_cache__ = None
+    de.__edited_df_cache__ = None
+    de.__edited_df_lock__ = Lock()
+    return de
+
+
+def test_edited_df_cached():
+    de = get_data_editor()
+    original_df = DataFrame({"id": [1, 2], "name": ["a", "b"], "comment": ["x", "y"]})
+    with patch.object(
+        data_editor, "get_original_df", side_effect=lambda ds: (original_df.copy(), ["id"], ["name"], ["comment"])
+    ) as mock_get_original_df:
+        assert de.get_edited_df_cached(1)["comment"].to_list() == ["x", "y"]
+
+        # edits are applied again without reading the original dataset
+        de.edit_state.append(EditLog("1", "comment", "z", "2024-01-01T00:00:00", "user", "update"))
+        assert de.get_edited_df_cached(1)["comment"].to_list() == ["z", "y"]
+        assert mock_get_original_df.call_count == 1
+
+        # the original dataset is read again when it was rebuilt
+        original_df.loc[1, "comment"] = "w"
+        assert de.get_edited_df_cached(2)["comment"].to_list() == ["z", "w"]
+        assert mock_get_original_df.call_count == 2
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from time import monotonic, sleep
+from unittest.mock import MagicMock
+
+import pytest
+
+from webapp.db.editlog_writer import GroupCommitEditLogWriter
+from webapp.db.editlogs import EditLog
+
+
+def make_log(i, column_name="col"):
+    return EditLog(str(i), column_name, f"value {i}", f"2024-01-01T00:00:{i:02d}", "user", "update")
+
+
+@pytest.fixture
+def writer_factory():
+    writers = []
+
+    def create(appender, **kwargs):
+        writer = GroupCommitEditLogWriter(appender, **kwargs)
+        writers.append(writer)
+        return writer
+
+    yield create
+    for writer in writers:
+        writer.close()
+
+
+def test_concurrent_writes_are_grouped(writer_factory):
+    appender = MagicMock(name="MockAppender")
+    # requests submitted while a write is in progress are grouped in the next one
+    appender.append_many.side_effect = lambda logs: sleep(0.05)
+    written = []
+    writer = writer_factory(appender, on_append=written.extend, flush_interval=0.5)
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        list(pool.map(lambda i: writer.write([make_log(i)]), range(10)))
+    assert appender.append_many.call_count < 10
+    assert sorted(log.key for log in written) == [str(i) for i in range(10)]
+    stats = writer.get_stats()
+    assert stats["requests"] == 10
+    assert stats["logs"] == 10
+    assert stats["flushes"] == appender.append_many.call_count
+    assert stats["max_batch_size"] > 1
+
+
+def test_max_batch_size(writer_factory):
+    appender = MagicMock(name="MockAppender")
+    block = Event()
+    appender.append_many.side_effect = lambda logs: block.wait()
+    writer = writer_factory(appender, flush_interval=0.5, max_batch_size=2)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(writer.write, [make_log(i)]) for i in range(4)]
+        block.set()
+        for future in futures:
+            future.result()
+    assert all(len(call.args[0]) <= 2 for call in appender.append_many.call_args_list)
+
+
+def test_failure_only_affects_failing_request(writer_factory):
+    def append_many(logs):
+        if any(log.column_name == "bad" for log in logs):
+            raise RuntimeError("write failed")
+
+    appender = MagicMock(name="MockAppender")
+    appender.append_many.side_effect = append_many
+    written = []
+    writer = writer_factory(appender, on_append=written.extend, flush_interval=0.5)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        good = pool.submit(writer.write, [make_log(1)])
+        bad = pool.submit(writer.write, [make_log(2, "bad")])
+        good.result()
+        with pytest.raises(RuntimeError):
+            bad.result()
+    assert [log.key for log in written] == ["1"]
+
+
+def test_write_nothing(writer_factory):
+    appender = MagicMock(name="MockAppender")
+    writer_factory(appender).write([])
+    appender.append_many.assert_not_called()
+
+
+def test_write_without_concurrent_requests_is_not_delayed(writer_factory):
+    appender = MagicMock(name="MockAppender")
+    writer = writer_factory(appender, flush_interval=10)
+    start = monotonic()
+    writer.write([make_log(1)])
+    assert monotonic() - start < 5
+    appender.append_many.assert_called_once()
+
+
+def test_write_after_close(writer_factory):
+    appender = MagicMock(name="MockAppender")
+    writer = writer_factory(appender)
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.write([make_log(1)])
+    appender.append_many.assert_not_called()
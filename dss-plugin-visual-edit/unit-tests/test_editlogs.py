@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from webapp.db import editlogs
+from webapp.db.editlogs import COLUMNS, EditLog, GenericEditLogAppender, SQLEditLogAppender
+from webapp.db.querybuilder import InsertQueryBuilder, PreparedInsertQuery
+
+
+def make_logs(n):
+    return [EditLog(str(i), "col", f"value {i}", f"2024-01-01T00:00:{i:02d}", "user", "update") for i in range(n)]
+
+
+@pytest.fixture
+def mock_dataset():
+    dataset = MagicMock(name="MockDataset")
+    dataset.spec_item = {}
+    return dataset
+
+
+def test_generic_append_many_writes_once(mock_dataset):
+    appender = GenericEditLogAppender(mock_dataset)
+    appender.append_many(make_logs(3))
+    assert mock_dataset.write_dataframe.call_count == 1
+    df = mock_dataset.write_dataframe.call_args.args[0]
+    assert df["key"].to_list() == ["0", "1", "2"]
+    assert df.columns.to_list() == ["key", "column_name", "value", "date", "user", "action"]
+    assert mock_dataset.spec_item["appendMode"] is True
+
+
+def test_generic_append_many_empty(mock_dataset):
+    GenericEditLogAppender(mock_dataset).append_many([])
+    mock_dataset.write_dataframe.assert_not_called()
+
+
+class FakeConstant:
+    def __init__(self, value):
+        self.value = value
+
+
+def fake_to_sql(expression, dataset):
+    """Writes constants like a dialect where quotes are doubled and backslashes are escaped."""
+    if isinstance(expression, FakeConstant):
+        if expression.value is None:
+            return "NULL"
+        return "E'" + expression.value.replace("\\", "\\\\").replace("'", "''") + "'"
+    return "(" + ", ".join(f'"{column}"' for column in COLUMNS) + ")"
+
+
+@pytest.fixture
+def mock_sql_dialect():
+    with patch("webapp.db.querybuilder.Constant", FakeConstant), patch(
+        "webapp.db.querybuilder.toSQL", side_effect=fake_to_sql
+    ) as mock_to_sql, patch("webapp.db.querybuilder.get_table_name_from_dataset", return_value='"editlog"'):
+        yield mock_to_sql
+
+
+def test_prepared_insert_query_values(mock_dataset, mock_sql_dialect):
+    insert_query = PreparedInsertQuery(InsertQueryBuilder, mock_dataset, COLUMNS, raw_columns=["date"])
+    # each value is written by the dialect, whatever characters it contains
+    values = ["it's", "a\\b", None, "'2024-01-01T00:00:00'", "'\\'", ""]
+    assert insert_query.build([values]) == (
+        'INSERT INTO "editlog" ("key", "column_name", "value", "date", "user", "action") VALUES ('
+        + ", ".join(
+            value if column == "date" else fake_to_sql(FakeConstant(value), mock_dataset)
+            for column, value in zip(COLUMNS, values)
+        )
+        + ");"
+    )
+
+
+def test_sql_append_many_single_transaction(mock_dataset, mock_sql_dialect):
+    with patch.object(editlogs, "SQLExecutor2") as mock_executor_class, patch.object(
+        editlogs, "MAX_ROWS_PER_INSERT", 2
+    ):
+        executor = mock_executor_class.return_value
+        appender = SQLEditLogAppender(mock_dataset)
+        appender.append_many(make_logs(5))
+        # 5 rows with at most 2 rows per statement: 3 statements, sent in a single call followed by a commit
+        executor.query_to_df.assert_called_once()
+        query = executor.query_to_df.call_args.args[0]
+        pre_queries = executor.query_to_df.call_args.kwargs["pre_queries"]
+        assert executor.query_to_df.call_args.kwargs["post_queries"] == ["COMMIT"]
+        assert len(pre_queries) == 2
+        assert pre_queries[0] == (
+            'INSERT INTO "editlog" ("key", "column_name", "value", "date", "user", "action") VALUES '
+            "(E'0', E'col', E'value 0', '2024-01-01T00:00:00', E'user', E'update'),"
+            "(E'1', E'col', E'value 1', '2024-01-01T00:00:01', E'user', E'update');"
+        )
+        assert query.endswith("VALUES (E'4', E'col', E'value 4', '2024-01-01T00:00:04', E'user', E'update');")
@@ -0,0 +1,82 @@
+import pytest
+from pandas import DataFrame
+
+from webapp.db.editlogs import EditLog
+from webapp.db.editstate import EditState
+
+
+@pytest.fixture
+def editlog_df():
+    return DataFrame(
+        data={
+            "key": ["1", "1", "2", "3"],
+            "column_name": ["col1", "col2", "col1", None],
+            "value": ["a", "b", "c", None],
+            "date": ["2024-01-01T00:00:01", "2024-01-01T00:00:02", "2024-01-01T00:00:03", "2024-01-01T00:00:04"],
+            "user": ["u", "u", "u", "u"],
+            "action": ["update", "update", "create", "delete"],
+        }
+    )
+
+
+def test_empty_state():
+    state = EditState(["id"], ["col1", "col2"])
+    df = state.get_edited_cells_df()
+    assert df.empty
+    assert df.columns.to_list() == ["id", "col1", "col2", "last_edit_date", "last_action", "first_action"]
+
+
+def test_load(editlog_df):
+    state = EditState(["id"], ["col1", "col2"])
+    state.load(editlog_df)
+    df = state.get_edited_cells_df().set_index("id")
+    # key 3 only has a delete action and no edited value, so it isn't part of the edited cells
+    assert df.index.to_list() == ["1", "2"]
+    assert df.loc["1", "col1"] == "a"
+    assert df.loc["1", "col2"] == "b"
+    assert df.loc["2", "first_action"] == "create"
+
+
+def test_append_updates_state_and_version(editlog_df):
+    state = EditState(["id"], ["col1", "col2"])
+    state.load(editlog_df)
+    version = state.version
+    state.append(EditLog("2", None, None, "2024-01-01T00:00:05", "u", "delete"))
+    state.append(EditLog("1", "col1", "z", "2024-01-01T00:00:06", "u", "update"))
+    assert state.version > version
+    df = state.get_edited_cells_df().set_index("id")
+    assert df.loc["1", "col1"] == "z"
+    assert df.loc["2", "last_action"] == "delete"
+    assert df.loc["2", "first_action"] == "create"
+
+
+def test_multiple_primary_keys():
+    state = EditState(["name", "year"], ["col1"])
+    state.append(EditLog("('cat', 2022)", "col1", "x", "2024-01-01T00:00:01", "u", "update"))
+    df = state.get_edited_cells_df()
+    assert df.loc[0, "name"] == "cat"
+    assert df.loc[0, "year"] == 2022
+    assert df.loc[0, "col1"] == "x"
+
+
+def test_returned_dataframe_is_a_copy(editlog_df):
+    state = EditState(["id"], ["col1", "col2"])
+    state.load(editlog_df)
+    state.get_edited_cells_df().drop(columns=["col1"], inplace=True)
+    assert "col1" in state.get_edited_cells_df().columns
+
+
+def test_get_row(editlog_df):
+    state = EditState(["id"], ["col1", "col2"])
+    state.load(editlog_df)
+    df = state.get_edited_cells_df().set_index("id")
+    row = state.get_row("2")
+    # same values as in the edited cells dataframe
+    assert list(row.keys()) == df.columns.to_list()
+    assert row["col1"] == "c" and row["first_action"] == "create"
+    assert row["col2"] != row["col2"]  # NaN
+    # key 3 only has a delete action and no edited value
+    assert state.get_row("3") is None
+    assert state.get_row("4") is None
+    state.append(EditLog("4", "col2", "d", "2024-01-01T00:00:05", "u", "update"))
+    assert state.get_row("4")["col2"] == "d"
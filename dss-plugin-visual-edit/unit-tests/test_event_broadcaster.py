@@ -0,0 +1,44 @@
+from webapp.events.broadcaster import EventBroadcaster
+
+
+def test_stream():
+    broadcaster = EventBroadcaster()
+    stream = broadcaster.stream()
+    assert next(stream) == "retry: 3000\n\n"
+    assert broadcaster.get_stats()["clients"] == 1
+    broadcaster.publish("edits", [{"action": "delete"}])
+    assert next(stream) == 'id: 1\nevent: edits\ndata: [{"action": "delete"}]\n\n'
+    stream.close()
+    assert broadcaster.get_stats()["clients"] == 0
+
+
+def test_heartbeat():
+    stream = EventBroadcaster().stream(heartbeat_interval=0.01)
+    next(stream)
+    # a comment is sent when there are no events
+    assert next(stream) == ": heartbeat\n\n"
+
+
+def test_replay_missed_events():
+    broadcaster = EventBroadcaster(history_size=2)
+    for i in range(3):
+        broadcaster.publish("edits", i)
+    stream = broadcaster.stream(last_event_id="1")
+    next(stream)
+    assert next(stream).startswith("id: 2\n")
+    assert next(stream).startswith("id: 3\n")
+    # event 1 is no longer kept: the client must reload its data
+    stream = broadcaster.stream(last_event_id="0")
+    next(stream)
+    assert next(stream) == "id: 3\nevent: reset\ndata: {}\n\n"
+
+
+def test_slow_client_is_reset():
+    broadcaster = EventBroadcaster(queue_size=1)
+    stream = broadcaster.stream()
+    next(stream)
+    broadcaster.publish("edits", 1)
+    broadcaster.publish("edits", 2)
+    assert next(stream) == "id: 2\nevent: reset\ndata: {}\n\n"
+    assert list(stream) == []
+    assert broadcaster.get_stats()["clients"] == 0
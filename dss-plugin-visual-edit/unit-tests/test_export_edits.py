@@ -0,0 +1,40 @@
+from pandas import DataFrame
+
+from commons import cast_to_schema_types, iter_csv
+
+
+def test_iter_csv():
+    df = DataFrame({"id": [1, 2, 3, 4, 5], "name": ["a", "b", None, "d", "e"]}).set_index("id")
+    chunks = list(iter_csv(df, chunksize=2))
+    assert len(chunks) == 3
+    assert "".join(chunks) == df.to_csv()
+    # the header is sent even when there are no rows
+    assert list(iter_csv(df.head(0))) == ["id,name\n"]
+
+
+def test_cast_to_schema_types():
+    df = DataFrame(
+        {
+            "id": ["1", "2", None],
+            "price": ["1.5", "abc", None],
+            "valid": ["True", "False", None],
+            "name": ["a", None, "c"],
+            "last_action": ["update", "create", "update"],
+        }
+    )
+    schema = [
+        {"name": "id", "type": "bigint"},
+        {"name": "price", "type": "double"},
+        {"name": "valid", "type": "boolean"},
+        {"name": "name", "type": "string"},
+    ]
+    typed_df = cast_to_schema_types(df, schema)
+    assert str(typed_df["id"].dtype) == "Int64"
+    assert typed_df["id"].to_list()[:2] == [1, 2]
+    assert typed_df["price"].to_list()[0] == 1.5
+    assert typed_df["price"].isnull().to_list() == [False, True, True]
+    assert str(typed_df["valid"].dtype) == "boolean"
+    assert typed_df["valid"].to_list()[:2] == [True, False]
+    assert typed_df["name"].to_list() == ["a", None, "c"]
+    # the original dataframe is left unchanged
+    assert df["id"].to_list() == ["1", "2", None]
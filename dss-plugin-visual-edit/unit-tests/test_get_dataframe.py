@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock
+
+import pytest
+from pandas import DataFrame
+
+from commons import get_dataframe, iter_dataframe
+
+
+def make_dataset(chunks):
+    dataset = MagicMock(name="MockDataset")
+    dataset.read_schema.return_value = [
+        {"name": "id", "type": "bigint"},
+        {"name": "name", "type": "string"},
+    ]
+    dataset.iter_dataframes_forced_types.side_effect = lambda names, dtypes, parse_date_columns, chunksize: iter(
+        chunks
+    )
+    return dataset
+
+
+@pytest.fixture
+def chunks():
+    return [
+        DataFrame(data={"id": [1, 2], "name": ["a", "b"]}),
+        DataFrame(data={"id": [3, 4], "name": ["c", "d"]}, index=[2, 3]),
+        DataFrame(data={"id": [5], "name": ["e"]}, index=[4]),
+    ]
+
+
+def test_iter_dataframe_forces_integer_types(chunks):
+    dataset = make_dataset(chunks)
+    assert len(list(iter_dataframe(dataset, chunksize=2))) == 3
+    names, dtypes, _ = dataset.iter_dataframes_forced_types.call_args.args
+    assert names == ["id", "name"]
+    assert dtypes["id"] == "Int64"
+    assert dataset.iter_dataframes_forced_types.call_args.kwargs["chunksize"] == 2
+
+
+def test_get_dataframe_concatenates_chunks(chunks):
+    df = get_dataframe(make_dataset(chunks))
+    assert df["id"].to_list() == [1, 2, 3, 4, 5]
+    assert df.index.to_list() == [0, 1, 2, 3, 4]
+
+
+def test_get_dataframe_limit(chunks):
+    assert get_dataframe(make_dataset(chunks), limit=3)["id"].to_list() == [1, 2, 3]
+    assert get_dataframe(make_dataset(chunks), limit=2)["id"].to_list() == [1, 2]
+    assert len(get_dataframe(make_dataset(chunks), limit=10)) == 5
+
+
+def test_get_dataframe_empty():
+    assert get_dataframe(make_dataset([])).empty
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from pandas import DataFrame
+
+import commons
+from commons import get_incremental_keys, get_watermark
+
+COLUMNS = ["id", "name", "comment"]
+BUILD_DATE = 1700000000000
+
+
+def make_edits(rows):
+    return DataFrame(rows, columns=["id", "comment", "last_edit_date", "last_action", "first_action"])
+
+
+EDITS_DF = make_edits(
+    [
+        (1, "a", "2024-01-01T00:00:01.000Z", "update", "update"),
+        (2, "b", "2024-01-01T00:00:02.000Z", "update", "update"),
+    ]
+)
+WATERMARK = get_watermark(EDITS_DF, ["id"], BUILD_DATE, COLUMNS)
+
+
+def test_get_watermark():
+    assert WATERMARK == {
+        "last_edit_date": "2024-01-01T00:00:02+00:00",
+        "edited_keys": [["1"], ["2"]],
+        "original_build_date": BUILD_DATE,
+        "columns": COLUMNS,
+    }
+
+
+def test_get_watermark_without_edits():
+    watermark = get_watermark(make_edits([]), ["id"], BUILD_DATE, COLUMNS)
+    assert watermark["last_edit_date"] is None
+    assert watermark["edited_keys"] == []
+
+
+def test_get_watermark_with_too_many_keys():
+    with patch.object(commons, "MAX_WATERMARK_KEYS", 1):
+        watermark = get_watermark(EDITS_DF, ["id"], BUILD_DATE, COLUMNS)
+    assert watermark["edited_keys"] is None
+    # the previously edited keys are unknown: all rows must be recomputed
+    assert get_incremental_keys(EDITS_DF, ["id"], watermark) is None
+
+
+def test_get_incremental_keys():
+    edits_df = make_edits(
+        [
+            (1, "a", "2024-01-01T00:00:01.000Z", "update", "update"),
+            (2, "c", "2024-01-01T00:00:03.000Z", "update", "update"),
+            (3, "d", "2024-01-01T00:00:04.000Z", "create", "create"),
+        ]
+    )
+    assert get_incremental_keys(edits_df, ["id"], WATERMARK)["id"].to_list() == ["2", "3"]
+
+
+def test_get_incremental_keys_without_new_edits():
+    assert get_incremental_keys(EDITS_DF, ["id"], WATERMARK).empty
+
+
+def test_get_incremental_keys_with_emptied_key():
+    # key 1 isn't in the edits anymore: its row must go back to its original values
+    assert get_incremental_keys(EDITS_DF.iloc[1:], ["id"], WATERMARK)["id"].to_list() == ["1"]
+
+
+def test_get_incremental_keys_after_run_without_edits():
+    watermark = get_watermark(make_edits([]), ["id"], BUILD_DATE, COLUMNS)
+    assert get_incremental_keys(EDITS_DF, ["id"], watermark)["id"].to_list() == ["1", "2"]
+
+
+def test_get_incremental_keys_with_multiple_primary_keys():
+    edits_df = DataFrame(
+        [("x", 1, "a", "2024-01-01T00:00:01.000Z"), ("y", 2, "b", "2024-01-01T00:00:02.000Z")],
+        columns=["country", "year", "comment", "last_edit_date"],
+    )
+    watermark = get_watermark(edits_df.iloc[:1], ["country", "year"], BUILD_DATE, COLUMNS)
+    keys_df = get_incremental_keys(edits_df, ["country", "year"], watermark)
+    assert keys_df.values.tolist() == [["y", "2"]]
+
+
+def test_cast_keys_with_large_integers():
+    # keys above 2^53 can't be represented exactly as floats: casting them through floats would target another row
+    keys_df = commons.__cast_keys__(DataFrame({"id": ["9007199254740993"]}), [{"name": "id", "type": "bigint"}])
+    assert keys_df["id"].to_list() == [9007199254740993]
@@ -0,0 +1,91 @@
+from unittest.mock import MagicMock
+
+from webapp.db.label_cache import LinkedLabelCache
+
+LABELS = {"1": "One", "2": "Two", "3": "Three"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_fetch():
+    return MagicMock(side_effect=lambda keys: {key: LABELS[key] for key in keys if key in LABELS})
+
+
+def test_hits_and_misses():
+    cache = LinkedLabelCache()
+    fetch = make_fetch()
+    assert cache.get_many(["1", "2", "42"], fetch) == {"1": "One", "2": "Two"}
+    assert cache.get_many(["2", "42", "1"], fetch) == {"1": "One", "2": "Two"}
+    fetch.assert_called_once_with(["1", "2", "42"])
+    stats = cache.get_stats()
+    assert stats["hits"] == 3 and stats["misses"] == 3
+    assert stats["hit_rate"] == 0.5
+    assert stats["size"] == 3
+
+
+def test_lru_eviction():
+    cache = LinkedLabelCache(max_size=2)
+    fetch = make_fetch()
+    cache.get_many(["1"], fetch)
+    cache.get_many(["2"], fetch)
+    cache.get_many(["1"], fetch)  # "2" is now the least recently used
+    cache.get_many(["3"], fetch)
+    fetch.reset_mock()
+    cache.get_many(["1", "3"], fetch)
+    fetch.assert_not_called()
+    cache.get_many(["2"], fetch)
+    fetch.assert_called_once_with(["2"])
+    assert cache.get_stats()["evictions"] == 2
+
+
+def test_ttl():
+    clock = FakeClock()
+    cache = LinkedLabelCache(ttl=10, clock=clock)
+    fetch = make_fetch()
+    cache.get_many(["1"], fetch)
+    clock.now = 9
+    cache.get_many(["1"], fetch)
+    assert fetch.call_count == 1
+    clock.now = 11
+    cache.get_many(["1"], fetch)
+    assert fetch.call_count == 2
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_invalidation_on_build_date_change():
+    clock = FakeClock()
+    build_date = MagicMock(return_value=1000)
+    cache = LinkedLabelCache(get_build_date=build_date, build_date_check_interval=30, clock=clock)
+    fetch = make_fetch()
+    cache.get_many(["1"], fetch)
+    build_date.return_value = 2000
+    clock.now = 10
+    # the build date isn't checked again before the check interval
+    cache.get_many(["1"], fetch)
+    assert fetch.call_count == 1
+    clock.now = 31
+    cache.get_many(["1"], fetch)
+    assert fetch.call_count == 2
+    assert build_date.call_count == 2
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_missing_build_date(caplog):
+    clock = FakeClock()
+    # get_last_build_date fails for datasets which were never built
+    build_date = MagicMock(side_effect=IndexError("list index out of range"))
+    cache = LinkedLabelCache(get_build_date=build_date, ttl=100, build_date_check_interval=30, clock=clock)
+    fetch = make_fetch()
+    with caplog.at_level("INFO"):
+        for now in [0, 31, 62]:
+            clock.now = now
+            cache.get_many(["1"], fetch)
+    assert fetch.call_count == 1
+    assert build_date.call_count == 3
+    assert len([r for r in caplog.records if r.levelname in ("INFO", "WARNING")]) == 1
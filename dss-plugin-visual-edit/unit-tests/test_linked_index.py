@@ -0,0 +1,44 @@
+import pytest
+from pandas import DataFrame
+
+from webapp.db.linked_index import LinkedRecordIndex
+
+
+@pytest.fixture
+def linked_df():
+    return DataFrame(
+        data={
+            "id": [1, 2, 3, 4, 5],
+            "name": ["Cat", "dog", "catfish", None, "Camel"],
+            "legs": [4, 4, 0, 2, None],
+        }
+    ).set_index("id")
+
+
+def test_search(linked_df):
+    index = LinkedRecordIndex(linked_df, "id", "name", ["legs"])
+    assert index.search("ca", 10) == [
+        {"value": "5", "label": "Camel", "legs": ""},
+        {"value": "1", "label": "Cat", "legs": "4.0"},
+        {"value": "3", "label": "catfish", "legs": "0.0"},
+    ]
+    assert [item["value"] for item in index.search("cat", 10)] == ["1", "3"]
+    assert index.search("z", 10) == []
+
+
+def test_search_without_term(linked_df):
+    index = LinkedRecordIndex(linked_df, "id", "name")
+    assert [item["label"] for item in index.search("", 10)] == ["", "Camel", "Cat", "catfish", "dog"]
+    assert len(index.search("", 2)) == 2
+
+
+def test_search_excluding_key(linked_df):
+    index = LinkedRecordIndex(linked_df, "id", "name")
+    assert [item["value"] for item in index.search("ca", 2, exclude_key="5")] == ["1", "3"]
+
+
+def test_search_keys_only(linked_df):
+    # without label and lookup columns, options are key values
+    index = LinkedRecordIndex(linked_df, "id", "id")
+    assert index.search("", 10) == ["1", "2", "3", "4", "5"]
+    assert index.search("3", 10) == ["3"]
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock, patch
+
+from pandas import DataFrame, Series
+
+import dataiku_utils
+from dataiku_utils import add_linked_labels, get_linked_dataframe_filtered, get_linked_labels
+from webapp.db.label_cache import LinkedLabelCache
+
+
+def make_linked_record(df=None, ds=None, ds_label="label", label_cache=None):
+    linked_record = MagicMock(name="MockLinkedRecord")
+    linked_record.name = "company"
+    linked_record.ds_key = "id"
+    linked_record.ds_label = ds_label
+    linked_record.df = df
+    linked_record.ds = ds
+    linked_record.label_cache = label_cache
+    linked_record.store = None
+    return linked_record
+
+
+LINKED_DF = DataFrame({"id": [1, 2, 3], "label": ["One", "Two", None]}).set_index("id")
+# integer columns of edited data have a nullable integer type (see `get_dataframe`)
+EDITED_DF = DataFrame({"id": ["a", "b", "c", "d"], "company": Series([2, None, 1, 42], dtype="Int64")})
+
+
+def test_get_linked_labels_from_dataframe():
+    labels = get_linked_labels(make_linked_record(df=LINKED_DF), ["1", "3", "42"])
+    assert labels == {"1": "One", "3": ""}
+
+
+def test_add_linked_labels():
+    df = add_linked_labels(EDITED_DF, [make_linked_record(df=LINKED_DF)])
+    assert df["company__label"].to_list() == ["Two", None, "One", "[Not found]"]
+    assert "company__label" not in EDITED_DF.columns
+
+
+def test_add_linked_labels_from_sql_dataset():
+    ds = MagicMock(name="MockDatasetSQL")
+    ds.get_cell_values.return_value = {1: "One", 2: "Two"}
+    df = add_linked_labels(EDITED_DF, [make_linked_record(ds=ds)])
+    assert df["company__label"].to_list() == ["Two", None, "One", "[Not found]"]
+    # all labels are fetched at once
+    ds.get_cell_values.assert_called_once_with("id", ["2", "1", "42"], "label")
+
+
+def test_add_linked_labels_without_label_column():
+    df = add_linked_labels(EDITED_DF, [make_linked_record(df=LINKED_DF, ds_label="id")])
+    assert df.columns.to_list() == EDITED_DF.columns.to_list()
+
+
+def test_get_linked_labels_with_cache():
+    ds = MagicMock(name="MockDatasetSQL")
+    ds.get_cell_values.return_value = {1: "One"}
+    linked_record = make_linked_record(ds=ds, label_cache=LinkedLabelCache())
+    assert get_linked_labels(linked_record, ["1", "42"]) == {"1": "One"}
+    assert get_linked_labels(linked_record, ["1", "42"]) == {"1": "One"}
+    # keys which weren't found are cached too
+    ds.get_cell_values.assert_called_once()
+
+
+def test_get_linked_dataframe_filtered_falls_back_to_dataiku_api():
+    # e.g. when the label column is the key column and isn't a string column
+    ds = MagicMock(name="MockDatasetSQL")
+    ds.get_rows_by_prefix.side_effect = ValueError("Column id isn't a string column.")
+    with patch.object(dataiku_utils, "get_dataframe_filtered", return_value=DataFrame({"id": ["12"]})) as mock_filtered:
+        df = get_linked_dataframe_filtered(make_linked_record(ds=ds, ds_label="id"), "PROJECT", "12", 10)
+    assert df["id"].to_list() == ["12"]
+    mock_filtered.assert_called_once()
@@ -0,0 +1,63 @@
+import pytest
+from pandas import DataFrame, Series
+
+from webapp.db.linked_index import LinkedRecordIndex
+from webapp.db.linked_store import LinkedRecordStore
+
+
+@pytest.fixture
+def linked_df():
+    return DataFrame(
+        data={
+            "id": Series([3, 1, 2, 4, 5, 1], dtype="Int64"),
+            "name": ["Cat", "dög", "catfish", None, "Camel", "Duplicate"],
+            "legs": Series([4, 4, None, 2, None, 0], dtype="Int64"),
+            "other": ["x"] * 6,
+        }
+    )
+
+
+def build_store(linked_df, path, chunksize=2, **kwargs):
+    chunks = [linked_df.iloc[i : i + chunksize] for i in range(0, len(linked_df), chunksize)]
+    return LinkedRecordStore.build(chunks, str(path), "id", "name", ["legs"], **kwargs)
+
+
+def test_search_same_as_index(linked_df, tmp_path):
+    store = build_store(linked_df, tmp_path / "store")
+    index = LinkedRecordIndex(linked_df.set_index("id"), "id", "name", ["legs"])
+    for term in ["", "c", "ca", "cat", "d", "dö", "z"]:
+        assert store.search(term, 10) == index.search(term, 10)
+    assert store.search("", 3) == index.search("", 3)
+    assert store.search("ca", 10, exclude_key="5") == index.search("ca", 10, exclude_key="5")
+    assert "other" not in store.search("cat", 1)[0]
+
+
+def test_get_labels(linked_df, tmp_path):
+    store = build_store(linked_df, tmp_path / "store")
+    assert len(store) == 6
+    # the first row with a key gives its label
+    assert store.get_labels(["1", "4", "42"]) == {"1": "dög", "4": ""}
+
+
+def test_reuse(linked_df, tmp_path):
+    build_store(linked_df, tmp_path / "store", build_date=1000)
+    # files written for the same build date are reused
+    store = build_store(linked_df.iloc[:0], tmp_path / "store", build_date=1000)
+    assert len(store) == 6
+    store = build_store(linked_df.iloc[:2], tmp_path / "store", build_date=2000)
+    assert len(store) == 2
+    # files are written to a temporary directory, then moved into place
+    assert [p.name for p in tmp_path.iterdir()] == ["store"]
+
+
+def test_build_replaces_store_being_read(linked_df, tmp_path):
+    store = build_store(linked_df, tmp_path / "store")
+    build_store(linked_df.iloc[:2], tmp_path / "store")
+    # files memory-mapped by a previous store stay readable
+    assert store.get_labels(["5"]) == {"5": "Camel"}
+
+
+def test_empty(linked_df, tmp_path):
+    store = build_store(linked_df.iloc[:0], tmp_path / "store")
+    assert store.search("", 10) == []
+    assert store.get_labels(["1"]) == {}
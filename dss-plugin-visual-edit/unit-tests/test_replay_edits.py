@@ -0,0 +1,127 @@
+import pytest
+from pandas import DataFrame, concat, pivot_table
+from pandas.testing import assert_frame_equal
+
+from commons import __unpack_keys__, replay_edits_from_df
+
+EDITLOG_COLUMNS = ["key", "column_name", "value", "date", "user", "action"]
+
+
+def pivot_replay_edits(editlog_df, primary_keys, editable_column_names):
+    """Reference implementation of replay_edits, based on a pivot table with a Python aggregation function."""
+    cols = primary_keys + editable_column_names + ["last_edit_date", "last_action", "first_action"]
+    all_columns_df = DataFrame(columns=cols)
+    if not editlog_df.size:
+        return all_columns_df
+    editlog_df = editlog_df.rename(columns={"date": "edit_date"})
+    editlog_df = __unpack_keys__(editlog_df, primary_keys).sort_values("edit_date")
+    if "action" not in editlog_df.columns:
+        editlog_df["action"] = "update"
+    editlog_grouped_last = (
+        editlog_df[primary_keys + ["edit_date", "action"]].groupby(primary_keys).last().add_prefix("last_")
+    )
+    editlog_grouped_first = editlog_df[primary_keys + ["action"]].groupby(primary_keys).first().add_prefix("first_")
+    editlog_grouped_df = editlog_grouped_last.join(editlog_grouped_first, on=primary_keys)
+    edits_df = pivot_table(
+        editlog_df,
+        index=primary_keys,
+        columns="column_name",
+        values="value",
+        aggfunc=lambda values: values.iloc[-1] if not values.empty else None,
+    ).join(editlog_grouped_df, on=primary_keys)
+    for col in edits_df.columns:
+        if col not in cols:
+            edits_df.drop(columns=[col], inplace=True)
+    edits_df.reset_index(inplace=True)
+    return concat([all_columns_df, edits_df])
+
+
+def make_editlog(rows):
+    return DataFrame(
+        data=[
+            {
+                "key": key,
+                "column_name": column_name,
+                "value": value,
+                "date": f"2024-01-01T00:00:{i:02d}+00:00",
+                "user": "user",
+                "action": action,
+            }
+            for i, (key, column_name, value, action) in enumerate(rows)
+        ],
+        columns=EDITLOG_COLUMNS,
+    )
+
+
+# Same setup as python-lib/tests/pivot_tests.py: one primary key, a few editable columns
+SINGLE_KEY_EDITLOG = [
+    ("toto", "label", "hey", "update"),
+    ("toto", "label", "hey2", "update"),
+    ("toto", "address", "1 main street", "update"),
+    ("New name", "address", "New address", "create"),
+    ("New name", None, None, "delete"),
+    ("titi", "label", None, "update"),
+    ("tata", "machine_type", "A", "update"),
+    ("tata", "not_editable_anymore", "x", "update"),
+    ("only_deleted", None, None, "delete"),
+]
+
+MULTI_KEY_EDITLOG = [
+    ("('cat', '2022-12-21')", "col1", "a", "update"),
+    ("('cat', '2022-12-22')", "col1", "b", "create"),
+    ("('cat', '2022-12-21')", "col2", "c", "update"),
+    ("('dog', '2022-12-21')", "col2", None, "update"),
+    ("('cat', '2022-12-21')", "col1", "d", "update"),
+    ("('cat', '2022-12-22')", None, None, "delete"),
+]
+
+
+@pytest.mark.parametrize(
+    "rows, primary_keys, editable_column_names",
+    [
+        ([], ["name"], ["address", "label"]),
+        (SINGLE_KEY_EDITLOG, ["name"], ["address", "machine_type", "household", "dob", "label"]),
+        (SINGLE_KEY_EDITLOG, ["name"], ["label"]),
+        (MULTI_KEY_EDITLOG, ["name", "date"], ["col1", "col2"]),
+        ([("only_deleted", None, None, "delete")], ["name"], ["label"]),
+    ],
+)
+def test_replay_edits_same_as_pivot(rows, primary_keys, editable_column_names):
+    editlog_df = make_editlog(rows)
+    expected = pivot_replay_edits(editlog_df.copy(), primary_keys, editable_column_names)
+    result = replay_edits_from_df(editlog_df.copy(), primary_keys, editable_column_names)
+    assert_frame_equal(result, expected)
+
+
+def test_replay_edits_keeps_last_value():
+    result = replay_edits_from_df(make_editlog(SINGLE_KEY_EDITLOG), ["name"], ["address", "label"]).set_index("name")
+    assert result.loc["toto", "label"] == "hey2"
+    assert result.loc["New name", "first_action"] == "create"
+    assert result.loc["New name", "last_action"] == "delete"
+    assert "only_deleted" not in result.index
+
+
+def test_unpack_keys_multiple_primary_keys():
+    df = DataFrame(data={"key": ["('cat', 2022)", "('dog', 2023)", "('cat', 2022)"], "value": ["a", "b", "c"]})
+    result = __unpack_keys__(df, ["name", "year"])
+    assert result.columns.to_list() == ["value", "name", "year"]
+    assert result["name"].to_list() == ["cat", "dog", "cat"]
+    assert result["year"].to_list() == [2022, 2023, 2022]
+
+
+def test_unpack_keys_missing_values():
+    # tuples with fewer values than primary keys, and missing keys, give missing values
+    df = DataFrame(data={"key": ["('cat',)", None, "('dog', 2023)"]}, index=[10, 20, 30])
+    result = __unpack_keys__(df, ["name", "year"])
+    assert result.index.to_list() == [10, 20, 30]
+    assert result.loc[10, "name"] == "cat"
+    assert result.isnull().loc[[10, 20], "year"].all()
+    assert result.isnull().loc[20, "name"]
+    assert result.loc[30, "year"] == 2023
+
+
+def test_unpack_keys_does_not_evaluate_code():
+    df = DataFrame(data={"key": ["__import__('os').getcwd()", "('cat', 2022)"]})
+    result = __unpack_keys__(df, ["name", "year"])
+    assert result.isnull().loc[0].all()
+    assert result.loc[1, "name"] == "cat"
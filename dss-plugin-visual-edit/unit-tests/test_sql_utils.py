@@ -0,0 +1,141 @@
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pandas import DataFrame, isna, read_sql_query
+
+import commons
+from commons import apply_edits_from_df, replay_edits_from_df
+from sql_utils import can_push_down, can_push_down_replay, get_edited_query, get_replay_edits_query
+
+SCHEMA = [
+    {"name": "id", "type": "bigint"},
+    {"name": "name", "type": "string"},
+    {"name": "size", "type": "double"},
+    {"name": "count", "type": "bigint"},
+    {"name": "comment", "type": "string"},
+]
+EDITABLE_COLUMNS = ["size", "count", "comment"]
+DISPLAY_COLUMNS = ["name"]
+
+ORIGINAL_ROWS = [
+    (1, "one", 1.5, 10, None),
+    (2, "two", 2.5, 20, "hello"),
+    (3, "three", None, None, None),
+    (4, "four", 4.5, 40, "bye"),
+]
+
+EDITLOG_ROWS = [
+    # key, column_name, value, date, action
+    ("1", "size", "1.75", "2024-01-01T00:00:01", "update"),
+    ("1", "size", "1.8", "2024-01-01T00:00:02", "update"),
+    ("1", "comment", "first", "2024-01-01T00:00:03", "update"),
+    ("2", "count", "21.0", "2024-01-01T00:00:04", "update"),
+    ("2", "comment", None, "2024-01-01T00:00:05", "update"),
+    ("4", "comment", "deleted", "2024-01-01T00:00:06", "update"),
+    ("4", None, None, "2024-01-01T00:00:07", "delete"),
+    ("10", "size", "10.5", "2024-01-01T00:00:08", "create"),
+    ("10", "comment", "new", "2024-01-01T00:00:09", "create"),
+    ("11", "comment", "gone", "2024-01-01T00:00:10", "create"),
+    ("11", None, None, "2024-01-01T00:00:11", "delete"),
+    ("3", "not_editable", "x", "2024-01-01T00:00:12", "update"),
+    (None, "size", "0", "2024-01-01T00:00:13", "update"),
+]
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    connection.execute('CREATE TABLE "original" ("id" BIGINT, "name" TEXT, "size" DOUBLE, "count" BIGINT, "comment" TEXT)')
+    connection.executemany('INSERT INTO "original" VALUES (?, ?, ?, ?, ?)', ORIGINAL_ROWS)
+    connection.execute('CREATE TABLE "editlog" ("key" TEXT, "column_name" TEXT, "value" TEXT, "date" TEXT, "action" TEXT)')
+    connection.executemany('INSERT INTO "editlog" VALUES (?, ?, ?, ?, ?)', EDITLOG_ROWS)
+    yield connection
+    connection.close()
+
+
+def get_pandas_edited_df(original_rows=ORIGINAL_ROWS):
+    original_df = DataFrame.from_records(original_rows, columns=[col["name"] for col in SCHEMA])
+    original_df = original_df.astype({"id": "Int64", "count": "Int64"})
+    editlog_df = DataFrame.from_records(EDITLOG_ROWS, columns=["key", "column_name", "value", "date", "action"])
+    original_ds = MagicMock(name="MockDataset")
+    original_ds.get_config.return_value = {
+        "customFields": {"primary_keys": ["id"], "editable_column_names": EDITABLE_COLUMNS},
+        "schema": {"columns": SCHEMA},
+    }
+    edits_df = replay_edits_from_df(editlog_df, ["id"], EDITABLE_COLUMNS)
+    with patch.object(commons, "get_dataframe", return_value=original_df):
+        return apply_edits_from_df(original_ds, edits_df)
+
+
+def to_records(df):
+    # pandas keeps values of created rows as strings, while the query casts them to the type of the original columns
+    df = df.astype({col: float for col in ["id", "size", "count"] if col in df.columns})
+    records = [tuple(None if isna(v) else v for v in row) for row in df.itertuples(index=False)]
+    return sorted(records, key=lambda record: (int(record[0]), str(record)))
+
+
+def test_can_push_down():
+    assert can_push_down(["id"], SCHEMA, EDITABLE_COLUMNS)
+    assert not can_push_down(["id", "name"], SCHEMA, EDITABLE_COLUMNS)
+    assert not can_push_down(["id"], SCHEMA + [{"name": "flag", "type": "boolean"}], EDITABLE_COLUMNS + ["flag"])
+
+
+def test_can_push_down_replay():
+    assert can_push_down_replay(["id"], ["comment"])
+    assert not can_push_down_replay(["id", "name"], ["comment"])
+    assert not can_push_down_replay(["id"], ["back\\slash"])
+
+
+def test_replay_edits_query_same_as_pandas(connection):
+    query = get_replay_edits_query('"editlog"', "id", EDITABLE_COLUMNS)
+    sql_df = read_sql_query(query, connection)
+    editlog_df = DataFrame.from_records(EDITLOG_ROWS, columns=["key", "column_name", "value", "date", "action"])
+    pandas_df = replay_edits_from_df(editlog_df, ["id"], EDITABLE_COLUMNS)
+    assert sql_df.columns.to_list() == pandas_df.columns.to_list()
+    assert to_records(sql_df) == to_records(pandas_df)
+
+
+def test_replay_edits_query(connection):
+    query = get_replay_edits_query('"editlog"', "id", EDITABLE_COLUMNS)
+    edits_df = read_sql_query(query, connection).set_index("id")
+    assert edits_df.loc["1", "size"] == "1.8"
+    assert edits_df.loc["4", "last_action"] == "delete"
+    assert edits_df.loc["10", "first_action"] == "create"
+    # like in replay_edits, keys with edited values in non-editable columns only are kept
+    assert "3" in edits_df.index and isna(edits_df.loc["3", "size"])
+    assert edits_df.loc["1", "last_edit_date"] == "2024-01-01T00:00:03"
+
+
+def test_edited_query_same_as_pandas(connection):
+    query = get_edited_query('"original"', '"editlog"', "id", SCHEMA, DISPLAY_COLUMNS, EDITABLE_COLUMNS)
+    sql_df = read_sql_query(query, connection)
+    pandas_df = get_pandas_edited_df()
+    assert sql_df.columns.to_list() == pandas_df.columns.to_list()
+    assert to_records(sql_df) == to_records(pandas_df)
+    # rows are ordered by primary key, including created rows
+    assert sql_df["id"].to_list() == sorted(sql_df["id"])
+
+
+def test_pushdown_same_as_pandas_with_large_integers(connection):
+    # integers above 2^53 can't be represented exactly as floats
+    large_row = (2**53 + 1, "large", None, 1, None)
+    connection.execute('INSERT INTO "original" VALUES (?, ?, ?, ?, ?)', large_row)
+    original_ds = MagicMock(name="MockOriginalDataset", table='"original"')
+    original_ds.get_config.return_value = {
+        "customFields": {"primary_keys": ["id"], "editable_column_names": EDITABLE_COLUMNS},
+        "schema": {"columns": SCHEMA},
+    }
+    editlog_ds = MagicMock(name="MockEditlogDataset", table='"editlog"')
+    editlog_ds.read_schema.return_value = [{"name": col} for col in ["key", "column_name", "value", "date", "action"]]
+    with patch.object(commons, "__get_pushdown_connection__", return_value="db"), patch.object(
+        commons, "get_table_name_from_dataset", side_effect=lambda ds: ds.table
+    ), patch.object(commons.dataiku, "SQLExecutor2", create=True) as mock_executor_class:
+        mock_executor_class.return_value.query_to_df.side_effect = lambda query, **kwargs: read_sql_query(
+            query, connection
+        )
+        sql_df = commons.apply_edits_pushdown(original_ds, editlog_ds, from_editlog=True)
+    pandas_df = get_pandas_edited_df(ORIGINAL_ROWS + [large_row])
+    assert str(sql_df["id"].dtype) == "Int64"
+    assert sorted(sql_df["id"].to_list()) == sorted(pandas_df["id"].astype(int).to_list())
+    assert 2**53 + 1 in sql_df["id"].to_list()
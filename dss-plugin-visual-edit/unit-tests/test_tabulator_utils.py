@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+import pytest
+from pandas import DataFrame
+
+from tabulator_utils import get_page_from_df, get_row_patches
+from webapp.db.editlogs import EditLog
+
+
+@pytest.fixture
+def df():
+    return DataFrame(
+        data={
+            "name": ["cat", "dog", "Catfish", "bird", None],
+            "legs": [4, 4, 0, 2, 8],
+            "pet": [True, True, False, None, False],
+        }
+    )
+
+
+def test_pagination(df):
+    page = get_page_from_df(df, page=2, size=2)
+    assert page["last_page"] == 3
+    assert page["last_row"] == 5
+    assert page["data"]["name"].to_list() == ["Catfish", "bird"]
+    # out of range pages are brought back to the last page
+    assert get_page_from_df(df, page=10, size=2)["data"]["legs"].to_list() == [8]
+
+
+def test_sort(df):
+    page = get_page_from_df(df, sorters=[{"field": "legs", "dir": "desc"}])
+    assert page["data"]["legs"].to_list() == [8, 4, 4, 2, 0]
+    # the last sorter has the highest priority
+    page = get_page_from_df(df, sorters=[{"field": "name", "dir": "desc"}, {"field": "legs", "dir": "asc"}])
+    assert page["data"]["name"].to_list() == ["Catfish", "bird", "dog", "cat", None]
+
+
+def test_like_filter(df):
+    page = get_page_from_df(df, filters=[{"field": "name", "type": "like", "value": "cat"}])
+    assert page["data"]["name"].to_list() == ["cat", "Catfish"]
+    assert page["last_row"] == 2
+
+
+def test_min_max_filter(df):
+    page = get_page_from_df(df, filters=[{"field": "legs", "type": "function", "value": {"start": "2", "end": ""}}])
+    assert page["data"]["legs"].to_list() == [4, 4, 2, 8]
+
+
+def test_equality_filters(df):
+    assert get_page_from_df(df, filters=[{"field": "pet", "type": "=", "value": True}])["last_row"] == 2
+    assert get_page_from_df(df, filters=[{"field": "legs", "type": "!=", "value": 4}])["last_row"] == 3
+
+
+def test_or_filter_group(df):
+    # dashboard filters with several included values are sent as a group of filters combined with OR
+    filters = [[{"field": "name", "type": "=", "value": "cat"}, {"field": "name", "type": "=", "value": "dog"}]]
+    assert get_page_from_df(df, filters=filters)["data"]["name"].to_list() == ["cat", "dog"]
+
+
+def test_row_patches():
+    de = MagicMock()
+    de.primary_keys = ["id", "year"]
+    de.editschema_manual_df = DataFrame()
+    de.schema_columns = [
+        {"name": "id", "type": "bigint"},
+        {"name": "year", "type": "string"},
+        {"name": "name", "type": "string"},
+        {"name": "legs", "type": "int"},
+        {"name": "pet", "type": "boolean"},
+    ]
+    logs = [
+        EditLog("(1, '2022')", "name", "cat", "2024-01-01", "user", "update"),
+        EditLog("(1, '2022')", "pet", "False", "2024-01-01", "user", "update"),
+        EditLog("(2, '2023')", "legs", "4", "2024-01-01", "user", "create"),
+        EditLog("(3, '2023')", "legs", "2", "2024-01-01", "user", "update"),
+        EditLog("(3, '2023')", None, None, "2024-01-01", "user", "delete"),
+    ]
+    assert get_row_patches(de, logs) == [
+        {"action": "update", "keys": {"id": 1, "year": "2022"}, "values": {"name": "cat", "pet": False}},
+        {"action": "create", "keys": {"id": 2, "year": "2023"}, "values": {"legs": 4}},
+        {"action": "delete", "keys": {"id": 3, "year": "2023"}, "values": {}},
+    ]
@@ -0,0 +1,38 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from webapp.logging.timing import PhaseTimer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_phases():
+    clock = FakeClock()
+    timer = PhaseTimer("startup", clock=clock)
+    with timer.phase("first"):
+        clock.now = 2.0
+    clock.now = 3.0
+    with pytest.raises(ValueError):
+        with timer.phase("failing"):
+            clock.now = 3.5
+            raise ValueError()
+    assert timer.get_durations() == {"first": 2.0, "failing": 0.5}
+
+
+def test_timed_in_threads(caplog):
+    timer = PhaseTimer("startup")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(timer.timed(f"phase {i}", lambda x: x * 2), i) for i in range(3)]
+        assert [future.result() for future in futures] == [0, 2, 4]
+    assert set(timer.get_durations()) == {"phase 0", "phase 1", "phase 2"}
+    with caplog.at_level(logging.INFO):
+        timer.log_report()
+    assert "startup took" in caplog.text and "- phase 1:" in caplog.text
@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+import pytest
+
+import webapp_utils
+from webapp_utils import find_webapp_id
+
+WEBAPPS = [
+    {"id": "a1", "name": "Other", "type": "webapp_other"},
+    {"id": "b2", "name": "Edit orders", "type": "webapp_visual-edit_visual-edit"},
+    {"id": "c3", "name": "Edit customers", "type": "webapp_visual-edit_visual-edit"},
+]
+CONFIGS = {"b2": "orders", "c3": "customers"}
+
+
+@pytest.fixture
+def calls(tmp_path):
+    calls = []
+
+    def call_rest_api(path):
+        calls.append(path)
+        if path == "/webapps/":
+            return WEBAPPS
+        webapp_id = path.split("/")[-1]
+        return {"id": webapp_id, "config": {"original_dataset": CONFIGS[webapp_id]}}
+
+    with patch.object(webapp_utils, "call_rest_api", side_effect=call_rest_api), patch.object(
+        webapp_utils, "WEBAPP_IDS_CACHE_PATH", str(tmp_path / "webapp-ids.json")
+    ):
+        yield calls
+
+
+def test_find_webapp_id(calls):
+    assert find_webapp_id("customers") == "c3"
+    # webapps are only read until a match is found
+    assert calls == ["/webapps/", "/webapps/b2", "/webapps/c3"]
+
+
+def test_find_webapp_id_from_cache(calls):
+    find_webapp_id("customers")
+    calls.clear()
+    assert find_webapp_id("customers") == "c3"
+    assert calls == ["/webapps/", "/webapps/c3"]
+
+
+def test_find_webapp_id_revalidates_cache(calls):
+    find_webapp_id("customers")
+    CONFIGS["c3"], CONFIGS["b2"] = "orders", "customers"
+    try:
+        calls.clear()
+        assert find_webapp_id("customers") == "b2"
+        assert calls == ["/webapps/", "/webapps/c3", "/webapps/b2"]
+    finally:
+        CONFIGS["c3"], CONFIGS["b2"] = "customers", "orders"
+
+
+def test_find_webapp_id_not_found(calls):
+    with pytest.raises(ValueError):
+        find_webapp_id("products")
@@ -11,18 +11,23 @@
 # 3. Define Dash webapp layout and components.
 from __future__ import annotations  # noqa: I001
 
+import atexit
 import logging
 import webapp.logging.setup  # noqa: F401 necessary to setup logging basicconfig before dataiku module sets a default config
+from collections import Counter
 from datetime import datetime
+from functools import partial
+from hashlib import sha1
+from io import BytesIO
 
 from dash import Dash, Input, Output, State, dcc, html
 from dataiku.core.schema_handling import CASTERS
-from flask import Flask, jsonify, make_response, request
-from pandas import concat
+from flask import Flask, Response, g, jsonify, make_response, request
+from pandas import DataFrame, concat
 from pandas.api.types import is_float_dtype, is_integer_dtype
 
 import dash_tabulator
-from commons import get_last_build_date, try_get_user_identifier
+from commons import cast_to_schema_types, get_last_build_date, iter_csv, try_get_user_identifier
 from DataEditor import (
     DataEditor,
     EditFailure,
@@ -34,11 +39,21 @@ from dataiku_utils import (
     client as dss_client,
 )
 from dataiku_utils import (
+    add_linked_labels,
     get_linked_dataframe_filtered,
     get_linked_label,
+    get_linked_labels,
+    has_linked_label,
+)
+from tabulator_utils import (
+    get_columns_tabulator,
+    get_formatted_items_from_linked_df,
+    get_page_from_df,
+    get_row_patches,
 )
-from tabulator_utils import get_columns_tabulator, get_formatted_items_from_linked_df
 from webapp.config.loader import WebAppConfig
+from webapp.db.build_date_poller import BuildDatePoller
+from webapp.events.broadcaster import EventBroadcaster
 from webapp.config.models import LinkedRecord
 
 webapp_config = WebAppConfig()
@@ -69,11 +84,30 @@ de = DataEditor(
     editschema_manual=webapp_config.editschema_manual,
     authorized_users=authorized_users,
     freeze_edits=freeze_edits,
+    linked_labels_cache_ttl=webapp_config.linked_labels_cache_ttl,
 )
+# edits submitted just before the backend stops are still written to the editlog
+atexit.register(de.close)
 
 
 columns = get_columns_tabulator(de, webapp_config.show_header_filter, webapp_config.freeze_editable_columns)
 
+# Edits and changes of the original dataset are pushed to connected clients, which apply them to their data table
+event_broadcaster = EventBroadcaster()
+de.add_editlog_listener(lambda logs: event_broadcaster.publish("edits", get_row_patches(de, logs)))
+
+
+def __on_original_dataset_changed__(build_date):
+    # the edited data cached for the rows endpoint must not be served under the new ETag (see __get_data_etag__)
+    de.clear_edited_df_cache()
+    event_broadcaster.publish("dataset-changed", {"build_date": build_date})
+
+
+# The build date of the original dataset is read by a single background thread, whatever the number of connected clients
+build_date_poller = BuildDatePoller(
+    partial(get_last_build_date, original_ds_name, project), on_change=__on_original_dataset_changed__
+).start()
+
 last_build_date_initial = ""
 last_build_date_ok = False
 
@@ -93,19 +127,89 @@ def __edit_result_to_message__(
         return "Unexpected update result"
 
 
+def __get_data_etag__(*extras) -> str | None:
+    """
+    ETag of data served from the edits and the original dataset: it changes whenever an edit is logged or the original dataset is rebuilt. Extras distinguish the different responses that can be served for the same data (e.g. pages of rows).
+
+    Returns None when the build date of the original dataset is unknown (e.g. for external datasets), as changes to it couldn't be detected.
+    """
+    build_date = build_date_poller.get()
+    if build_date is None:
+        return None
+    parts = [de.get_version(), str(build_date)] + [str(extra) for extra in extras]
+    return sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def __make_conditional_response__(make_data_response, *extras) -> Response:
+    """
+    Answers requests with an If-None-Match header matching the current ETag with 304 Not Modified, without computing the response; otherwise, returns the response made by `make_data_response`, with the ETag.
+
+    Clients must revalidate responses before reusing them (`Cache-Control: no-cache`). Responses without an ETag must not be stored (`Cache-Control: no-store`).
+    """
+    # the ETag is computed before the data, so that it can only be older than the data served with it
+    etag = __get_data_etag__(*extras)
+    if etag is None:
+        response = make_data_response()
+        response.headers["Cache-Control"] = "no-store"
+        return response
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = make_data_response()
+    if response.status_code in [200, 304]:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def __get_layout_etag__() -> str | None:
+    # the layout depends on the user when only some users are authorized
+    return __get_data_etag__("layout", try_get_user_identifier() if authorized_users else "")
+
+
+@server.before_request
+def __check_layout_etag__():
+    """
+    Answers requests for the layout, which embeds the table data (unless server-side pagination is enabled), with 304 Not Modified when the browser already has the current version
+    """
+    if request.path != app.config.routes_pathname_prefix + "_dash-layout":
+        return None
+    g.layout_etag = __get_layout_etag__()
+    if g.layout_etag is not None and g.layout_etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(g.layout_etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    return None
+
+
+@server.after_request
+def __set_layout_etag__(response):
+    if "layout_etag" not in g or response.status_code != 200:
+        return response
+    if g.layout_etag is None:
+        response.headers["Cache-Control"] = "no-store"
+    else:
+        response.set_etag(g.layout_etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 def serve_layout():  # This function is called upon loading/refreshing the page in the browser
     global last_build_date_initial, last_build_date_ok
-    try:
-        last_build_date_initial = get_last_build_date(original_ds_name, project)
+    last_build_date = build_date_poller.get()
+    if last_build_date is not None:
+        last_build_date_initial = last_build_date
         last_build_date_ok = True
-    except Exception:
-        logging.warning(
-            f"Failed to get last build date of {original_ds_name}. Serve layout without this information.",
-            exc_info=True,
-        )
+    else:
+        logging.warning(f"Failed to get last build date of {original_ds_name}. Serve layout without this information.")
         last_build_date_initial = ""
         last_build_date_ok = False
 
+    if webapp_config.server_side_pagination:
+        # the page is (re)loaded: make sure that the next pages take the latest version of the original dataset into account
+        de.clear_edited_df_cache()
+
     user_id = try_get_user_identifier()
 
     # no specific authorized users configured or match in the list of authorized users grant you access to the layout.
@@ -139,8 +243,14 @@ def serve_layout():  # This function is called upon loading/refreshing the page
                     id="datatable",
                     datasetName=original_ds_name,
                     columns=columns,
-                    data=de.get_edited_df().to_dict("records"),  # this gets the most up-to-date edited data
+                    # this gets the most up-to-date edited data, with labels of linked records; with server-side pagination, pages are requested from the `rows` endpoint instead
+                    data=[]
+                    if webapp_config.server_side_pagination
+                    else add_linked_labels(de.get_edited_df(), de.linked_records).to_dict("records"),
                     groupBy=webapp_config.group_column_names,
+                    remote=webapp_config.server_side_pagination,
+                    ajaxURL="rows",
+                    eventsURL="events",
                 ),
                 html.Div(
                     id="edit-info",
@@ -164,20 +274,22 @@ app.layout = serve_layout
     [
         # Changes in the Inputs trigger the callback
         Input("interval-component-iu", "n_intervals"),
+        Input("datatable", "datasetBuildDate"),
         # Changes in States don't trigger the callback
         State("refresh-div", "style"),
         State("last-build-date", "children"),
     ],
     prevent_initial_call=True,
 )
-def toggle_refresh_div_visibility(n_intervals, refresh_div_style, last_build_date):
+def toggle_refresh_div_visibility(n_intervals, dataset_build_date, refresh_div_style, last_build_date):
     """
-    Toggle visibility of refresh div, when the interval component fires: check last build date of original dataset and if it's more recent than what we had, display the refresh div
+    Toggle visibility of refresh div, when the interval component fires or the data table is notified of a change of the original dataset: check last build date of original dataset (as last read by the poller) and if it's more recent than what we had, display the refresh div
     """
     global last_build_date_ok
     style_new = refresh_div_style
-    if last_build_date_ok:
-        last_build_date_new = str(get_last_build_date(original_ds_name, project))
+    last_build_date_polled = build_date_poller.get()
+    if last_build_date_ok and last_build_date_polled is not None:
+        last_build_date_new = str(last_build_date_polled)
         if int(last_build_date_new) > int(last_build_date):
             logging.info("The original dataset has changed.")
             last_build_date_new_fmtd = datetime.utcfromtimestamp(int(last_build_date_new) / 1000).isoformat()
@@ -284,10 +396,56 @@ def read_endpoint():
         }
     }
     ```
+
+    The response has an ETag, which depends on the request JSON: see the `read-all-edits` endpoint.
     """
     primary_keys_values = request.get_json().get("primaryKeys")
-    response = de.get_row(primary_keys_values).to_json()
-    return response
+    return __make_conditional_response__(
+        lambda: Response(de.get_row(primary_keys_values).to_json(), mimetype="application/json"),
+        request.get_data(),
+    )
+
+
+@server.route("/rows", methods=["POST"])
+def rows_endpoint():
+    """
+    Get a page of edited data, as requested by the data table when server-side pagination is enabled: header filters and sorters are applied to all rows before paginating.
+
+    Example request JSON:
+    ```
+    {
+        "page": 1,
+        "size": 20,
+        "sort": [{"field": "name", "dir": "asc"}],
+        "filter": [{"field": "name", "type": "like", "value": "cat"}]
+    }
+    ```
+
+    Returns: JSON object with the number of pages and the rows of the requested page, with labels of linked records, e.g. `{"last_page": 5, "last_row": 97, "data": [...]}`.
+
+    The response has an ETag, which depends on the request JSON: see the `read-all-edits` endpoint.
+    """
+    user_id = try_get_user_identifier()
+    if authorized_users and (user_id is None or user_id not in authorized_users):
+        return "Unauthorized", 403
+    params = request.get_json(silent=True) or {}
+
+    def make_page_response():
+        page = get_page_from_df(
+            de.get_edited_df_cached(build_date_poller.get()),
+            page=params.get("page", 1),
+            size=params.get("size", 20),
+            sorters=params.get("sort"),
+            filters=params.get("filter"),
+        )
+        # pandas writes missing values as null and dates in ISO format, which Flask's JSON encoder wouldn't do
+        data_json = add_linked_labels(page["data"], de.linked_records).to_json(orient="records", date_format="iso")
+        return Response(
+            f"""{{"last_page": {page["last_page"]}, "last_row": {page["last_row"]}, "data": {data_json}}}""",
+            mimetype="application/json",
+        )
+
+    return __make_conditional_response__(make_page_response, request.get_data())
 
 
 @server.route("/read-all-edits", methods=["GET"])
@@ -295,15 +453,86 @@ def read_all_edits_endpoint():
     """
     Read all rows edited or created via webapp or API
 
-    Returns: CSV-formatted dataset with rows that were created or edited, and values of primary key and editable columns. See remarks of the `read` endpoint.
+    Params:
+    - format: (Optional) "csv" (default) or "parquet"
+
+    Returns: dataset with rows that were created or edited, and values of primary key and editable columns. See remarks of the `read` endpoint.
+    - In CSV format, the response is streamed in chunks of rows.
+    - In Parquet format, values are cast to the types of the original dataset's columns. This requires the pyarrow package in the code environment.
+
+    The response has an ETag: requests with a matching If-None-Match header get 304 Not Modified as long as no edit was made and the original dataset wasn't rebuilt.
+    """
+    export_format = request.args.get("format", "csv")
+
+    def make_csv_response():
+        response = Response(iter_csv(de.get_edited_cells_df_indexed()), mimetype="text/csv")
+        response.headers["Content-Disposition"] = "attachment; filename=" + original_ds_name + "_edits.csv"
+        return response
+
+    def make_parquet_response():
+        buffer = BytesIO()
+        try:
+            cast_to_schema_types(de.get_edited_cells_df(), de.schema_columns).to_parquet(buffer, index=False)
+        except ImportError:
+            logging.exception("Failed to write edits in Parquet format.")
+            return make_response("Parquet format requires the pyarrow package in the code environment.", 501)
+        response = Response(buffer.getvalue(), mimetype="application/vnd.apache.parquet")
+        response.headers["Content-Disposition"] = "attachment; filename=" + original_ds_name + "_edits.parquet"
+        return response
+
+    if export_format == "csv":
+        return __make_conditional_response__(make_csv_response, export_format)
+    elif export_format == "parquet":
+        return __make_conditional_response__(make_parquet_response, export_format)
+    else:
+        return "Invalid format, use csv or parquet.", 400
+
+
+@server.route("/events", methods=["GET"])
+def events_endpoint():
+    """
+    Stream of server-sent events, read by the data table to stay up-to-date without reloading the page:
+    - `edits`: changes to apply to rows after edits were made (by any user), as returned by `get_row_patches`
+    - `dataset-changed`: the original dataset was rebuilt; its new build date is given, e.g. `{"build_date": 1700000000000}`
+    - `reset`: some events were missed, the data should be reloaded
+
+    Clients which reconnect with a `Last-Event-ID` header get the events they missed.
     """
-    response = make_response(de.get_edited_cells_df_indexed().to_csv())
-    response.headers["Content-Disposition"] = "attachment; filename=" + original_ds_name + "_edits.csv"
-    response.headers["Content-Type"] = "text/csv"
+    user_id = try_get_user_identifier()
+    if authorized_users and (user_id is None or user_id not in authorized_users):
+        return "Unauthorized", 403
+    response = Response(
+        event_broadcaster.stream(request.headers.get("Last-Event-ID")),
+        mimetype="text/event-stream",
+    )
     response.headers["Cache-Control"] = "no-store"
+    # ask reverse proxies not to buffer events
+    response.headers["X-Accel-Buffering"] = "no"
     return response
 
 
+@server.route("/editlog-stats", methods=["GET"])
+def editlog_stats_endpoint():
+    """
+    Statistics on the writes made to the editlog since the webapp started: number of writes, of requests and of edit logs, batch sizes (in edit logs) and write latencies (in seconds).
+    """
+    user_id = try_get_user_identifier()
+    if authorized_users and (user_id is None or user_id not in authorized_users):
+        return "Unauthorized", 403
+    return jsonify(de.get_editlog_writer_stats())
+
+
+@server.route("/label-cache-stats", methods=["GET"])
+def label_cache_stats_endpoint():
+    """
+    Statistics on the caches of labels of linked records read from SQL datasets, by linked dataset name: number of hits and misses, hit rate, number of labels evicted, expired or invalidated, and number of cached labels.
+    """
+    user_id = try_get_user_identifier()
+    if authorized_users and (user_id is None or user_id not in authorized_users):
+        return "Unauthorized", 403
+    return jsonify(de.get_label_cache_stats())
+
+
 @server.route("/update", methods=["GET", "POST"])
 def update_endpoint():
     """
@@ -361,6 +590,77 @@ def delete_endpoint():
     return response
 
 
+# Bulk endpoints: all the edits of a request are validated, then appended to the editlog in a single write
+###
+
+
+def __get_bulk_rows_df__() -> DataFrame:
+    # one row per item of the request's "rows" list, with primary keys and column values as columns
+    rows = (request.get_json(silent=True) or {}).get("rows") or []
+    # object dtype, so that integers of columns with missing values are not turned into floats
+    return DataFrame([{**row.get("primaryKeys", {}), **row.get("columnValues", {})} for row in rows], dtype=object)
+
+
+def __bulk_results_to_response__(bulk_edit) -> Response:
+    try:
+        results = bulk_edit(__get_bulk_rows_df__())
+    except (AttributeError, ValueError) as e:
+        return make_response(jsonify({"msg": f"Invalid request: {e}"}), 400)
+    n_success = sum(isinstance(r, EditSuccess) for r in results)
+    # count each distinct error message, rather than repeating it for every edit
+    errors = Counter(__edit_result_to_message__(r) for r in results if not isinstance(r, EditSuccess))
+    return jsonify({"msg": f"{n_success} edit(s) logged", "errors": dict(errors)})
+
+
+@server.route("/bulk-create", methods=["POST"])
+def bulk_create_endpoint():
+    """
+    Create new rows
+
+    Params:
+    - rows: list of rows to create, with the same format as the request JSON of the create endpoint
+
+    Example request JSON:
+    ```json
+    {
+        "rows": [
+            {"primaryKeys": {"id": "a"}, "columnValues": {"col1": "hey", "col2": 42}},
+            {"primaryKeys": {"id": "b"}, "columnValues": {"col1": "ho"}}
+        ]
+    }
+    ```
+
+    Returns the number of edits logged, and the number of edits which failed for each error message, e.g. `{"msg": "3 edit(s) logged", "errors": {"col3 isn't an editable column.": 1}}`. See `DataEditor.create_rows`.
+    """
+    return __bulk_results_to_response__(de.create_rows)
+
+
+@server.route("/bulk-update", methods=["POST"])
+def bulk_update_endpoint():
+    """
+    Update cells of many rows
+
+    Params:
+    - rows: list of rows to update, with the same format as for the bulk-create endpoint; only the columns given in `columnValues` are updated, and null values are ignored
+
+    Returns: see bulk-create endpoint and `DataEditor.update_rows`.
+    """
+    return __bulk_results_to_response__(de.update_rows)
+
+
+@server.route("/bulk-delete", methods=["POST"])
+def bulk_delete_endpoint():
+    """
+    Delete rows
+
+    Params:
+    - rows: list of rows to delete, given by their `primaryKeys`, e.g. `{"rows": [{"primaryKeys": {"id": "a"}}, {"primaryKeys": {"id": "b"}}]}`
+
+    Returns: see bulk-create endpoint.
+    """
+    return __bulk_results_to_response__(de.delete_rows)
+
+
 # Label and lookup endpoints used by Tabulator when formatting or editing linked records
 ###
 
@@ -407,6 +707,44 @@ def label_endpoint(linked_ds_name):
     return get_linked_label(linked_record, key)
 
 
+@server.route("/labels/<linked_ds_name>", methods=["POST"])
+def labels_endpoint(linked_ds_name):
+    """
+    Return the labels of many rows in a linked dataset, using a single query when the linked dataset is accessed via SQL
+
+    Params:
+    - keys: values of the primary key identifying the rows to read
+
+    Example request JSON:
+    ```json
+    {
+        "keys": ["0f45e", "c3d2a"]
+    }
+    ```
+
+    Returns: JSON object mapping each key found in the linked dataset to its label, e.g. `{"0f45e": "Label One", "c3d2a": "Label Two"}`
+    """
+    keys = request.get_json().get("keys", [])
+
+    # Find the linked record whose linked dataset is requested
+    linked_record: LinkedRecord | None = None
+    for lr in de.linked_records:
+        if linked_ds_name == lr.ds_name:
+            linked_record = lr
+            break
+    if linked_record is None:
+        return "Unknown linked dataset.", 404
+
+    if not has_linked_label(linked_record):
+        return jsonify({str(key): key for key in keys})
+    try:
+        labels = get_linked_labels(linked_record, [str(key) for key in keys if key is not None])
+    except Exception:
+        logging.exception(f"Failed to get labels from linked dataset {linked_ds_name}.")
+        return "Something went wrong fetching labels of linked values.", 500
+    return jsonify(labels)
+
+
 @server.route("/lookup/<linked_ds_name>", methods=["GET", "POST"])
 def lookup_endpoint(linked_ds_name):
     """
@@ -457,6 +795,12 @@ def lookup_endpoint(linked_ds_name):
         # otherwise, show many options to choose from
         n_options = 1000
 
+    # when the linked dataset is in memory, search its index of labels
+    # as below, the option corresponding to the provided key is removed from the list, as the autocomplete would cause issues when searching for another label
+    if linked_record.index is not None:
+        exclude_key = key if key != "" and key != "null" else None
+        return jsonify(linked_record.index.search(term, n_options, exclude_key=exclude_key))
+
     # Get a dataframe of the linked dataset filtered by the search term or the key
     linked_df_filtered = get_linked_dataframe_filtered(
         linked_record=linked_record,